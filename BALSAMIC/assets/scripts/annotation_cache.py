@@ -0,0 +1,380 @@
+# vim: syntax=python tabstop=4 expandtab
+# coding: utf-8
+
+""" Script to annotate VCF files through a persistent cache of variant annotations, so that
+only variants novel to the cache are annotated by VEP and vcfanno """
+
+import gzip
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+
+# Seconds to wait for other jobs writing to the cache
+CACHE_TIMEOUT = 600
+
+# Seconds between attempts to lock the cache, and after which a lock left by a killed
+# job is removed
+LOCK_INTERVAL = 1
+LOCK_STALE = 6 * 60 * 60
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS annotation_header (
+    cache_key TEXT PRIMARY KEY,
+    header TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variant_annotation (
+    cache_key TEXT NOT NULL,
+    chrom TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    ref TEXT NOT NULL,
+    alt TEXT NOT NULL,
+    info TEXT NOT NULL,
+    PRIMARY KEY (cache_key, chrom, pos, ref, alt)
+) WITHOUT ROWID;
+"""
+
+SELECT_ANNOTATION = (
+    "SELECT info FROM variant_annotation "
+    "WHERE cache_key = ? AND chrom = ? AND pos = ? AND ref = ? AND alt = ?"
+)
+
+
+def open_vcf(vcf_file: str):
+    """Opens a VCF file for reading, bgzipped or not"""
+
+    with open(vcf_file, "rb") as vcf:
+        gzipped = vcf.read(2) == b"\x1f\x8b"
+    return gzip.open(vcf_file, "rt") if gzipped else open(vcf_file, "r")
+
+
+def get_vep_cache_version(vep_cache: str) -> str:
+    """Returns the species and versions of a VEP cache, e.g. homo_sapiens_merged/104_GRCh37"""
+
+    versions = sorted(
+        "/".join(version_dir.parts[-2:])
+        for version_dir in Path(vep_cache).glob("*/*_*")
+        if version_dir.is_dir()
+    )
+    return ",".join(versions) or Path(vep_cache).name
+
+
+def get_cache_key(genome_version: str, vep_cache: str, annotation_hash: str) -> str:
+    """Returns the key of the annotations of a genome version, VEP cache version and
+    annotation options"""
+
+    return hashlib.sha256(
+        json.dumps(
+            {
+                "genome_version": genome_version,
+                "vep_cache_version": get_vep_cache_version(vep_cache),
+                "annotation_hash": annotation_hash,
+            },
+            sort_keys=True,
+        ).encode()
+    ).hexdigest()
+
+
+@contextmanager
+def lock_cache(cache_file: str):
+    """Serialises the access of jobs to the cache with a lock file next to it.
+
+    Jobs of different nodes share the cache on a network filesystem, where the POSIX
+    locks of SQLite are unreliable. The lock file is created atomically instead, and only
+    held for the lookup and insert of annotations, not while reading or writing VCF files.
+    """
+
+    lock_file = cache_file + ".lock"
+    while True:
+        try:
+            lock = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock_file).st_mtime > LOCK_STALE:
+                    os.unlink(lock_file)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(LOCK_INTERVAL)
+
+    try:
+        os.write(lock, f"{socket.gethostname()} {os.getpid()}\n".encode())
+        os.close(lock)
+        yield
+    finally:
+        os.unlink(lock_file)
+
+
+def connect_cache(cache_file: str) -> sqlite3.Connection:
+    """Connects to the cache, creating it if missing"""
+
+    connection = sqlite3.connect(cache_file, timeout=CACHE_TIMEOUT)
+    connection.executescript(CACHE_SCHEMA)
+    return connection
+
+
+def get_annotation_header(connection, cache_key: str):
+    """Returns the cached header lines added by the annotation, None if not cached"""
+
+    annotation_header = connection.execute(
+        "SELECT header FROM annotation_header WHERE cache_key = ?", (cache_key,)
+    ).fetchone()
+    return annotation_header[0] if annotation_header else None
+
+
+def read_header(vcf) -> list:
+    """Returns the header lines of an open VCF file, up to and including #CHROM"""
+
+    header = []
+    for line in vcf:
+        header.append(line)
+        if line.startswith("#CHROM"):
+            break
+    return header
+
+
+def get_variant(line: str) -> tuple:
+    """Returns the CHROM, POS, REF and ALT of a VCF record and its fields"""
+
+    fields = line.rstrip("\n").split("\t")
+    return (fields[0], int(fields[1]), fields[3], fields[4]), fields
+
+
+def get_info_ids(header: list) -> set:
+    """Returns the IDs of the INFO fields declared in a VCF header"""
+
+    return {
+        line[len("##INFO=<ID=") :].split(",", 1)[0]
+        for line in header
+        if line.startswith("##INFO=<ID=")
+    }
+
+
+def read_annotations(input_header: list, annotated_vcf: str) -> tuple:
+    """Returns the header lines and the INFO fields of each variant added to the records
+    of a VCF file by its annotation"""
+
+    with open_vcf(annotated_vcf) as vcf:
+        annotated_header = read_header(vcf)
+        input_header_lines = set(input_header[:-1])
+        annotation_header = [
+            line for line in annotated_header[:-1] if line not in input_header_lines
+        ]
+        annotation_ids = get_info_ids(annotated_header) - get_info_ids(input_header)
+
+        annotations = []
+        for line in vcf:
+            variant, fields = get_variant(line)
+            info = [
+                item
+                for item in fields[7].split(";")
+                if item.split("=", 1)[0] in annotation_ids
+            ]
+            annotations.append(variant + (";".join(info),))
+
+    return "".join(annotation_header), annotations
+
+
+def store_annotations(
+    connection, cache_key: str, annotation_header: str, annotations: list
+):
+    """Stores the header lines and the INFO fields of each variant added by annotation"""
+
+    with connection:
+        connection.execute(
+            "INSERT OR IGNORE INTO annotation_header VALUES (?, ?)",
+            (cache_key, annotation_header),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO variant_annotation VALUES (?, ?, ?, ?, ?, ?)",
+            ((cache_key,) + annotation for annotation in annotations),
+        )
+
+
+def get_cached_annotations(connection, cache_key: str, variants: list) -> dict:
+    """Returns the cached INFO fields of the variants found in the cache"""
+
+    cached_annotations = {}
+    for variant in variants:
+        annotation = connection.execute(
+            SELECT_ANNOTATION, (cache_key,) + variant
+        ).fetchone()
+        if annotation is not None:
+            cached_annotations[variant] = annotation[0]
+    return cached_annotations
+
+
+def read_records(vcf_file: str) -> tuple:
+    """Returns the header lines of a VCF file and the variant and fields of its records"""
+
+    with open_vcf(vcf_file) as vcf:
+        header = read_header(vcf)
+        records = [get_variant(line) for line in vcf]
+    return header, records
+
+
+cache_options = [
+    click.option(
+        "-c",
+        "--cache",
+        type=click.Path(dir_okay=False),
+        required=True,
+        help="SQLite file of the annotation cache, created if missing",
+    ),
+    click.option(
+        "-g", "--genome_version", type=str, required=True, help="Genome version"
+    ),
+    click.option(
+        "-v",
+        "--vep_cache",
+        type=click.Path(exists=True),
+        required=True,
+        help="VEP cache directory, the species and versions of which key the cache",
+    ),
+    click.option(
+        "-k",
+        "--annotation_hash",
+        type=str,
+        required=True,
+        help="Hash of the VEP options and vcfanno TOML the variants are annotated with",
+    ),
+]
+
+
+def add_cache_options(command):
+    """Adds the options locating the cache and keying its annotations to a command"""
+
+    for option in reversed(cache_options):
+        command = option(command)
+    return command
+
+
+@click.group()
+def annotation_cache():
+    """Annotates VCF files through a persistent cache of variant annotations"""
+
+
+@annotation_cache.command()
+@add_cache_options
+@click.option(
+    "-i",
+    "--input_vcf",
+    type=click.Path(exists=True),
+    required=True,
+    help="Input VCF file to be annotated",
+)
+@click.option(
+    "-o",
+    "--output_vcf",
+    type=click.Path(exists=False),
+    required=True,
+    help="Output VCF file of the records of novel variants",
+)
+def novel(cache, genome_version, vep_cache, annotation_hash, input_vcf, output_vcf):
+    """Writes the records of the variants of a VCF file missing in the cache.
+
+    No output VCF file is written if all variants and the header lines added by the
+    annotation are cached.
+    """
+
+    cache_key = get_cache_key(genome_version, vep_cache, annotation_hash)
+    header, records = read_records(input_vcf)
+    with lock_cache(cache):
+        connection = connect_cache(cache)
+        header_cached = get_annotation_header(connection, cache_key) is not None
+        cached_annotations = get_cached_annotations(
+            connection, cache_key, [variant for variant, _ in records]
+        )
+        connection.close()
+
+    novel_records = [
+        fields for variant, fields in records if variant not in cached_annotations
+    ]
+    if novel_records or not header_cached:
+        output_tmp = Path(output_vcf + ".tmp")
+        with open(output_tmp, "w") as vcf_out:
+            vcf_out.writelines(header)
+            vcf_out.writelines("\t".join(fields) + "\n" for fields in novel_records)
+        output_tmp.replace(output_vcf)
+    click.echo(f"{len(novel_records)} variants of {input_vcf} are not in the cache")
+
+
+@annotation_cache.command()
+@add_cache_options
+@click.option(
+    "-i",
+    "--input_vcf",
+    type=click.Path(exists=True),
+    required=True,
+    help="Input VCF file to be annotated",
+)
+@click.option(
+    "-a",
+    "--annotated_vcf",
+    type=click.Path(),
+    required=True,
+    help="Annotated VCF file of the novel variants, if any",
+)
+@click.option(
+    "-o",
+    "--output_vcf",
+    type=click.Path(exists=False),
+    required=True,
+    help="Output VCF file of the annotated records of all variants",
+)
+def merge(
+    cache,
+    genome_version,
+    vep_cache,
+    annotation_hash,
+    input_vcf,
+    annotated_vcf,
+    output_vcf,
+):
+    """Stores the annotations of the novel variants in the cache and writes the records of
+    the input VCF file with their cached annotations, in input order"""
+
+    cache_key = get_cache_key(genome_version, vep_cache, annotation_hash)
+    input_header, records = read_records(input_vcf)
+    annotated = Path(annotated_vcf).exists()
+    if annotated:
+        annotation_header, annotations = read_annotations(input_header, annotated_vcf)
+
+    with lock_cache(cache):
+        connection = connect_cache(cache)
+        if annotated:
+            store_annotations(connection, cache_key, annotation_header, annotations)
+        annotation_header = get_annotation_header(connection, cache_key)
+        cached_annotations = get_cached_annotations(
+            connection, cache_key, [variant for variant, _ in records]
+        )
+        connection.close()
+
+    with open(output_vcf, "w") as vcf_out:
+        vcf_out.writelines(input_header[:-1])
+        vcf_out.write(annotation_header or "")
+        vcf_out.writelines(input_header[-1:])
+
+        for variant, fields in records:
+            if variant not in cached_annotations:
+                raise click.ClickException(
+                    f"Variant {variant} has no cached annotation"
+                )
+            if cached_annotations[variant]:
+                fields[7] = (
+                    cached_annotations[variant]
+                    if fields[7] == "."
+                    else fields[7] + ";" + cached_annotations[variant]
+                )
+            vcf_out.write("\t".join(fields) + "\n")
+
+
+if __name__ == "__main__":
+    annotation_cache()
@@ -0,0 +1,101 @@
+# vim: syntax=python tabstop=4 expandtab
+# coding: utf-8
+
+""" Script to remove unmapped reads and replace the read groups of a BAM file, writing
+the merged BAM and CRAM files in a single pass """
+
+import click
+import pysam
+
+
+def get_merged_header(header: dict, read_group: dict) -> dict:
+    """Returns the header of a BAM file with its read groups replaced by read_group"""
+
+    merged_header = {key: value for key, value in header.items() if key != "RG"}
+    merged_header["RG"] = [read_group]
+    return merged_header
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input_bam",
+    type=click.Path(exists=True),
+    required=True,
+    help="Input coordinate sorted BAM file",
+)
+@click.option(
+    "-b",
+    "--output_bam",
+    type=click.Path(exists=False),
+    required=True,
+    help="Output BAM file of mapped reads",
+)
+@click.option(
+    "-c",
+    "--output_cram",
+    type=click.Path(exists=False),
+    required=True,
+    help="Output CRAM file of mapped reads",
+)
+@click.option(
+    "-r",
+    "--reference",
+    type=click.Path(exists=True),
+    required=True,
+    help="Reference genome the reads are aligned to",
+)
+@click.option(
+    "--rg_id",
+    type=str,
+    required=True,
+    help="Read group ID, also used as sample name",
+)
+@click.option(
+    "--rg_tag",
+    type=str,
+    multiple=True,
+    help="Additional read group tag, e.g. PL:ILLUMINA",
+)
+@click.option(
+    "-t",
+    "--threads",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Compression threads of each output file",
+)
+def merge_bam(input_bam, output_bam, output_cram, reference, rg_id, rg_tag, threads):
+    """Removes unmapped reads and replaces the read groups of a BAM file.
+
+    Reads are streamed once and written to the BAM and CRAM file together, which are
+    compressed by their own threads. Mate information is kept as set by the aligner.
+    """
+
+    read_group = {"ID": rg_id, "SM": rg_id}
+    read_group.update(tag.split(":", 1) for tag in rg_tag)
+
+    with pysam.AlignmentFile(input_bam, "rb", threads=threads) as bam_in:
+        header = get_merged_header(bam_in.header.to_dict(), read_group)
+        with pysam.AlignmentFile(
+            output_bam, "wb", header=header, threads=threads
+        ) as bam_out, pysam.AlignmentFile(
+            output_cram,
+            "wc",
+            header=header,
+            reference_filename=reference,
+            threads=threads,
+        ) as cram_out:
+            for read in bam_in.fetch(until_eof=True):
+                if read.is_unmapped:
+                    continue
+                read.set_tag("RG", rg_id, value_type="Z")
+                bam_out.write(read)
+                cram_out.write(read)
+
+    pysam.index(output_bam)
+    pysam.index(output_cram)
+
+
+if __name__ == "__main__":
+    merge_bam()
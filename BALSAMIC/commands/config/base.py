@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 import click
 
+from BALSAMIC.commands.config.batch import batch_config as batch_command
 from BALSAMIC.commands.config.case import case_config as case_command
 from BALSAMIC.commands.config.pon import pon_config as pon_command
+from BALSAMIC.commands.config.resources import resources_config as resources_command
 
 
 @click.group()
@@ -13,4 +15,6 @@ def config(context):
 
 
 config.add_command(case_command)
+config.add_command(batch_command)
 config.add_command(pon_command)
+config.add_command(resources_command)
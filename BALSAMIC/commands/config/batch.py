@@ -0,0 +1,207 @@
+import csv
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+
+from BALSAMIC import __version__ as balsamic_version
+from BALSAMIC.commands.config.case import (
+    case_config,
+    get_case_config,
+    read_reference_config,
+    write_case_config,
+)
+from BALSAMIC.constants.common import (
+    BIOINFO_TOOL_ENV,
+    BIOINFO_TOOLS_VERSION_FILE,
+    CONTAINERS_CONDA_ENV_PATH,
+)
+from BALSAMIC.utils.cli import read_bioinfo_tools_version
+
+LOG = logging.getLogger(__name__)
+
+# Options of balsamic config case that are shared by all cases of a batch
+BATCH_OPTIONS = ["analysis_dir", "balsamic_cache", "container_version"]
+
+# Separator of multiple values, e.g. fastq files, in a TSV manifest
+MANIFEST_SEPARATOR = ","
+
+
+def read_manifest(manifest: str) -> list:
+    """Returns the cases of a manifest, one dict of balsamic config case options per case.
+
+    JSON manifests hold a list of cases. TSV manifests hold a header of option names and
+    a case per row, with multiple values separated by MANIFEST_SEPARATOR.
+    """
+
+    if Path(manifest).suffix == ".json":
+        with open(manifest, "r") as f:
+            return json.load(f)
+
+    cases = []
+    with open(manifest, "r", newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            cases.append(
+                {
+                    option: value
+                    for option, value in row.items()
+                    if value not in ("", None)
+                }
+            )
+
+    return cases
+
+
+def get_case_options(context: click.Context, case: dict, batch_options: dict) -> dict:
+    """Returns the balsamic config case options of a manifest case, validated and
+    converted as on the command line"""
+
+    case_params = {
+        param.name: param
+        for param in case_config.params
+        if param.name not in BATCH_OPTIONS
+    }
+    unknown_options = set(case) - set(case_params)
+    if unknown_options:
+        raise click.BadParameter(
+            f"Unknown options {', '.join(sorted(unknown_options))}",
+            param_hint="manifest",
+        )
+
+    case_options = dict(batch_options)
+    for name, param in case_params.items():
+        value = case.get(name)
+        if value is None:
+            if param.required:
+                raise click.MissingParameter(ctx=context, param=param)
+            value = param.get_default(context)
+        elif param.multiple and isinstance(value, str):
+            value = value.split(MANIFEST_SEPARATOR)
+        case_options[name] = param.type_cast_value(context, value)
+
+    return case_options
+
+
+@click.command(
+    "batch",
+    short_help="Create sample config files for the cases of a manifest",
+)
+@click.option(
+    "-m",
+    "--manifest",
+    type=click.Path(exists=True, resolve_path=True),
+    required=True,
+    help=(
+        "TSV or JSON manifest of cases. Fields are the options of balsamic config case, "
+        "e.g. case_id, tumor, normal, panel_bed. Multiple fastq files of a TSV manifest "
+        f"are separated by '{MANIFEST_SEPARATOR}'."
+    ),
+)
+@click.option(
+    "--analysis-dir",
+    type=click.Path(exists=True, resolve_path=True),
+    required=True,
+    help="Root analysis path to store analysis logs and results of all cases.",
+)
+@click.option(
+    "--balsamic-cache",
+    type=click.Path(exists=True, resolve_path=True),
+    required=True,
+    help="Path to BALSAMIC cache",
+)
+@click.option(
+    "--container-version",
+    show_default=True,
+    default=balsamic_version,
+    type=click.Choice(["develop", "master", balsamic_version]),
+    help="Container for BALSAMIC version to download",
+)
+@click.option(
+    "--workers",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of cases whose directories, symlinks and configs are written in parallel.",
+)
+@click.pass_context
+def batch_config(
+    context, manifest, analysis_dir, balsamic_cache, container_version, workers
+):
+    """Creates the sample configs of all cases of a manifest in one process.
+
+    References and tool versions are read once for the batch. Configs are validated
+    up front, then the case directories, fastq symlinks, configs and DAG graphs are
+    written by a pool of worker processes.
+    """
+
+    batch_options = {
+        "analysis_dir": analysis_dir,
+        "balsamic_cache": balsamic_cache,
+        "container_version": container_version,
+    }
+    bioinfo_tools_version = read_bioinfo_tools_version(
+        version_file=Path(balsamic_cache, balsamic_version, BIOINFO_TOOLS_VERSION_FILE),
+        bioinfo_tools=BIOINFO_TOOL_ENV,
+        container_conda_env_path=CONTAINERS_CONDA_ENV_PATH,
+    )
+    references = {}
+
+    case_configs = []
+    for case in read_manifest(manifest):
+        try:
+            case_options = get_case_options(context, case, batch_options)
+        except click.ClickException as e:
+            LOG.error(
+                f"Invalid case {case.get('case_id')} in manifest: {e.format_message()}"
+            )
+            raise click.Abort()
+
+        genome_version = case_options["genome_version"]
+        if genome_version not in references:
+            references[genome_version] = read_reference_config(
+                balsamic_cache=balsamic_cache,
+                container_version=container_version,
+                genome_version=genome_version,
+            )
+        case_configs.append(
+            (
+                get_case_config(
+                    **case_options,
+                    reference_dict=references[genome_version],
+                    bioinfo_tools_version=bioinfo_tools_version,
+                ),
+                case_options["tumor"] + case_options["normal"],
+            )
+        )
+    case_ids = [config["analysis"]["case_id"] for config, _ in case_configs]
+    duplicate_case_ids = {
+        case_id for case_id in case_ids if case_ids.count(case_id) > 1
+    }
+    if duplicate_case_ids:
+        LOG.error(
+            f"Duplicate cases in manifest: {', '.join(sorted(duplicate_case_ids))}"
+        )
+        raise click.Abort()
+    LOG.info(f"Config files of {len(case_configs)} cases generated successfully")
+
+    failed_cases = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            config_collection_dict["analysis"]["case_id"]: executor.submit(
+                write_case_config, config_collection_dict, casefiles
+            )
+            for config_collection_dict, casefiles in case_configs
+        }
+        for case_id, future in futures.items():
+            try:
+                future.result()
+            except (click.Abort, OSError, ValueError):
+                failed_cases.append(case_id)
+
+    if failed_cases:
+        LOG.error(f"Configuration failed for cases: {', '.join(failed_cases)}")
+        raise click.Abort()
+
+    LOG.info(f"{len(case_configs)} cases have been configured successfully!")
@@ -9,14 +9,19 @@ from BALSAMIC import __version__ as balsamic_version
 from BALSAMIC.utils.cli import (
     get_sample_dict,
     get_panel_chrom,
-    get_bioinfo_tools_version,
+    get_panel_region_count,
+    read_bioinfo_tools_version,
     create_fastq_symlink,
     generate_graph,
 )
 from BALSAMIC.constants.common import (
     CONTAINERS_CONDA_ENV_PATH,
     BIOINFO_TOOL_ENV,
+    BIOINFO_TOOLS_VERSION_FILE,
     GENDER_OPTIONS,
+    STORAGE_MODES,
+    VARDICT_BED_PADDING,
+    VARDICT_SHARDS,
 )
 from BALSAMIC.constants.workflow_params import VCF_DICT
 from BALSAMIC.utils.models import BalsamicConfigModel
@@ -125,6 +130,83 @@ LOG = logging.getLogger(__name__)
     multiple=True,
     help="Fastq files for normal sample.",
 )
+@click.option(
+    "--stream-lanes/--no-stream-lanes",
+    default=False,
+    show_default=True,
+    is_flag=True,
+    help=(
+        "Analyse multiple tumor or normal fastq files as the lanes of one sample. Lanes "
+        "are streamed into fastp instead of being aligned separately."
+    ),
+)
+@click.option(
+    "--fuse-alignment/--no-fuse-alignment",
+    default=False,
+    show_default=True,
+    is_flag=True,
+    help=(
+        "Fuse the alignment, deduplication, realignment and bam merging of WGS cases, "
+        "writing two bam files per sample instead of five."
+    ),
+)
+@click.option(
+    "--storage-mode",
+    default="bam",
+    show_default=True,
+    type=click.Choice(STORAGE_MODES),
+    help=(
+        "Storage of alignments. With cram, downstream rules read the CRAM files and "
+        "BAM files are removed once no longer needed, at the end of the analysis for "
+        "cluster runs."
+    ),
+)
+@click.option(
+    "--vardict-shards",
+    default=VARDICT_SHARDS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=(
+        "Number of shards of about equal target bases the padded panel bed is split "
+        "into for vardict (targeted analysis). Capped by the number of panel regions."
+    ),
+)
+@click.option(
+    "--wgs-calling-shards",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=(
+        "Number of genome shards of about equal calling intervals the sentieon TNscope "
+        "and DNAscope calls of a WGS analysis are scattered into, as separate jobs."
+    ),
+)
+@click.option(
+    "--vep-chunks",
+    default=12,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help=(
+        "Number of chunks of about equal number of records the VCF files of a WGS "
+        "analysis are annotated in by VEP, as separate jobs."
+    ),
+)
+@click.option(
+    "--scratch-dir",
+    help=(
+        "Node-local directory of temporary files, e.g. '$TMPDIR'. Environment variables "
+        "are expanded when the jobs run. Defaults to the tmp directory of the analysis."
+    ),
+)
+@click.option(
+    "--annotation-cache",
+    type=click.Path(dir_okay=False, resolve_path=True),
+    help=(
+        "SQLite file of the annotations of SNVs shared across cases, created if missing. "
+        "Only variants missing in the cache are annotated by VEP and vcfanno. Jobs "
+        "access the cache one at a time, through a lock file next to it."
+    ),
+)
 @click.option("--tumor-sample-name", help="Tumor sample name")
 @click.option("--normal-sample-name", help="Normal sample name")
 @click.option(
@@ -206,6 +288,14 @@ def case_config(
     analysis_dir,
     tumor,
     normal,
+    stream_lanes,
+    fuse_alignment,
+    storage_mode,
+    scratch_dir,
+    vardict_shards,
+    wgs_calling_shards,
+    vep_chunks,
+    annotation_cache,
     tumor_sample_name,
     normal_sample_name,
     clinical_snv_observations,
@@ -221,26 +311,128 @@ def case_config(
     analysis_workflow,
 ):
 
+    config_collection_dict = get_case_config(
+        case_id=case_id,
+        gender=gender,
+        umi=umi,
+        umi_trim_length=umi_trim_length,
+        adapter_trim=adapter_trim,
+        quality_trim=quality_trim,
+        panel_bed=panel_bed,
+        background_variants=background_variants,
+        pon_cnn=pon_cnn,
+        analysis_dir=analysis_dir,
+        tumor=tumor,
+        normal=normal,
+        stream_lanes=stream_lanes,
+        fuse_alignment=fuse_alignment,
+        storage_mode=storage_mode,
+        scratch_dir=scratch_dir,
+        vardict_shards=vardict_shards,
+        wgs_calling_shards=wgs_calling_shards,
+        vep_chunks=vep_chunks,
+        annotation_cache=annotation_cache,
+        tumor_sample_name=tumor_sample_name,
+        normal_sample_name=normal_sample_name,
+        clinical_snv_observations=clinical_snv_observations,
+        clinical_sv_observations=clinical_sv_observations,
+        cancer_all_snv_observations=cancer_all_snv_observations,
+        cancer_somatic_snv_observations=cancer_somatic_snv_observations,
+        cancer_somatic_sv_observations=cancer_somatic_sv_observations,
+        swegen_snv=swegen_snv,
+        swegen_sv=swegen_sv,
+        genome_version=genome_version,
+        balsamic_cache=balsamic_cache,
+        container_version=container_version,
+        analysis_workflow=analysis_workflow,
+        reference_dict=read_reference_config(
+            balsamic_cache=balsamic_cache,
+            container_version=container_version,
+            genome_version=genome_version,
+        ),
+        bioinfo_tools_version=read_bioinfo_tools_version(
+            version_file=Path(
+                balsamic_cache, balsamic_version, BIOINFO_TOOLS_VERSION_FILE
+            ),
+            bioinfo_tools=BIOINFO_TOOL_ENV,
+            container_conda_env_path=CONTAINERS_CONDA_ENV_PATH,
+        ),
+    )
+    LOG.info("Config file generated successfully")
+
+    write_case_config(config_collection_dict, casefiles=(tumor + normal))
+
+
+def read_reference_config(
+    balsamic_cache: str, container_version: str, genome_version: str
+) -> dict:
+    """Returns the references of a genome version from the BALSAMIC cache"""
+
+    reference_config = os.path.join(
+        balsamic_cache,
+        container_version or balsamic_version,
+        genome_version,
+        "reference.json",
+    )
+    with open(reference_config, "r") as f:
+        return json.load(f)["reference"]
+
+
+def get_case_config(
+    case_id,
+    gender,
+    umi,
+    umi_trim_length,
+    adapter_trim,
+    quality_trim,
+    panel_bed,
+    background_variants,
+    pon_cnn,
+    analysis_dir,
+    tumor,
+    normal,
+    stream_lanes,
+    fuse_alignment,
+    storage_mode,
+    scratch_dir,
+    vardict_shards,
+    wgs_calling_shards,
+    vep_chunks,
+    annotation_cache,
+    tumor_sample_name,
+    normal_sample_name,
+    clinical_snv_observations,
+    clinical_sv_observations,
+    cancer_all_snv_observations,
+    cancer_somatic_snv_observations,
+    cancer_somatic_sv_observations,
+    swegen_snv,
+    swegen_sv,
+    genome_version,
+    balsamic_cache,
+    container_version,
+    analysis_workflow,
+    reference_dict: dict,
+    bioinfo_tools_version: dict,
+) -> dict:
+    """Returns the validated sample config of a case.
+
+    References and tool versions are passed in, so that they can be shared by the cases
+    of a batch. reference_dict is not modified.
+    """
+
     try:
         samples = get_sample_dict(
             tumor=tumor,
             normal=normal,
             tumor_sample_name=tumor_sample_name,
             normal_sample_name=normal_sample_name,
+            stream_lanes=stream_lanes,
         )
     except AttributeError:
         LOG.error(f"File name is invalid, use convention [SAMPLE_ID]_R_[1,2].fastq.gz")
         raise click.Abort()
 
-    if container_version:
-        balsamic_version = container_version
-
-    reference_config = os.path.join(
-        balsamic_cache, balsamic_version, genome_version, "reference.json"
-    )
-    with open(reference_config, "r") as f:
-        reference_dict = json.load(f)["reference"]
-
     variants_observations = {
         "clinical_snv_observations": clinical_snv_observations,
         "clinical_sv_observations": clinical_sv_observations,
@@ -250,15 +442,16 @@ def case_config(
         "swegen_snv_frequency": swegen_snv,
         "swegen_sv_frequency": swegen_sv,
     }
-    reference_dict.update(
-        {
+    reference_dict = {
+        **reference_dict,
+        **{
             observations: path
             for observations, path in variants_observations.items()
             if path is not None
-        }
-    )
+        },
+    }
 
-    config_collection_dict = BalsamicConfigModel(
+    return BalsamicConfigModel(
         QC={
             "quality_trim": quality_trim,
             "adapter_trim": adapter_trim,
@@ -272,26 +465,39 @@ def case_config(
             "analysis_type": "paired" if normal else "single",
             "sequencing_type": "targeted" if panel_bed else "wgs",
             "analysis_workflow": analysis_workflow,
+            "fuse_alignment": fuse_alignment if not panel_bed else False,
+            "storage_mode": storage_mode,
+            "scratch_dir": scratch_dir,
+            "wgs_calling_shards": wgs_calling_shards if not panel_bed else 1,
+            "vep_chunks": vep_chunks if not panel_bed else 1,
+            "annotation_cache": annotation_cache,
         },
         reference=reference_dict,
-        singularity=os.path.join(balsamic_cache, balsamic_version, "containers"),
+        singularity=os.path.join(
+            balsamic_cache, container_version or balsamic_version, "containers"
+        ),
         background_variants=background_variants,
         samples=samples,
         vcf=VCF_DICT,
         bioinfo_tools=BIOINFO_TOOL_ENV,
-        bioinfo_tools_version=get_bioinfo_tools_version(
-            bioinfo_tools=BIOINFO_TOOL_ENV,
-            container_conda_env_path=CONTAINERS_CONDA_ENV_PATH,
-        ),
+        bioinfo_tools_version=bioinfo_tools_version,
         panel={
             "capture_kit": panel_bed,
             "chrom": get_panel_chrom(panel_bed),
+            "vardict_shards": min(
+                vardict_shards,
+                get_panel_region_count(panel_bed, padding=VARDICT_BED_PADDING),
+            ),
             "pon_cnn": pon_cnn,
         }
         if panel_bed
         else None,
     ).dict(by_alias=True, exclude_none=True)
-    LOG.info("Config file generated successfully")
+
+
+def write_case_config(config_collection_dict: dict, casefiles: list) -> str:
+    """Creates the analysis directories of a case, symlinks its fastq files and saves its
+    sample config and DAG graph. Returns the path of the sample config"""
 
     Path.mkdir(
         Path(config_collection_dict["analysis"]["fastq_path"]),
@@ -301,21 +507,29 @@ def case_config(
     LOG.info("Directories created successfully")
 
     create_fastq_symlink(
-        casefiles=(tumor + normal),
+        casefiles=casefiles,
         symlink_dir=Path(config_collection_dict["analysis"]["fastq_path"]),
     )
     LOG.info(f"Symlinks generated successfully")
 
-    config_path = Path(analysis_dir) / case_id / (case_id + ".json")
+    case_id = config_collection_dict["analysis"]["case_id"]
+    config_path = (
+        Path(config_collection_dict["analysis"]["analysis_dir"])
+        / case_id
+        / (case_id + ".json")
+    )
     with open(config_path, "w+") as fh:
         fh.write(json.dumps(config_collection_dict, indent=4))
     LOG.info(f"Config file saved successfully - {config_path}")
 
     try:
-        generate_graph(config_collection_dict, config_path)
+        graph_dot_file = generate_graph(config_collection_dict, config_path)
+        LOG.info(f"DAG graph saved successfully - {graph_dot_file}")
         LOG.info(f"BALSAMIC Workflow has been configured successfully!")
     except ValueError as e:
         LOG.error(
             f'BALSAMIC dag graph generation failed - {config_collection_dict["analysis"]["dag"]}',
         )
         raise click.Abort()
+
+    return config_path.as_posix()
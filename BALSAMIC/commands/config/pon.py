@@ -9,7 +9,7 @@ from BALSAMIC import __version__ as balsamic_version
 from BALSAMIC.utils.cli import (
     create_fastq_symlink,
     generate_graph,
-    get_bioinfo_tools_version,
+    read_bioinfo_tools_version,
     create_pon_fastq_symlink,
 )
 from BALSAMIC.utils.models import PonBalsamicConfigModel
@@ -17,6 +17,7 @@ from BALSAMIC.utils.models import PonBalsamicConfigModel
 from BALSAMIC.constants.common import (
     CONTAINERS_CONDA_ENV_PATH,
     BIOINFO_TOOL_ENV,
+    BIOINFO_TOOLS_VERSION_FILE,
 )
 
 LOG = logging.getLogger(__name__)
@@ -136,7 +137,10 @@ def pon_config(
         reference=reference_dict,
         singularity=os.path.join(balsamic_cache, balsamic_version, "containers"),
         bioinfo_tools=BIOINFO_TOOL_ENV,
-        bioinfo_tools_version=get_bioinfo_tools_version(
+        bioinfo_tools_version=read_bioinfo_tools_version(
+            version_file=Path(
+                balsamic_cache, balsamic_version, BIOINFO_TOOLS_VERSION_FILE
+            ),
             bioinfo_tools=BIOINFO_TOOL_ENV,
             container_conda_env_path=CONTAINERS_CONDA_ENV_PATH,
         ),
@@ -163,7 +167,8 @@ def pon_config(
     LOG.info(f"PON config file saved successfully - {config_path}")
 
     try:
-        generate_graph(config_collection_dict, config_path)
+        graph_dot_file = generate_graph(config_collection_dict, config_path)
+        LOG.info(f"DAG graph saved successfully - {graph_dot_file}")
         LOG.info(f"BALSAMIC PON workflow has been configured successfully!")
     except ValueError:
         LOG.error(
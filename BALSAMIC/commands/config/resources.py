@@ -0,0 +1,127 @@
+import json
+import logging
+from pathlib import Path
+
+import click
+
+from BALSAMIC.constants.common import SEQUENCING_TYPE
+from BALSAMIC.utils.cli import get_config
+from BALSAMIC.utils.exc import BalsamicError
+from BALSAMIC.utils.resources import (
+    collect_benchmarks,
+    get_rule_names,
+    get_rule_resources,
+    tune_cluster_config,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+@click.command(
+    "resources",
+    short_help="Create a cluster config sized from benchmarks of past analyses",
+)
+@click.option(
+    "--analysis-dir",
+    type=click.Path(exists=True, resolve_path=True),
+    required=True,
+    help="Root analysis path directory of past cases.",
+)
+@click.option(
+    "--sequencing-type",
+    type=click.Choice(SEQUENCING_TYPE),
+    required=True,
+    help="Sequencing type of the cases to size resources from.",
+)
+@click.option(
+    "-p",
+    "--panel-bed",
+    type=click.Path(resolve_path=True),
+    required=False,
+    help="Panel bed file. Only cases analysed with a panel of the same name are used.",
+)
+@click.option(
+    "--input-size",
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    help=(
+        "Size in GB of the fastq files to analyse. "
+        "Walltime is scaled from the runtime per GB of past cases."
+    ),
+)
+@click.option(
+    "--percentile",
+    default=95,
+    show_default=True,
+    type=click.FloatRange(min=0, max=100),
+    help="Percentile of the benchmarked resource usage to reserve.",
+)
+@click.option(
+    "--headroom",
+    default=1.2,
+    show_default=True,
+    type=click.FloatRange(min=1),
+    help="Factor applied to the benchmarked cores, memory and walltime.",
+)
+@click.option(
+    "--cluster-config",
+    type=click.Path(exists=True, resolve_path=True),
+    default=get_config("cluster"),
+    show_default=True,
+    help="Cluster config to tune.",
+)
+@click.option(
+    "-o",
+    "--output-config",
+    type=click.Path(resolve_path=True),
+    required=True,
+    help="Output path of the tuned cluster config.",
+)
+def resources_config(
+    analysis_dir,
+    sequencing_type,
+    panel_bed,
+    input_size,
+    percentile,
+    headroom,
+    cluster_config,
+    output_config,
+):
+    """Creates a cluster config with cores, memory and walltime of each rule sized from the
+    benchmark files of past analyses."""
+
+    benchmarks = collect_benchmarks(
+        analysis_dir=analysis_dir, rule_names=get_rule_names()
+    )
+    if not benchmarks.empty:
+        benchmarks = benchmarks[benchmarks["sequencing_type"] == sequencing_type]
+        if panel_bed:
+            benchmarks = benchmarks[benchmarks["panel"] == Path(panel_bed).stem]
+
+    if benchmarks.empty:
+        LOG.error(f"No {sequencing_type} benchmarks found in {analysis_dir}")
+        raise click.Abort()
+
+    try:
+        rule_resources = get_rule_resources(
+            benchmarks=benchmarks,
+            percentile=percentile,
+            headroom=headroom,
+            input_size=input_size,
+        )
+    except BalsamicError as error:
+        LOG.error(f"{error} in {analysis_dir}")
+        raise click.Abort()
+    for rule_name, resources in rule_resources.items():
+        LOG.info(f"{rule_name}: {resources}")
+
+    with open(cluster_config, "r") as f:
+        tuned_config = tune_cluster_config(
+            cluster_config=json.load(f), rule_resources=rule_resources
+        )
+
+    with open(output_config, "w") as f:
+        f.write(json.dumps(tuned_config, indent="\t"))
+    LOG.info(
+        f"Cluster config for {len(rule_resources)} rules saved successfully - {output_config}"
+    )
@@ -6,23 +6,26 @@ import subprocess
 from pathlib import Path
 
 import click
-import graphviz
-import snakemake
 
 from BALSAMIC.constants.common import (
     BIOINFO_TOOL_ENV,
+    BIOINFO_TOOLS_VERSION_FILE,
     BALSAMIC_DOCKER_PATH,
+    CONTAINERS_CONDA_ENV_PATH,
     VALID_CONTAINER_CONDA_NAME,
 )
 from BALSAMIC.utils.cli import (
-    CaptureStdout,
+    get_graph_title,
     get_snakefile,
+    render_graph,
+    write_bioinfo_tools_version,
     SnakeMake,
     get_config,
     get_schedulerpy,
     # job_id_dump_to_yaml,
 )
 from BALSAMIC import __version__ as balsamic_version
+from BALSAMIC.utils.dag import get_rule_graph
 from BALSAMIC.utils.io import write_json
 
 LOG = logging.getLogger(__name__)
@@ -241,6 +244,17 @@ def initialize(
     rule_directory = Path(__file__).parents[2]
 
     config_dict["bioinfo_tools"] = BIOINFO_TOOL_ENV
+    bioinfo_tools_version_file = Path(
+        outdir, balsamic_version, BIOINFO_TOOLS_VERSION_FILE
+    ).as_posix()
+    write_bioinfo_tools_version(
+        version_file=bioinfo_tools_version_file,
+        bioinfo_tools=BIOINFO_TOOL_ENV,
+        container_conda_env_path=CONTAINERS_CONDA_ENV_PATH,
+    )
+    LOG.info(
+        "Bioinfo tool versions saved successfully - %s" % bioinfo_tools_version_file
+    )
     config_dict["rule_directory"] = rule_directory.as_posix() + "/"
 
     reference_outdir = Path(outdir, balsamic_version, genome_version)
@@ -271,28 +285,22 @@ def initialize(
         else get_snakefile("generate_ref", "balsamic", genome_version)
     )
 
-    with CaptureStdout() as graph_dot:
-        snakemake.snakemake(
+    try:
+        graph_dot = get_rule_graph(
             snakefile=snakefile,
-            dryrun=True,
-            configfiles=[config_json],
-            printrulegraph=True,
+            sample_config=config_json,
+            variant={"analysis_type": "generate_ref", "genome_version": genome_version},
+            cache_dir=reference_outdir,
         )
+    except ValueError:
+        LOG.error("Reference workflow could not be resolved")
+        raise click.Abort()
 
     graph_title = "_".join(["BALSAMIC", balsamic_version, "Generate reference"])
-    graph_dot = "".join(graph_dot).replace(
-        "snakemake_dag {", 'BALSAMIC { label="' + graph_title + '";labelloc="t";'
+    graph_pdf = dagfile_path + ".pdf"
+    Path(graph_pdf).with_suffix(".dot").write_text(
+        get_graph_title(graph_dot, graph_title)
     )
-    graph_obj = graphviz.Source(
-        graph_dot, filename=dagfile_path, format="pdf", engine="dot"
-    )
-
-    try:
-        graph_pdf = graph_obj.render()
-        LOG.info("Reference workflow graph generated successfully - %s " % graph_pdf)
-    except Exception:
-        LOG.error("Reference workflow graph generation failed")
-        raise click.Abort()
 
     LOG.info("Reference generation workflow started")
 
@@ -330,3 +338,10 @@ def initialize(
 
     cmd = sys.executable + " -m " + balsamic_run.build_cmd()
     subprocess.run(cmd, shell=True)
+
+    # The graph is rendered once the workflow command has returned, not before it
+    try:
+        graph_pdf = render_graph(graph_pdf)
+        LOG.info("Reference workflow graph generated successfully - %s " % graph_pdf)
+    except Exception:
+        LOG.warning("Reference workflow graph generation failed - %s" % graph_pdf)
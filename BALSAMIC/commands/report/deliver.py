@@ -12,6 +12,7 @@ from BALSAMIC.utils.cli import get_file_extension
 from BALSAMIC.utils.cli import get_snakefile
 from BALSAMIC.utils.cli import SnakeMake
 from BALSAMIC.utils.cli import convert_deliverables_tags
+from BALSAMIC.utils.cli import render_graph
 from BALSAMIC.utils.io import write_json
 from BALSAMIC.utils.rule import get_result_dir
 from BALSAMIC.constants.workflow_params import VCF_DICT
@@ -51,6 +52,13 @@ LOG = logging.getLogger(__name__)
     help=f"Run workflow with selected variant caller(s) disable. Use comma to remove multiple variant callers. Valid "
     f"values are: {list(VCF_DICT.keys())}",
 )
+@click.option(
+    "--allow-missing-graph",
+    is_flag=True,
+    default=False,
+    help="Deliver the case without the DAG graph if it can not be rendered, listing "
+    "it under missing_files in the delivery report",
+)
 @click.pass_context
 def deliver(
     context,
@@ -58,6 +66,7 @@ def deliver(
     rules_to_deliver,
     delivery_mode,
     disable_variant_caller,
+    allow_missing_graph,
 ):
     """
     cli for deliver sub-command.
@@ -161,16 +170,28 @@ def deliver(
             "id": case_name,
         }
     )
-    # Add DAG Graph to report
-    delivery_json["files"].append(
-        {
-            "path": sample_config_dict["analysis"]["dag"],
-            "step": "case_config",
-            "format": get_file_extension(sample_config_dict["analysis"]["dag"]),
-            "tag": ["balsamic-dag"],
-            "id": case_name,
-        }
-    )
+    # Add DAG Graph to report, rendered on first delivery
+    dag_file = {
+        "path": sample_config_dict["analysis"]["dag"],
+        "step": "case_config",
+        "format": get_file_extension(sample_config_dict["analysis"]["dag"]),
+        "tag": ["balsamic-dag"],
+        "id": case_name,
+    }
+    try:
+        graph_pdf = render_graph(sample_config_dict["analysis"]["dag"])
+        LOG.info(f"DAG graph {graph_pdf}")
+        delivery_json["files"].append(dag_file)
+    except Exception:
+        if not allow_missing_graph:
+            LOG.error(
+                f'BALSAMIC dag graph generation failed - {sample_config_dict["analysis"]["dag"]}'
+            )
+            raise click.Abort()
+        LOG.warning(
+            f'BALSAMIC dag graph generation failed, delivering without it - {sample_config_dict["analysis"]["dag"]}'
+        )
+        delivery_json["missing_files"] = [dag_file]
 
     write_json(delivery_json, delivery_file_name)
     with open(delivery_file_name + ".yaml", "w") as fn:
@@ -1,6 +1,7 @@
 import os
 import logging
 import json
+
 import click
 import snakemake
 
@@ -8,9 +9,20 @@ from pathlib import Path
 from colorclass import Color
 
 from BALSAMIC.utils.cli import get_snakefile
-from BALSAMIC.utils.cli import CaptureStdout
 from BALSAMIC.utils.cli import get_file_status_string
+from BALSAMIC.utils.cli import get_latest_job_ledger
+from BALSAMIC.utils.scheduler import read_job_ledger
+from BALSAMIC.utils.dag import get_dag, get_rule_outputs
 from BALSAMIC.utils.rule import get_result_dir
+from BALSAMIC.utils.status import (
+    JOB_STATES,
+    STATUS_CACHE,
+    get_existing_files,
+    get_job_states,
+    get_rule_job_states,
+    read_status_cache,
+    write_status_cache,
+)
 
 LOG = logging.getLogger(__name__)
 
@@ -41,8 +53,20 @@ LOG = logging.getLogger(__name__)
     show_default=True,
     help="Print list of files. Otherwise only final count will be printed.",
 )
+@click.option(
+    "-j",
+    "--show-jobs",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help=(
+        "Show the state of submitted jobs and outputs per rule. Job states are polled "
+        "from the job ledger and workflow outputs are cached per case, so that running "
+        "analyses are reported without rebuilding the workflow."
+    ),
+)
 @click.pass_context
-def status(context, sample_config, show_only_missing, print_files):
+def status(context, sample_config, show_only_missing, print_files, show_jobs):
     """
     cli for status sub-command.
     """
@@ -57,6 +81,10 @@ def status(context, sample_config, show_only_missing, print_files):
     reference_genome = sample_config_dict["reference"]["reference_genome"]
     snakefile = get_snakefile(analysis_type, analysis_workflow, reference_genome)
 
+    if show_jobs:
+        job_status(sample_config, sample_config_dict, snakefile)
+        return
+
     if os.path.isfile(os.path.join(result_dir, "analysis_finish")):
         snakemake.snakemake(
             snakefile=snakefile,
@@ -72,24 +100,25 @@ def status(context, sample_config, show_only_missing, print_files):
             "analysis_finish file is missing. Analysis might be incomplete or running."
         )
 
-    with CaptureStdout() as summary:
-        snakemake.snakemake(
-            snakefile=snakefile,
-            dryrun=True,
-            summary=True,
-            configfiles=[sample_config],
-            quiet=True,
+    dag = get_dag(snakefile=snakefile, sample_config=sample_config)
+    output_files = list(
+        dict.fromkeys(
+            output_file for job in dag["jobs"] for output_file in job["output"]
         )
-    summary = [i.split("\t") for i in summary]
-    summary_dict = [dict(zip(summary[0], value)) for value in summary[1:]]
+    )
+
+    status_cache_file = Path(Path(sample_config).parent, STATUS_CACHE).as_posix()
+    status_cache = read_status_cache(status_cache_file)
+    found_files = get_existing_files(output_files, status_cache["directories"])
+    write_status_cache(status_cache_file, status_cache)
 
     existing_files = set()
     missing_files = set()
 
-    for entries in summary_dict:
-        delivery_file = entries["output_file"]
-
-        file_status_str, file_status = get_file_status_string(delivery_file)
+    for delivery_file in output_files:
+        file_status_str, file_status = get_file_status_string(
+            delivery_file, file_exists=delivery_file in found_files
+        )
         if file_status and print_files:
             click.echo(file_status_str)
 
@@ -101,8 +130,61 @@ def status(context, sample_config, show_only_missing, print_files):
         if not file_status:
             missing_files.add(delivery_file)
 
+    echo_final_tally(existing_files, missing_files)
+
+
+def echo_final_tally(existing_files, missing_files):
+    """Prints the number of finished and missing files"""
+
     finish_file_count = "Finished file count: {}".format(len(existing_files))
     missing_file_count = "Missing file count: {}".format(len(missing_files))
     click.echo(Color("{yellow}Final tally:{/yellow}"))
     click.echo(Color("{yellow}\t" + finish_file_count + "{/yellow}"))
     click.echo(Color("{yellow}\t" + missing_file_count + "{/yellow}"))
+
+
+def job_status(sample_config, sample_config_dict, snakefile):
+    """Prints the state of submitted jobs and outputs per rule of a case.
+
+    Jobs are read from the job ledger and polled with a single sacct call. Outputs are
+    read from the cached workflow of the case.
+    """
+
+    rule_outputs = get_rule_outputs(
+        get_dag(snakefile=snakefile, sample_config=sample_config)
+    )
+
+    job_records = []
+    job_ledger = get_latest_job_ledger(
+        log_dir=sample_config_dict["analysis"]["log"],
+        case_id=sample_config_dict["analysis"]["case_id"],
+    )
+    if job_ledger:
+        job_records = read_job_ledger(job_ledger)
+    else:
+        LOG.warning("No job ledger found. Analysis might not be submitted yet.")
+    rule_job_states = get_rule_job_states(job_records, get_job_states(job_records))
+
+    output_files = {
+        output_file for outputs in rule_outputs.values() for output_file in outputs
+    }
+    status_cache_file = Path(Path(sample_config).parent, STATUS_CACHE).as_posix()
+    status_cache = read_status_cache(status_cache_file)
+    existing_files = get_existing_files(output_files, status_cache["directories"])
+    write_status_cache(status_cache_file, status_cache)
+
+    click.echo(Color("{yellow}Job status per rule:{/yellow}"))
+    for rule_name in sorted(set(rule_outputs) | set(rule_job_states)):
+        job_states = rule_job_states.get(rule_name, {})
+        job_states_str = ", ".join(
+            f"{state} {job_states[state]}"
+            for state in JOB_STATES
+            if job_states.get(state)
+        )
+        outputs = rule_outputs.get(rule_name, [])
+        click.echo(
+            f"\t{rule_name}: {job_states_str or 'no jobs'}, "
+            f"files {len(existing_files.intersection(outputs))}/{len(outputs)}"
+        )
+
+    echo_final_tally(existing_files, output_files - existing_files)
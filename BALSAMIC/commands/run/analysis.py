@@ -16,8 +16,10 @@ from BALSAMIC.utils.cli import (
     SnakeMake,
     get_config,
     get_fastq_bind_path,
+    get_scratch_bind_path,
     job_id_dump_to_yaml,
 )
+from BALSAMIC.utils.scheduler import get_job_ledger_path
 from BALSAMIC.constants.common import ANALYSIS_TYPES, BALSAMIC_SCRIPTS
 from BALSAMIC.constants.workflow_params import VCF_DICT
 
@@ -145,6 +147,23 @@ LOG = logging.getLogger(__name__)
         "be applied to all jobs and override snakemake settings."
     ),
 )
+@click.option(
+    "--group-jobs",
+    default=False,
+    is_flag=True,
+    help=(
+        "Submit chained jobs of short rules as one cluster job. "
+        "Rules are bundled according to their group in the cluster config."
+    ),
+)
+@click.option(
+    "--max-jobs-per-second",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Maximum number of cluster jobs submitted per second. "
+        "Passed to snakemake, which otherwise limits submissions to 10 jobs per second."
+    ),
+)
 @click.option(
     "--disable-variant-caller",
     help=(
@@ -172,6 +191,8 @@ def analysis(
     quiet,
     dragen,
     benchmark,
+    max_jobs_per_second,
+    group_jobs,
 ):
     """
     Runs BALSAMIC workflow on the provided sample's config file
@@ -232,6 +253,13 @@ def analysis(
     bind_path.append(BALSAMIC_SCRIPTS)
     bind_path.append(sample_config["analysis"]["analysis_dir"])
     bind_path.extend(get_fastq_bind_path(sample_config["analysis"]["fastq_path"]))
+    bind_path.extend(
+        get_scratch_bind_path(sample_config["analysis"].get("scratch_dir"))
+    )
+    if sample_config["analysis"].get("annotation_cache"):
+        bind_path.append(
+            Path(sample_config["analysis"]["annotation_cache"]).parent.as_posix()
+        )
 
     # Construct snakemake command to run workflow
     balsamic_run = SnakeMake()
@@ -249,6 +277,7 @@ def analysis(
     )
     balsamic_run.configfile = sample_config_path
     balsamic_run.run_mode = run_mode
+    balsamic_run.keep_temp = sample_config["analysis"].get("storage_mode") != "cram"
     balsamic_run.cluster_config = cluster_config
     balsamic_run.scheduler = get_schedulerpy()
     balsamic_run.profile = profile
@@ -269,6 +298,8 @@ def analysis(
     balsamic_run.sm_opt = snakemake_opt
     if benchmark and profile == "slurm":
         balsamic_run.slurm_profiler = "task"
+    balsamic_run.max_jobs_per_second = max_jobs_per_second
+    balsamic_run.group_jobs = group_jobs
 
     if disable_variant_caller:
         balsamic_run.disable_variant_caller = disable_variant_caller
@@ -280,8 +311,6 @@ def analysis(
     subprocess.run(cmd, shell=True)
 
     if run_analysis and run_mode == "cluster":
-        jobid_dump = os.path.join(
-            logpath, sample_config["analysis"]["case_id"] + ".sacct"
-        )
+        job_ledger = get_job_ledger_path(logpath, case_name)
         jobid_yaml = os.path.join(resultpath, profile + "_jobids.yaml")
-        job_id_dump_to_yaml(jobid_dump, jobid_yaml, case_name)
+        job_id_dump_to_yaml(job_ledger, jobid_yaml, case_name)
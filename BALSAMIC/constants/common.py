@@ -15,6 +15,12 @@ BALSAMIC_SCRIPTS = Path(BALSAMIC_BASE_DIR, "assets/scripts").as_posix()
 # Path to containers directory containing YAML files for conda installation for each one
 CONTAINERS_CONDA_ENV_PATH = Path(BALSAMIC_BASE_DIR / "containers").as_posix()
 
+# Precomputed bioinfo tool versions, stored per BALSAMIC version in the BALSAMIC cache
+BIOINFO_TOOLS_VERSION_FILE = "bioinfo_tools_version.json"
+
+# Number of fastq symlinks created concurrently
+FASTQ_SYMLINK_WORKERS = 16
+
 # Path to rule files to be accessed by Snakemake
 RULE_DIRECTORY = BALSAMIC_BASE_DIR.as_posix()
 
@@ -33,6 +39,11 @@ GENDER_OPTIONS = ["female", "male"]
 ANALYSIS_TYPES = ["paired", "single", "pon"]
 ANALYSIS_WORKFLOW = ["balsamic", "balsamic-qc", "balsamic-umi"]
 SEQUENCING_TYPE = ["wgs", "targeted"]
+STORAGE_MODES = ["bam", "cram"]
+
+# Padding of the panel regions called by vardict and default number of vardict shards
+VARDICT_BED_PADDING = 100
+VARDICT_SHARDS = 24
 MUTATION_CLASS = ["somatic", "germline"]
 MUTATION_TYPE = ["SNV", "SV", "CNV"]
 WORKFLOW_SOLUTION = ["BALSAMIC", "Sentieon", "DRAGEN", "Sentieon_umi"]
@@ -73,6 +84,7 @@ BIOINFO_TOOL_ENV = {
     "vardict": "varcall_py3",
     "svdb": "varcall_py3",
     "tiddit": "varcall_py3",
+    "pysam": "varcall_py3",
     "cnvpytor": "cnvpytor",
     "manta": "varcall_py27",
     "cnvkit": "varcall_cnvkit",
@@ -83,6 +95,9 @@ BIOINFO_TOOL_ENV = {
     "somalier": "somalier",
 }
 
+# Fraction of the memory of a cluster job given to the JVM heap of its rule
+JAVA_HEAP_FRACTION = 0.8
+
 VALID_OPS = {
     "lt": operator.lt,
     "le": operator.le,
@@ -112,13 +112,28 @@ WORKFLOW_PARAMS = {
     "common": {
         "pcr_model": "NONE",
         "align_header": "'@RG\\tID:{sample}\\tSM:{sample}\\tPL:ILLUMINAi'",
+        "align_header_merged": "'@RG\\tID:{sample_type}\\tSM:{sample_type}\\tPL:ILLUMINAi\\tLB:ILLUMINAi\\tPU:ILLUMINAi'",
         "min_mapq": "20",
+        "merge_RG_normal": " ".join(
+            [
+                "--rg_id NORMAL",
+                "--rg_tag PU:ILLUMINAi",
+                "--rg_tag PL:ILLUMINAi",
+                "--rg_tag LB:ILLUMINAi",
+            ]
+        ),
+        "merge_RG_tumor": " ".join(
+            [
+                "--rg_id TUMOR",
+                "--rg_tag PU:ILLUMINAi",
+                "--rg_tag PL:ILLUMINAi",
+                "--rg_tag LB:ILLUMINAi",
+            ]
+        ),
         "picard_fixmate": " ".join(
             [
                 "-ADD_MATE_CIGAR true",
                 "-MAX_RECORDS_IN_RAM 10000000",
-                "-CREATE_INDEX true",
-                "-CREATE_MD5_FILE true",
             ]
         ),
         "picard_RG_normal": " ".join(
@@ -91,6 +91,7 @@ SNAKEMAKE_RULES = {
         "varcall": [
             "snakemake_rules/variant_calling/sentieon_germline.rule",
             "snakemake_rules/variant_calling/sentieon_split_snv_sv.rule",
+            "snakemake_rules/variant_calling/split_wgs_calling_interval.rule",
             "snakemake_rules/variant_calling/sentieon_t_varcall.rule",
             "snakemake_rules/variant_calling/somatic_sv_tumor_only.rule",
             "snakemake_rules/dragen_suite/dragen_dna.rule",
@@ -111,6 +112,7 @@ SNAKEMAKE_RULES = {
         "varcall": [
             "snakemake_rules/variant_calling/sentieon_germline.rule",
             "snakemake_rules/variant_calling/sentieon_split_snv_sv.rule",
+            "snakemake_rules/variant_calling/split_wgs_calling_interval.rule",
             "snakemake_rules/variant_calling/sentieon_tn_varcall.rule",
             "snakemake_rules/variant_calling/somatic_sv_tumor_normal.rule",
         ],
@@ -121,6 +123,14 @@ SNAKEMAKE_RULES = {
     },
 }
 
+# Rules replaced when the WGS alignment is fused, the fused alignment rules also merge the
+# tumor and normal bam
+FUSED_ALIGNMENT_RULES = {
+    "snakemake_rules/align/sentieon_alignment.rule": "snakemake_rules/align/sentieon_alignment_fused.rule",
+    "snakemake_rules/variant_calling/mergetype_tumor.rule": None,
+    "snakemake_rules/variant_calling/mergetype_normal.rule": None,
+}
+
 
 DELIVERY_RULES = [
     # QC
@@ -0,0 +1,273 @@
+"""BED file utils, holding the regions of each contig as sorted NumPy arrays"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Lines of a BED file that are not regions
+BED_HEADER_PREFIXES = ("#", "track", "browser")
+
+
+def read_bed(bed_file: str) -> Dict[str, np.ndarray]:
+    """Parses a BED file in a single pass.
+
+    Returns:
+        regions: dict of contig to an array of shape (n, 2) of the start and end of its
+            regions, sorted by start and end
+    """
+
+    contig_regions = {}
+    with open(bed_file, "r") as bed:
+        for line in bed:
+            if not line.strip() or line.startswith(BED_HEADER_PREFIXES):
+                continue
+            contig, start, end = line.split("\t", 3)[:3]
+            contig_regions.setdefault(contig, []).append((int(start), int(end)))
+
+    return sort_regions(contig_regions)
+
+
+def read_interval_list(interval_file: str) -> Dict[str, np.ndarray]:
+    """Parses a Picard interval list, with 1-based closed intervals, into BED regions"""
+
+    contig_regions = {}
+    with open(interval_file, "r") as intervals:
+        for line in intervals:
+            if not line.strip() or line.startswith("@"):
+                continue
+            contig, start, end = line.split("\t", 3)[:3]
+            contig_regions.setdefault(contig, []).append((int(start) - 1, int(end)))
+
+    return sort_regions(contig_regions)
+
+
+def sort_regions(contig_regions: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """Returns the (start, end) regions of each contig as an array sorted by start and end"""
+
+    regions = {}
+    for contig, contig_region_list in contig_regions.items():
+        contig_array = np.array(contig_region_list, dtype=np.int64)
+        regions[contig] = contig_array[
+            np.lexsort((contig_array[:, 1], contig_array[:, 0]))
+        ]
+
+    return regions
+
+
+def read_fasta_index(fai_file: str) -> Dict[str, int]:
+    """Returns the lengths of the contigs of a FASTA index, in reference order"""
+
+    contig_sizes = {}
+    with open(fai_file, "r") as fai:
+        for line in fai:
+            if line.strip():
+                contig, length = line.split("\t", 2)[:2]
+                contig_sizes[contig] = int(length)
+
+    return contig_sizes
+
+
+def read_chrom_sizes(chrom_sizes_file: str) -> Dict[str, int]:
+    """Returns the sizes of the contigs of a chrom sizes file, without the chr prefix of
+    their names and leaving out alternative contigs"""
+
+    chrom_sizes = {}
+    with open(chrom_sizes_file, "r") as chrom_sizes_fn:
+        for line in chrom_sizes_fn:
+            if not line.strip():
+                continue
+            contig, size = line.split()[:2]
+            if "_" in contig:
+                continue
+            chrom_sizes[contig[3:] if contig.startswith("chr") else contig] = int(size)
+
+    return chrom_sizes
+
+
+def slop_regions(
+    regions: Dict[str, np.ndarray],
+    padding: int,
+    chrom_sizes: Optional[Dict[str, int]] = None,
+) -> Dict[str, np.ndarray]:
+    """Returns the regions flanked by padding on both sides, clipped to the contig
+    boundaries, as bedtools slop"""
+
+    padded_regions = {}
+    for contig, contig_regions in regions.items():
+        padded = contig_regions + np.array([-padding, padding], dtype=np.int64)
+        max_end = (chrom_sizes or {}).get(contig, np.iinfo(np.int64).max)
+        padded_regions[contig] = np.clip(padded, 0, max_end)
+
+    return padded_regions
+
+
+def merge_regions(regions: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Returns the overlapping and book-ended regions merged, as bedtools merge"""
+
+    merged_regions = {}
+    for contig, contig_regions in regions.items():
+        if not len(contig_regions):
+            merged_regions[contig] = contig_regions
+            continue
+        starts, ends = contig_regions[:, 0], contig_regions[:, 1]
+        max_ends = np.maximum.accumulate(ends)
+        first = np.concatenate(([True], starts[1:] > max_ends[:-1]))
+        last = np.concatenate((first[1:], [True]))
+        merged_regions[contig] = np.column_stack((starts[first], max_ends[last]))
+
+    return merged_regions
+
+
+def get_region_count(regions: Dict[str, np.ndarray]) -> int:
+    """Returns the number of regions of all contigs"""
+
+    return sum(len(contig_regions) for contig_regions in regions.values())
+
+
+def split_regions(
+    regions: Dict[str, np.ndarray],
+    shards: int,
+    contigs: Optional[List[str]] = None,
+    weights: Optional[Dict[str, np.ndarray]] = None,
+) -> List[Dict[str, np.ndarray]]:
+    """Splits regions into shards of about equal bases, or weights if given per region,
+    in order of contigs, by default sorted by name, and start.
+
+    Regions are kept whole and assigned to the shard their midpoint falls in, without
+    skipping a shard and keeping a region for each of the remaining shards. Shards are
+    empty only if there are fewer regions than shards.
+    """
+
+    contigs = [contig for contig in (contigs or sorted(regions)) if contig in regions]
+    region_contigs = np.repeat(
+        np.arange(len(contigs)), [len(regions[contig]) for contig in contigs]
+    )
+    all_regions = (
+        np.concatenate([regions[contig] for contig in contigs])
+        if contigs
+        else np.empty((0, 2), dtype=np.int64)
+    )
+    region_count = len(all_regions)
+    lengths = (
+        np.concatenate([weights[contig] for contig in contigs])
+        if weights and contigs
+        else all_regions[:, 1] - all_regions[:, 0]
+    )
+    total = max(int(lengths.sum()), 1)
+    midpoints = np.cumsum(lengths) - lengths / 2
+
+    index = np.arange(region_count)
+    region_shards = np.minimum(
+        (midpoints * shards // total).astype(np.int64), shards - 1
+    )
+    region_shards = np.maximum(region_shards, shards - region_count + index)
+    region_shards = index + np.minimum(np.minimum.accumulate(region_shards - index), 0)
+
+    return [
+        {
+            contigs[contig_index]: all_regions[
+                (region_shards == shard) & (region_contigs == contig_index)
+            ]
+            for contig_index in np.unique(region_contigs[region_shards == shard])
+        }
+        for shard in range(shards)
+    ]
+
+
+def write_bed(regions: Dict[str, np.ndarray], bed_file: str) -> None:
+    """Writes regions to a BED file, in order of contig name and start"""
+
+    with open(bed_file, "w") as bed:
+        for contig in sorted(regions):
+            for start, end in regions[contig]:
+                bed.write(f"{contig}\t{start}\t{end}\n")
+
+
+def write_bed_shards(
+    bed_file: str,
+    shard_files: List[str],
+    padding: int = 0,
+    chrom_sizes_file: Optional[str] = None,
+) -> None:
+    """Pads and merges the regions of a BED file and writes them split into shards of
+    about equal bases, one BED file per shard"""
+
+    chrom_sizes = read_chrom_sizes(chrom_sizes_file) if chrom_sizes_file else None
+    regions = merge_regions(slop_regions(read_bed(bed_file), padding, chrom_sizes))
+    for shard_regions, shard_file in zip(
+        split_regions(regions, len(shard_files)), shard_files
+    ):
+        Path(shard_file).parent.mkdir(parents=True, exist_ok=True)
+        write_bed(shard_regions, shard_file)
+
+
+def split_genome(
+    regions: Dict[str, np.ndarray],
+    contig_sizes: Dict[str, int],
+    shards: int,
+    weights: Optional[Dict[str, np.ndarray]] = None,
+) -> List[List[Tuple[str, int, int]]]:
+    """Splits a genome into consecutive shards of about equal bases, or weights, of regions.
+
+    Shards are cut at the start of a region and cover all contigs of contig_sizes in
+    their order, so that calls of the shards can be merged in reference order.
+
+    Returns:
+        genome_shards: list of the (contig, start, end) regions of each shard
+    """
+
+    contigs = list(contig_sizes)
+    shard_regions = split_regions(regions, shards, contigs=contigs, weights=weights)
+    if any(not shard for shard in shard_regions):
+        raise ValueError(f"Fewer regions than the {shards} shards to split them into")
+
+    cuts = [(0, 0)]
+    for shard in shard_regions[1:]:
+        first_contig = min(shard, key=contigs.index)
+        cuts.append((contigs.index(first_contig), int(shard[first_contig][0, 0])))
+    cuts.append((len(contigs), 0))
+
+    genome_shards = []
+    for (start_index, start), (end_index, end) in zip(cuts[:-1], cuts[1:]):
+        shard = []
+        for contig_index in range(start_index, min(end_index, len(contigs) - 1) + 1):
+            contig = contigs[contig_index]
+            contig_start = start if contig_index == start_index else 0
+            contig_end = end if contig_index == end_index else contig_sizes[contig]
+            if contig_end > contig_start:
+                shard.append((contig, contig_start, contig_end))
+        genome_shards.append(shard)
+
+    return genome_shards
+
+
+def get_genome_shards(
+    regions: Dict[str, np.ndarray], contig_sizes: Dict[str, int], shards: int
+) -> List[str]:
+    """Splits a genome into consecutive shards of about equal bases of regions.
+
+    Returns:
+        genome_shards: list of the regions of each shard, as comma separated 1-based
+            contig:start-end regions
+    """
+
+    return [
+        ",".join(f"{contig}:{start + 1}-{end}" for contig, start, end in shard)
+        for shard in split_genome(regions, contig_sizes, shards)
+    ]
+
+
+def write_genome_shards(
+    interval_file: str, fai_file: str, shard_files: List[str]
+) -> None:
+    """Splits the genome into shards of about equal bases of the intervals of a Picard
+    interval list and writes the regions of each shard to its file"""
+
+    genome_shards = get_genome_shards(
+        read_interval_list(interval_file), read_fasta_index(fai_file), len(shard_files)
+    )
+    for genome_shard, shard_file in zip(genome_shards, shard_files):
+        Path(shard_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(shard_file, "w") as shard:
+            shard.write(genome_shard + "\n")
@@ -1,15 +1,17 @@
 import os
+import json
 import shutil
 import logging
 import sys
 import collections
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from io import StringIO
 from distutils.spawn import find_executable
 import zlib
-from typing import List
+from typing import List, Optional
 
 import yaml
 import snakemake
@@ -17,7 +19,11 @@ import graphviz
 from colorclass import Color
 
 from BALSAMIC import __version__ as balsamic_version
+from BALSAMIC.constants.common import FASTQ_SYMLINK_WORKERS
+from BALSAMIC.utils.bed import get_region_count, merge_regions, read_bed, slop_regions
+from BALSAMIC.utils.dag import get_dag, get_rule_graph, get_workflow_variant
 from BALSAMIC.utils.exc import BalsamicError
+from BALSAMIC.utils.scheduler import JOB_LEDGER_SUFFIX, read_job_ledger
 
 LOG = logging.getLogger(__name__)
 
@@ -65,6 +71,9 @@ class SnakeMake:
     disable_variant_caller - Disable variant caller
     dragen          - enable/disable dragen suite
     slurm_profiler  - enable slurm profiler
+    max_jobs_per_second - rate of cluster job submissions (snakemake default is 10)
+    group_jobs      - bundle rules with a group hint in cluster config into one cluster job
+    keep_temp       - keep temp() outputs with '--notemp', always set for cluster runs
     """
 
     def __init__(self):
@@ -94,6 +103,9 @@ class SnakeMake:
         self.disable_variant_caller = str()
         self.dragen = False
         self.slurm_profiler = str()
+        self.max_jobs_per_second = None
+        self.group_jobs = False
+        self.keep_temp = True
 
     def build_cmd(self):
         forceall = str()
@@ -107,6 +119,12 @@ class SnakeMake:
         if self.forceall:
             forceall = "--forceall"
 
+        # Jobs submitted with --immediate-submit are finished for snakemake once
+        # submitted, their temp() inputs would be removed before they are read
+        notemp = str()
+        if self.keep_temp or self.run_mode == "cluster":
+            notemp = "--notemp"
+
         if self.report:
             report = "--report {}".format(self.report)
 
@@ -174,11 +192,38 @@ class SnakeMake:
                 )
             )
 
+            if self.max_jobs_per_second:
+                cluster_cmd += " --max-jobs-per-second {} ".format(
+                    self.max_jobs_per_second
+                )
+
+            rule_groups = (
+                get_rule_groups(self.cluster_config) if self.group_jobs else {}
+            )
+            if rule_groups:
+                cluster_cmd += " --groups {} ".format(
+                    " ".join(
+                        "{}={}".format(rule_name, group)
+                        for rule_name, group in rule_groups.items()
+                    )
+                )
+
+            group_components = (
+                get_group_components(self.cluster_config) if self.group_jobs else {}
+            )
+            if group_components:
+                cluster_cmd += " --group-components {} ".format(
+                    " ".join(
+                        "{}={}".format(group, components)
+                        for group, components in group_components.items()
+                    )
+                )
+
         # Merge snakmake config key value list
         snakemake_config_key_value = " ".join(snakemake_config_key_value)
 
         sm_cmd = (
-            f" snakemake --notemp -p "
+            f" snakemake {notemp} -p "
             f" --directory {self.working_dir} --snakefile {self.snakefile} --configfiles {self.configfile} "
             f" {self.cluster_config} {self.singularity_arg} {quiet_mode} "
             f" {forceall} {dryrun} {cluster_cmd} "
@@ -279,6 +324,40 @@ def get_config(config_name):
         raise FileNotFoundError(f"Config for {config_name} was not found.")
 
 
+def get_rule_groups(cluster_config: str) -> dict:
+    """Returns rules with a group hint in cluster config, mapped to their group name.
+
+    Snakemake submits chained jobs of rules in the same group as a single cluster job,
+    using the cluster config entry of the group name.
+    """
+
+    with open(cluster_config, "r") as f:
+        cluster_config_dict = json.load(f)
+
+    return {
+        rule_name: rule_config["group"]
+        for rule_name, rule_config in cluster_config_dict.items()
+        if "group" in rule_config
+    }
+
+
+def get_group_components(cluster_config: str) -> dict:
+    """Returns groups with a components hint in cluster config, mapped to their components.
+
+    Independent jobs of a group, e.g. the per chromosome jobs of a scatter rule, are
+    bundled up to the given number of components into a single cluster job.
+    """
+
+    with open(cluster_config, "r") as f:
+        cluster_config_dict = json.load(f)
+
+    return {
+        group: group_config["components"]
+        for group, group_config in cluster_config_dict.items()
+        if "components" in group_config
+    }
+
+
 def recursive_default_dict():
     """
     Recursivly create defaultdict.
@@ -350,15 +429,16 @@ def get_from_two_key(input_dict, from_key, by_key, by_value, default=None):
     return matching_value
 
 
-def get_file_status_string(file_to_check):
+def get_file_status_string(file_to_check, file_exists=None):
     """
     Checks if file exsits. and returns a string with checkmark or redcorss mark
     if it exists or doesn't exist respectively.
     Always assume file doesn't exist, unless proven otherwise.
+    If file_exists is given, the file is not checked again.
     """
     return_str = Color("[{red}\u2717{/red}] File missing: ") + file_to_check
 
-    file_status = os.path.isfile(file_to_check)
+    file_status = os.path.isfile(file_to_check) if file_exists is None else file_exists
     if file_status:
         return_str = Color("[{green}\u2713{/green}] Found: ") + file_to_check
 
@@ -412,8 +492,13 @@ def validate_fastq_pattern(sample):
 def get_panel_chrom(panel_bed) -> list:
     """Returns a set of chromosomes present in PANEL BED"""
 
-    lines = [line.rstrip("\n") for line in open(panel_bed, "r")]
-    return {s.split("\t")[0] for s in lines}
+    return set(read_bed(panel_bed))
+
+
+def get_panel_region_count(panel_bed, padding: int = 0) -> int:
+    """Returns the number of regions of a PANEL BED after padding and merging them"""
+
+    return get_region_count(merge_regions(slop_regions(read_bed(panel_bed), padding)))
 
 
 def bioinfo_tool_version_non_conda(packages: dict, bioinfo_tools: dict) -> dict:
@@ -466,8 +551,8 @@ def bioinfo_tool_version_conda(
         if name not in bioinfo_tools:
             continue
         if name in conda_bioinfo_version:
-            conda_bioinfo_version[name].append(version)
-            conda_bioinfo_version[name] = list(set(conda_bioinfo_version[name]))
+            if version not in conda_bioinfo_version[name]:
+                conda_bioinfo_version[name].append(version)
         else:
             conda_bioinfo_version[name] = list([version])
 
@@ -513,24 +598,123 @@ def get_bioinfo_tools_version(
     return bioinfo_tools_version
 
 
+def get_bioinfo_tools_version_key(
+    bioinfo_tools: dict, container_conda_env_path: os.PathLike
+) -> dict:
+    """Returns the values the bioinfo tool versions are parsed from. Container YAML files
+    are identified by their size and modification time, so that they are not read"""
+
+    container_files = {}
+    for container_conda_env_name in sorted(set(bioinfo_tools.values())):
+        yaml_stat = Path(
+            container_conda_env_path,
+            container_conda_env_name,
+            container_conda_env_name + ".yaml",
+        ).stat()
+        container_files[container_conda_env_name] = [
+            yaml_stat.st_size,
+            yaml_stat.st_mtime_ns,
+        ]
+
+    return {
+        "balsamic_version": balsamic_version,
+        "bioinfo_tools": bioinfo_tools,
+        "container_files": container_files,
+    }
+
+
+def write_bioinfo_tools_version(
+    version_file: os.PathLike,
+    bioinfo_tools: dict,
+    container_conda_env_path: os.PathLike,
+) -> dict:
+    """Parses the bioinfo tool versions and stores them in version_file.
+
+    Returns:
+        bioinfo_tools_version: dict. Dictionary of bioinfo tools as key and version as value
+    """
+
+    bioinfo_tools_version = get_bioinfo_tools_version(
+        bioinfo_tools=bioinfo_tools, container_conda_env_path=container_conda_env_path
+    )
+    version_file_tmp = "{}.{}".format(version_file, os.getpid())
+    with open(version_file_tmp, "w") as f:
+        json.dump(
+            {
+                "key": get_bioinfo_tools_version_key(
+                    bioinfo_tools, container_conda_env_path
+                ),
+                "bioinfo_tools_version": bioinfo_tools_version,
+            },
+            f,
+        )
+    os.replace(version_file_tmp, version_file)
+
+    return bioinfo_tools_version
+
+
+def read_bioinfo_tools_version(
+    version_file: os.PathLike,
+    bioinfo_tools: dict,
+    container_conda_env_path: os.PathLike,
+) -> dict:
+    """Returns the bioinfo tool versions stored in version_file.
+
+    The versions are parsed again, and stored if possible, when version_file is missing
+    or was written by another BALSAMIC installation.
+    """
+
+    try:
+        with open(version_file, "r") as f:
+            precomputed_versions = json.load(f)
+        if precomputed_versions["key"] == get_bioinfo_tools_version_key(
+            bioinfo_tools, container_conda_env_path
+        ):
+            return precomputed_versions["bioinfo_tools_version"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        return write_bioinfo_tools_version(
+            version_file=version_file,
+            bioinfo_tools=bioinfo_tools,
+            container_conda_env_path=container_conda_env_path,
+        )
+    except OSError:
+        LOG.warning(f"Could not store bioinfo tool versions - {version_file}")
+        return get_bioinfo_tools_version(
+            bioinfo_tools=bioinfo_tools,
+            container_conda_env_path=container_conda_env_path,
+        )
+
+
 def get_sample_dict(
     tumor: str,
     normal: str,
     tumor_sample_name: str = None,
     normal_sample_name: str = None,
+    stream_lanes: bool = False,
 ) -> dict:
-    """Concatenates sample dicts for all provided files"""
+    """Concatenates sample dicts for all provided files.
+
+    With stream_lanes, the files of each sample type are lanes of a single sample, named
+    after the first file, instead of one sample per file.
+    """
     samples = {}
-    if normal:
-        for sample in normal:
-            key, val = get_sample_names(sample, "normal")
+    for sample_files, sample_type, sample_name in [
+        (normal, "normal", normal_sample_name),
+        (tumor, "tumor", tumor_sample_name),
+    ]:
+        if not sample_files:
+            continue
+        for sample in sample_files[:1] if stream_lanes else sample_files:
+            key, val = get_sample_names(sample, sample_type)
             samples[key] = val
-            samples[key]["sample_name"] = normal_sample_name
-
-    for sample in tumor:
-        key, val = get_sample_names(sample, "tumor")
-        samples[key] = val
-        samples[key]["sample_name"] = tumor_sample_name
+            samples[key]["sample_name"] = sample_name
+            if stream_lanes:
+                samples[key]["lanes"] = list(
+                    dict.fromkeys(validate_fastq_pattern(lane) for lane in sample_files)
+                )
     return samples
 
 
@@ -548,40 +732,109 @@ def get_sample_names(filename, sample_type):
         )
 
 
+def get_fastq_files(directory: Path) -> list:
+    """Returns the fastq files under a directory, walked once with os.scandir.
+
+    Symlinked directories are not followed and unreadable directories are skipped,
+    as with Path.rglob.
+    """
+
+    fastq_files = []
+    directories = [os.fspath(directory)]
+    while directories:
+        subdirectories = []
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        subdirectories.append(entry.path)
+                    elif entry.name.endswith(".fastq.gz"):
+                        fastq_files.append(Path(entry.path))
+        except PermissionError:
+            continue
+        directories.extend(reversed(subdirectories))
+
+    return fastq_files
+
+
+def get_fastq_index(casefiles) -> dict:
+    """Returns the fastq files matching the file prefix of each case file.
+
+    The directory of the case files is walked once, shared by all tumor and normal
+    case files in it, instead of once per case file.
+    """
+
+    file_prefixes = collections.defaultdict(set)
+    for filename in casefiles:
+        file_prefixes[Path(filename).parent].add(validate_fastq_pattern(filename))
+
+    fastq_index = collections.defaultdict(list)
+    for parent_dir, prefixes in file_prefixes.items():
+        for fastq_file in get_fastq_files(parent_dir):
+            for file_str in prefixes:
+                if file_str in fastq_file.name:
+                    fastq_index[file_str].append(fastq_file)
+
+    return dict(fastq_index)
+
+
 def create_fastq_symlink(casefiles, symlink_dir: Path):
     """Creates symlinks for provided files in analysis/fastq directory.
     Identifies file prefix pattern, and also creates symlinks for the
     second read file, if needed"""
 
-    for filename in casefiles:
-        parent_dir = Path(filename).parents[0]
-        file_str = validate_fastq_pattern(filename)
-        for f in parent_dir.rglob(f"*{file_str}*.fastq.gz"):
-            try:
-                LOG.info(f"Creating symlink {f} -> {Path(symlink_dir, f.name)}")
-                Path(symlink_dir, f.name).symlink_to(f)
-            except FileExistsError:
-                LOG.info(f"File {symlink_dir / f.name} exists, skipping")
+    symlinks = {}
+    for fastq_files in get_fastq_index(casefiles).values():
+        for f in fastq_files:
+            symlinks.setdefault(f.name, f)
+
+    def create_symlink(fastq_name):
+        f = symlinks[fastq_name]
+        try:
+            LOG.info(f"Creating symlink {f} -> {Path(symlink_dir, fastq_name)}")
+            Path(symlink_dir, fastq_name).symlink_to(f)
+        except FileExistsError:
+            LOG.info(f"File {Path(symlink_dir, fastq_name)} exists, skipping")
+
+    # Each symlink is a round-trip to the filesystem server on network mounts
+    with ThreadPoolExecutor(max_workers=FASTQ_SYMLINK_WORKERS) as executor:
+        list(executor.map(create_symlink, symlinks))
+
+
+def get_graph_title(graph_dot: str, graph_title: str) -> str:
+    """Returns a rule graph in DOT format titled with graph_title"""
+
+    return graph_dot.replace(
+        "snakemake_dag {", 'BALSAMIC { label="' + graph_title + '";labelloc="t";'
+    )
 
 
 def generate_graph(config_collection_dict, config_path):
-    """Generate DAG graph using snakemake stdout output"""
-
-    with CaptureStdout() as graph_dot:
-        snakemake.snakemake(
-            snakefile=get_snakefile(
-                analysis_type=config_collection_dict["analysis"]["analysis_type"],
-                analysis_workflow=config_collection_dict["analysis"][
-                    "analysis_workflow"
-                ],
-                reference_genome=config_collection_dict["reference"][
-                    "reference_genome"
-                ],
-            ),
-            dryrun=True,
-            configfiles=[config_path],
-            printrulegraph=True,
-        )
+    """Writes the DAG graph of a case in DOT format, next to its PDF path.
+
+    The workflow of the case is resolved, and cached for later commands, to validate its
+    config even if the rule graph, shared by all cases of a workflow variant, is cached.
+    The PDF is only rendered on request, see render_graph.
+    """
+
+    snakefile = get_snakefile(
+        analysis_type=config_collection_dict["analysis"]["analysis_type"],
+        analysis_workflow=config_collection_dict["analysis"]["analysis_workflow"],
+        reference_genome=config_collection_dict["reference"]["reference_genome"],
+    )
+    if not get_dag(snakefile=snakefile, sample_config=config_path)["jobs"]:
+        raise ValueError("Workflow of the case could not be resolved")
+
+    graph_dot = get_rule_graph(
+        snakefile=snakefile,
+        sample_config=config_path,
+        variant=get_workflow_variant(config_collection_dict),
+        cache_dir=config_collection_dict["analysis"]["analysis_dir"],
+    )
 
     graph_title = "_".join(
         [
@@ -590,16 +843,38 @@ def generate_graph(config_collection_dict, config_path):
             config_collection_dict["analysis"]["case_id"],
         ]
     )
-    graph_dot = "".join(graph_dot).replace(
-        "snakemake_dag {", 'BALSAMIC { label="' + graph_title + '";labelloc="t";'
-    )
+    graph_dot_file = Path(config_collection_dict["analysis"]["dag"]).with_suffix(".dot")
+    graph_dot_file.write_text(get_graph_title(graph_dot, graph_title))
+
+    return graph_dot_file.as_posix()
+
+
+def render_graph(graph_pdf: str) -> str:
+    """Renders the PDF of a DAG graph from the DOT file written next to it, unless
+    it was already rendered"""
+
+    if Path(graph_pdf).exists():
+        return graph_pdf
+
     graph_obj = graphviz.Source(
-        graph_dot,
-        filename=".".join(config_collection_dict["analysis"]["dag"].split(".")[:-1]),
+        Path(graph_pdf).with_suffix(".dot").read_text(),
+        filename=Path(graph_pdf).with_suffix("").as_posix(),
         format="pdf",
         engine="dot",
     )
-    graph_obj.render(cleanup=True)
+    return graph_obj.render(cleanup=True)
+
+
+def get_scratch_bind_path(scratch_dir: Optional[str]) -> list:
+    """Returns the scratch dir to bind if it exists with its environment variables
+    expanded. Scratch dirs only available on the nodes are left to the rules, which fall
+    back to the tmp dir of the analysis"""
+
+    if scratch_dir:
+        scratch_dir = os.path.expandvars(scratch_dir)
+        if os.path.isdir(scratch_dir):
+            return [Path(scratch_dir).resolve().as_posix()]
+    return []
 
 
 def get_fastq_bind_path(fastq_path: Path) -> list():
@@ -660,13 +935,25 @@ def generate_h5(job_name: str, job_id: str, file_path: str) -> str:
     return h5_file_name
 
 
-def job_id_dump_to_yaml(job_id_dump: Path, job_id_yaml: Path, case_name: str):
-    """Write an input job_id_sacct_file to yaml output"""
-    with open(job_id_dump, "r") as jobid_in, open(job_id_yaml, "w") as jobid_out:
-        jobid_list = jobid_in.read().splitlines()
+def job_id_dump_to_yaml(job_ledger: Path, job_id_yaml: Path, case_name: str):
+    """Write the job ids of an input job ledger to yaml output"""
+    jobid_list = [job_record["job_id"] for job_record in read_job_ledger(job_ledger)]
+    with open(job_id_yaml, "w") as jobid_out:
         yaml.dump({case_name: jobid_list}, jobid_out)
 
 
+def get_latest_job_ledger(log_dir: str, case_id: str):
+    """Returns the most recent job ledger of a case, or None if no job was submitted.
+    Job ledgers are searched in log_dir and in the log directories of reruns (e.g. logs.1)"""
+    log_dir = Path(log_dir)
+    job_ledgers = list(
+        log_dir.parent.glob(f"{log_dir.name}*/{case_id}{JOB_LEDGER_SUFFIX}")
+    )
+    if not job_ledgers:
+        return None
+    return max(job_ledgers, key=lambda job_ledger: job_ledger.stat().st_mtime)
+
+
 def create_pon_fastq_symlink(pon_fastqs, symlink_dir):
     for fastq_name in os.listdir(pon_fastqs):
         pon_fastq = Path(pon_fastqs, fastq_name).as_posix()
@@ -0,0 +1,272 @@
+import os
+import json
+import hashlib
+import logging
+from collections import defaultdict
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+
+import snakemake
+
+from BALSAMIC import __version__ as balsamic_version
+from BALSAMIC.constants.common import RULE_DIRECTORY
+
+LOG = logging.getLogger(__name__)
+
+# Per-case cache of the resolved workflow, stored next to the sample config
+DAG_CACHE = ".dag_cache.json"
+
+# Cache of rule graphs per workflow variant, shared by the cases of an analysis directory
+RULE_GRAPH_CACHE = ".rule_graph_cache"
+
+
+def get_file_hash(file_path: str) -> str:
+    """Returns the sha256 hex digest of a file"""
+
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_rule_files_hash(rule_directory: str = RULE_DIRECTORY) -> str:
+    """Returns a hash of all workflow and rule files of BALSAMIC"""
+
+    rule_files = sorted(
+        list(Path(rule_directory, "snakemake_rules").rglob("*.rule"))
+        + list(Path(rule_directory, "workflows").glob("*.smk"))
+    )
+    rule_files_hash = hashlib.sha256()
+    for rule_file in rule_files:
+        rule_files_hash.update(rule_file.as_posix().encode())
+        rule_files_hash.update(get_file_hash(rule_file).encode())
+
+    return rule_files_hash.hexdigest()
+
+
+def get_dag_cache_key(snakefile: str, sample_config: str) -> dict:
+    """Returns the values a resolved workflow depends on"""
+
+    return {
+        "snakefile": snakefile,
+        "sample_config": get_file_hash(sample_config),
+        "balsamic_version": balsamic_version,
+        "rule_files": get_rule_files_hash(),
+    }
+
+
+def build_dag(snakefile: str, sample_config: str) -> dict:
+    """Resolves the workflow of a case with a forced snakemake dry-run.
+
+    Returns:
+        dag: dict of
+            rules: sorted list of the rules of the workflow
+            targets: list of final target files
+            jobs: list of jobs with their rule, wildcards, input, output and the ids of
+                the jobs they depend on
+    """
+
+    jobs = []
+
+    def job_info_handler(msg):
+        if msg["level"] == "job_info":
+            jobs.append(
+                {
+                    "jobid": msg["jobid"],
+                    "rule": msg["name"],
+                    "wildcards": dict(msg["wildcards"]),
+                    "input": list(msg["input"]),
+                    "output": list(msg["output"]),
+                }
+            )
+
+    with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+        snakemake.snakemake(
+            snakefile=snakefile,
+            dryrun=True,
+            forceall=True,
+            configfiles=[sample_config],
+            log_handler=[job_info_handler],
+        )
+
+    output_jobs = {
+        output_file: job["jobid"] for job in jobs for output_file in job["output"]
+    }
+    for job in jobs:
+        job["dependencies"] = sorted(
+            {
+                output_jobs[input_file]
+                for input_file in job["input"]
+                if input_file in output_jobs
+            }
+        )
+
+    dependent_jobs = {jobid for job in jobs for jobid in job["dependencies"]}
+    targets = [
+        target
+        for job in jobs
+        if job["jobid"] not in dependent_jobs
+        for target in (job["input"] if not job["output"] else job["output"])
+    ]
+
+    return {
+        "rules": sorted({job["rule"] for job in jobs}),
+        "targets": targets,
+        "jobs": jobs,
+    }
+
+
+def read_dag_cache(cache_file: str, cache_key: dict) -> Optional[dict]:
+    """Returns the cached workflow of a case, None if missing or outdated"""
+
+    try:
+        with open(cache_file) as f:
+            dag_cache = json.load(f)
+        if dag_cache["key"] == cache_key:
+            return dag_cache["dag"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return None
+
+
+def write_dag_cache(cache_file: str, cache_key: dict, dag: dict) -> None:
+    """Writes the workflow of a case to its cache, replacing it atomically. The cache is
+    skipped if it can not be written, e.g. in a read-only analysis directory"""
+
+    cache_file_tmp = "{}.{}".format(cache_file, os.getpid())
+    try:
+        with open(cache_file_tmp, "w") as f:
+            json.dump({"key": cache_key, "dag": dag}, f)
+        os.replace(cache_file_tmp, cache_file)
+    except OSError as error:
+        LOG.debug(f"Could not write workflow cache {cache_file}: {error}")
+
+
+def get_dag(snakefile: str, sample_config: str) -> dict:
+    """Returns the workflow of a case, resolved once and cached next to its sample config.
+
+    The cache is keyed by the sample config content, the BALSAMIC version and the
+    content of the rule files. A workflow that could not be resolved is not cached.
+    """
+
+    cache_file = Path(Path(sample_config).parent, DAG_CACHE).as_posix()
+    cache_key = get_dag_cache_key(snakefile=snakefile, sample_config=sample_config)
+    dag = read_dag_cache(cache_file, cache_key)
+    if dag is not None:
+        LOG.debug(f"Using cached workflow {cache_file}")
+        return dag
+
+    dag = build_dag(snakefile=snakefile, sample_config=sample_config)
+    if dag["jobs"]:
+        write_dag_cache(cache_file, cache_key, dag)
+    else:
+        LOG.warning("Could not resolve the workflow of the case")
+
+    return dag
+
+
+def get_rule_outputs(dag: dict) -> dict:
+    """Returns the output files of each rule of a workflow"""
+
+    rule_outputs = defaultdict(list)
+    for job in dag["jobs"]:
+        if job["output"]:
+            rule_outputs[job["rule"]].extend(job["output"])
+
+    return dict(rule_outputs)
+
+
+def get_rule_graph_dot(dag: dict) -> str:
+    """Returns the rule graph of a workflow in DOT format, as snakemake --rulegraph"""
+
+    rules = dag["rules"]
+    rule_ids = {rule_name: rule_id for rule_id, rule_name in enumerate(rules)}
+    jobs = {job["jobid"]: job for job in dag["jobs"]}
+    rule_edges = {
+        (rule_ids[jobs[dependency]["rule"]], rule_ids[job["rule"]])
+        for job in dag["jobs"]
+        for dependency in job["dependencies"]
+        if jobs[dependency]["rule"] != job["rule"]
+    }
+
+    dot = [
+        "digraph snakemake_dag {",
+        "    graph[bgcolor=white, margin=0];",
+        "    node[shape=box, style=rounded, fontname=sans, fontsize=10, penwidth=2];",
+        "    edge[penwidth=2, color=grey];",
+    ]
+    for rule_name, rule_id in rule_ids.items():
+        dot.append(
+            '\t{}[label = "{}", color = "{:.2f} 0.6 0.85", style="rounded"];'.format(
+                rule_id, rule_name, rule_id / len(rules)
+            )
+        )
+    for upstream_id, downstream_id in sorted(rule_edges):
+        dot.append(f"\t{upstream_id} -> {downstream_id}")
+    dot.append("}")
+
+    return "\n".join(dot)
+
+
+def get_workflow_variant(config: dict) -> dict:
+    """Returns the values of a sample config that select the rules of its workflow.
+
+    Cases of the same variant share the rule graph, whatever their samples and panel.
+    """
+
+    return {
+        "analysis_type": config["analysis"]["analysis_type"],
+        "sequencing_type": config["analysis"]["sequencing_type"],
+        "analysis_workflow": config["analysis"]["analysis_workflow"],
+        "fuse_alignment": config["analysis"].get("fuse_alignment", False),
+        "wgs_calling_scatter": config["analysis"].get("wgs_calling_shards", 1) > 1,
+        "vep_chunk_scatter": config["analysis"].get("vep_chunks", 1) > 1,
+        "annotation_cache": bool(config["analysis"].get("annotation_cache")),
+        "reference_genome": config["reference"]["reference_genome"],
+        "references": sorted(config["reference"]),
+        "pon_cnn": "pon_cnn" in config.get("panel", {}),
+        "background_variants": "background_variants" in config,
+        "dragen": "dragen" in config,
+        "disable_variant_caller": config.get("disable_variant_caller"),
+    }
+
+
+def get_rule_graph(
+    snakefile: str, sample_config: str, variant: dict, cache_dir: str
+) -> str:
+    """Returns the rule graph in DOT format of a workflow variant, cached in cache_dir.
+
+    The workflow of the case is only resolved when its variant has no cached rule graph
+    for this BALSAMIC version and rule files.
+    """
+
+    variant_key = dict(
+        variant,
+        snakefile=snakefile,
+        balsamic_version=balsamic_version,
+        rule_files=get_rule_files_hash(),
+    )
+    variant_hash = hashlib.sha256(
+        json.dumps(variant_key, sort_keys=True).encode()
+    ).hexdigest()
+    cache_file = Path(cache_dir, RULE_GRAPH_CACHE, variant_hash + ".dot")
+    if cache_file.exists():
+        LOG.debug(f"Using cached rule graph {cache_file}")
+        return cache_file.read_text()
+
+    dag = get_dag(snakefile=snakefile, sample_config=sample_config)
+    if not dag["jobs"]:
+        raise ValueError("Workflow of the case could not be resolved")
+    rule_graph = get_rule_graph_dot(dag)
+
+    cache_file_tmp = "{}.{}".format(cache_file, os.getpid())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file_tmp, "w") as f:
+            f.write(rule_graph)
+        os.replace(cache_file_tmp, cache_file)
+    except OSError as error:
+        LOG.debug(f"Could not write rule graph cache {cache_file}: {error}")
+
+    return rule_graph
@@ -16,6 +16,7 @@ from BALSAMIC.constants.common import (
     SEQUENCING_TYPE,
     ANALYSIS_TYPES,
     ANALYSIS_WORKFLOW,
+    STORAGE_MODES,
     WORKFLOW_SOLUTION,
     MUTATION_CLASS,
     MUTATION_TYPE,
@@ -231,6 +232,14 @@ class AnalysisModel(BaseModel):
         result : Field(optional); Path where BALSAMIC output will be stored
         benchmark : Field(optional); Path where benchmark report will be stored
         dag : Field(optional); Path where DAG graph of workflow will be stored
+        fuse_alignment : Field(bool); whether the WGS alignment, deduplication, realignment and bam merging are fused
+        storage_mode : Field(optional); string literal [bam, cram]
+            bam : keep alignments as BAM and CRAM files
+            cram : keep alignments as CRAM files only, BAM files are temporary
+        scratch_dir : Field(optional); node-local directory of temporary files, may contain environment variables
+        wgs_calling_shards : Field(int); number of genome shards the WGS variant calling of sentieon is scattered into
+        vep_chunks : Field(int); number of chunks the VCF files of a WGS analysis are annotated in by VEP
+        annotation_cache : Field(optional); SQLite file of annotations of variants shared across cases, consulted before VEP
         BALSAMIC_version  : Field(optional); Current version of BALSAMIC
         config_creation_date  : Field(optional); Timestamp when config was created
 
@@ -240,6 +249,7 @@ class AnalysisModel(BaseModel):
             When analysis_type is set to any value other than [single, paired, pon]
             When sequencing_type is set to any value other than [wgs, targeted]
             When analysis_workflow is set to any other than [balsamic, balsamic-qc, balsamic-umi]
+            When storage_mode is set to any other than [bam, cram]
     """
 
     case_id: str
@@ -254,6 +264,12 @@ class AnalysisModel(BaseModel):
     result: Optional[DirectoryPath]
     benchmark: Optional[DirectoryPath]
     dag: Optional[FilePath]
+    fuse_alignment: bool = False
+    storage_mode: str = "bam"
+    scratch_dir: Optional[str]
+    wgs_calling_shards: int = 1
+    vep_chunks: int = 1
+    annotation_cache: Optional[str]
     BALSAMIC_version: str = balsamic_version
     config_creation_date: Optional[str]
 
@@ -295,6 +311,14 @@ class AnalysisModel(BaseModel):
             )
         return value
 
+    @validator("storage_mode")
+    def storage_mode_literal(cls, value) -> str:
+        if value not in STORAGE_MODES:
+            raise ValueError(
+                f"Provided storage mode ({value}) not supported in BALSAMIC!"
+            )
+        return value
+
     @validator("analysis_dir")
     def dirpath_always_abspath(cls, value) -> str:
         return Path(value).resolve().as_posix()
@@ -383,6 +407,8 @@ class SampleInstanceModel(BaseModel):
         sample_type : Field(str; alias=type); type of sample [tumor, normal]
         sample_name : Field(str); Internal ID of sample to use in deliverables
         readpair_suffix : Field(List); currently always set to [1, 2]
+        lanes : Field(optional); file prefixes of the lanes of the sample, streamed into
+            fastp as one sample
 
     Raises:
         ValueError:
@@ -394,6 +420,7 @@ class SampleInstanceModel(BaseModel):
     sample_name: Optional[str]
     sample_type: str = Field(alias="type")
     readpair_suffix: List[str] = ["1", "2"]
+    lanes: Optional[List[str]]
 
     @validator("sample_type")
     def sample_type_literal(cls, value):
@@ -416,6 +443,7 @@ class PanelModel(BaseModel):
     Attributes:
         capture_kit : Field(str(Path)); string representation of path to PANEL BED file
         chrom : Field(list(str)); list of chromosomes in PANEL BED
+        vardict_shards : Field(optional); number of shards of balanced size the padded PANEL BED is split into for vardict
         pon_cnn: Field(optional); Path where PON reference .cnn file is stored
 
     Raises:
@@ -426,6 +454,7 @@ class PanelModel(BaseModel):
 
     capture_kit: Optional[FilePath]
     chrom: Optional[List[str]]
+    vardict_shards: Optional[int]
     pon_cnn: Optional[FilePath]
 
     @validator("capture_kit")
@@ -728,15 +757,21 @@ class ParamsCommon(BaseModel):
     Attributes:
         pcr_model: str (required). PCR indel model used to weed out false positive indels. Eg: none- PCR free samples.
         align_header: str (required); header line appended to the aligned BAM output
+        align_header_merged: str (required); header line of the merged BAM output, set at alignment when the WGS alignment is fused
         min_mapq: int (required); minimum mapping quality score. Eg: 20- probability of mapping random read at 99% accuracy
-        picard_fixmate: str (required), fix read mate information in bam file
+        merge_RG_normal: str (required); replace readgroups when merging the normal bam file
+        merge_RG_tumor: str (required); replace readgroups when merging the tumor bam file
+        picard_fixmate: str (required); fix mate information of the realigned bam when the WGS alignment is fused
         picard_RG_normal: str (required); replace readgroups in normal bam file
         picard_RG_tumor: str (required); replace readgroups in tumor bam file
     """
 
     align_header: str
+    align_header_merged: str
     pcr_model: str
     min_mapq: int
+    merge_RG_normal: str
+    merge_RG_tumor: str
     picard_fixmate: str
     picard_RG_normal: str
     picard_RG_tumor: str
@@ -0,0 +1,204 @@
+import re
+import json
+import math
+import logging
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from BALSAMIC.constants.common import RULE_DIRECTORY
+from BALSAMIC.utils.exc import BalsamicError
+
+LOG = logging.getLogger(__name__)
+
+RULE_NAME_PATTERN = re.compile(r"^rule (\w+):", re.MULTILINE)
+
+# Snakemake benchmark columns used to size cluster jobs
+BENCHMARK_COLUMNS = ["s", "max_rss", "cpu_time"]
+
+# Shortest walltime requested for a rule, in seconds
+MIN_WALLTIME = 300
+
+
+def get_rule_names(rule_directory: str = RULE_DIRECTORY) -> list:
+    """Returns the names of all BALSAMIC rules, longest first"""
+
+    rule_names = set()
+    for rule_file in list(
+        Path(rule_directory, "snakemake_rules").rglob("*.rule")
+    ) + list(Path(rule_directory, "workflows").glob("*.smk")):
+        rule_names.update(RULE_NAME_PATTERN.findall(rule_file.read_text()))
+
+    return sorted(rule_names, key=len, reverse=True)
+
+
+def get_benchmark_rule(benchmark_file: Path, rule_names: list) -> Optional[str]:
+    """Returns the rule a benchmark file was written by.
+
+    Benchmark files are named after their rule followed by the job wildcards, e.g.
+    bwa_mem_{sample}.tsv, so the longest rule name prefixing the file name is taken.
+    """
+
+    file_name = Path(benchmark_file).stem
+    for rule_name in rule_names:
+        if file_name == rule_name or (
+            file_name.startswith(rule_name) and file_name[len(rule_name)] in "_."
+        ):
+            return rule_name
+
+    return None
+
+
+def get_case_input_size(config: dict) -> Optional[float]:
+    """Returns the size in GB of the fastq files of a case, None if they are not available"""
+
+    fastq_path = Path(config["analysis"].get("fastq_path", ""))
+    fastq_files = [
+        fastq_file
+        for sample in config.get("samples", {})
+        for fastq_file in fastq_path.glob(f"{sample}*.fastq.gz")
+        if fastq_file.exists()
+    ]
+    if not fastq_files:
+        return None
+
+    return sum(fastq_file.stat().st_size for fastq_file in fastq_files) / 1024**3
+
+
+def get_case_panel(config: dict) -> Optional[str]:
+    """Returns the name of the panel bed of a case, None for WGS cases"""
+
+    capture_kit = config.get("panel", {}).get("capture_kit")
+    return Path(capture_kit).stem if capture_kit else None
+
+
+def read_case_benchmarks(config: dict, rule_names: list) -> pd.DataFrame:
+    """Returns the benchmarks of a case, one row per rule benchmark"""
+
+    benchmarks = []
+    for benchmark_file in Path(config["analysis"]["benchmark"]).glob("*.tsv"):
+        rule_name = get_benchmark_rule(benchmark_file, rule_names)
+        if not rule_name:
+            LOG.debug(f"No rule found for benchmark {benchmark_file}")
+            continue
+        try:
+            benchmark = pd.read_csv(benchmark_file, sep="\t")
+        except (pd.errors.ParserError, pd.errors.EmptyDataError):
+            LOG.warning(f"Skipping malformed benchmark {benchmark_file}")
+            continue
+        if not set(BENCHMARK_COLUMNS).issubset(benchmark.columns):
+            LOG.warning(f"Skipping benchmark without resource usage {benchmark_file}")
+            continue
+        benchmark = benchmark[BENCHMARK_COLUMNS].apply(pd.to_numeric, errors="coerce")
+        benchmark["rule"] = rule_name
+        benchmarks.append(benchmark)
+
+    if not benchmarks:
+        return pd.DataFrame()
+
+    benchmarks = pd.concat(benchmarks, ignore_index=True)
+    benchmarks["case_id"] = config["analysis"]["case_id"]
+    benchmarks["sequencing_type"] = config["analysis"]["sequencing_type"]
+    benchmarks["panel"] = get_case_panel(config)
+    benchmarks["input_size"] = get_case_input_size(config)
+
+    return benchmarks
+
+
+def collect_benchmarks(analysis_dir: str, rule_names: list) -> pd.DataFrame:
+    """Returns the benchmarks of all cases configured in an analysis directory"""
+
+    benchmarks = []
+    for config_path in sorted(Path(analysis_dir).glob("*/*.json")):
+        try:
+            with open(config_path, "r") as f:
+                config = json.load(f)
+            config["analysis"]["benchmark"]
+        except (ValueError, KeyError, TypeError):
+            LOG.debug(f"Skipping {config_path}, not a BALSAMIC config")
+            continue
+        benchmarks.append(read_case_benchmarks(config=config, rule_names=rule_names))
+
+    benchmarks = [benchmark for benchmark in benchmarks if not benchmark.empty]
+    if not benchmarks:
+        return pd.DataFrame()
+
+    return pd.concat(benchmarks, ignore_index=True)
+
+
+def format_walltime(seconds: float) -> str:
+    """Formats seconds as a HH:MM:SS walltime, rounded up to whole minutes"""
+
+    minutes = math.ceil(max(seconds, MIN_WALLTIME) / 60)
+    return "{:02d}:{:02d}:00".format(minutes // 60, minutes % 60)
+
+
+def get_rule_resources(
+    benchmarks: pd.DataFrame,
+    percentile: float,
+    headroom: float,
+    input_size: Optional[float] = None,
+) -> dict:
+    """Returns cores, memory and walltime of each rule at a percentile of its benchmarks.
+
+    Walltime is taken from the runtime per GB of input when an input size is given, so
+    that small and large cases of the same rule can be sized from the same history.
+
+    Raises:
+        BalsamicError: no benchmark has a runtime, or an input size if one is given
+    """
+
+    quantile = percentile / 100
+    benchmarks = benchmarks.dropna(subset=["s"])
+    benchmarks = benchmarks[benchmarks["s"] > 0]
+    if input_size:
+        benchmarks = benchmarks[benchmarks["input_size"] > 0]
+    if benchmarks.empty:
+        raise BalsamicError(
+            "No benchmarks with a runtime"
+            + (" and cases with an input size" if input_size else "")
+            + " to size the rules from"
+        )
+
+    rule_resources = {}
+    for rule_name, rule_benchmarks in benchmarks.groupby("rule"):
+        if input_size:
+            runtime = (rule_benchmarks["s"] / rule_benchmarks["input_size"]).quantile(
+                quantile
+            ) * input_size
+        else:
+            runtime = rule_benchmarks["s"].quantile(quantile)
+        cores = (rule_benchmarks["cpu_time"] / rule_benchmarks["s"]).quantile(quantile)
+        memory = rule_benchmarks["max_rss"].quantile(quantile)
+
+        resources = {"time": format_walltime(runtime * headroom)}
+        if not math.isnan(cores):
+            resources["n"] = max(1, math.ceil(cores * headroom))
+        if not math.isnan(memory):
+            resources["mem_mb"] = max(1, math.ceil(memory * headroom))
+        resources["cases"] = rule_benchmarks["case_id"].nunique()
+        rule_resources[rule_name] = resources
+
+    return rule_resources
+
+
+def tune_cluster_config(cluster_config: dict, rule_resources: dict) -> dict:
+    """Returns a cluster config with the resources of benchmarked rules.
+
+    Cores are capped at the ones configured for the rule, as rule threads are derived
+    from the cluster config.
+    """
+
+    tuned_config = json.loads(json.dumps(cluster_config))
+    default_cores = cluster_config["__default__"]["n"]
+    for rule_name, resources in rule_resources.items():
+        rule_config = tuned_config.setdefault(rule_name, {})
+        max_cores = rule_config.get("n", default_cores)
+        rule_config["time"] = resources["time"]
+        if "n" in resources:
+            rule_config["n"] = min(resources["n"], max_cores)
+        if "mem_mb" in resources:
+            rule_config["mem_mb"] = resources["mem_mb"]
+
+    return tuned_config
@@ -1,17 +1,21 @@
 import os
 import re
+import hashlib
+import uuid
 import toml
 import logging
 from pathlib import Path
 import snakemake
 from BALSAMIC.utils.cli import get_file_extension
 from BALSAMIC.utils.cli import find_file_index
+from BALSAMIC.utils.bed import read_bed
 from BALSAMIC.constants.common import (
     MUTATION_TYPE,
     MUTATION_CLASS,
     SEQUENCING_TYPE,
     WORKFLOW_SOLUTION,
     ANALYSIS_TYPES,
+    JAVA_HEAP_FRACTION,
 )
 from BALSAMIC.utils.exc import WorkflowRunError, BalsamicError
 
@@ -24,9 +28,74 @@ def get_chrom(panelfile):
     output: list of chromosomes in the bedfile
     """
 
-    lines = [line.rstrip("\n") for line in open(panelfile, "r")]
-    chrom = list(set([s.split("\t")[0] for s in lines]))
-    return chrom
+    return list(read_bed(panelfile))
+
+
+def get_vardict_shards(config):
+    """
+    input: sample config file from BALSAMIC
+    output: list of names of the shards of the panel bed called by vardict, a single
+    shard for configs without vardict_shards
+    """
+
+    if "panel" not in config:
+        return []
+    shards = config["panel"].get("vardict_shards", 1)
+    return ["shard_{:03d}".format(shard) for shard in range(1, shards + 1)]
+
+
+def get_wgs_calling_shards(config):
+    """
+    input: sample config file from BALSAMIC
+    output: list of names of the genome shards the WGS variant calling is scattered
+    into, empty if it is not scattered
+    """
+
+    shards = config["analysis"].get("wgs_calling_shards", 1)
+    if shards <= 1:
+        return []
+    return ["shard_{:03d}".format(shard) for shard in range(1, shards + 1)]
+
+
+def get_vep_chunks(config):
+    """
+    input: sample config file from BALSAMIC
+    output: list of names of the chunks WGS VCF files are annotated in by VEP, empty if
+    they are annotated as a whole
+    """
+
+    if config["analysis"]["sequencing_type"] != "wgs":
+        return []
+    chunks = config["analysis"].get("vep_chunks", 1)
+    if chunks <= 1:
+        return []
+    return ["chunk_{:03d}".format(chunk) for chunk in range(1, chunks + 1)]
+
+
+def get_annotation_cache(config, *annotation_options):
+    """
+    input: sample config file from BALSAMIC and the options variants are annotated with,
+    e.g. VEP options and vcfanno TOML
+    output: options of the annotation_cache.py script keying the annotations by genome
+    version, VEP cache and a hash of annotation_options, empty if no cache is configured
+    """
+
+    annotation_cache = config["analysis"].get("annotation_cache")
+    if not annotation_cache:
+        return ""
+    annotation_hash = hashlib.sha256("\n".join(annotation_options).encode()).hexdigest()
+    return " ".join(
+        [
+            "--cache",
+            annotation_cache,
+            "--genome_version",
+            config["reference"]["genome_version"],
+            "--vep_cache",
+            config["reference"]["vep"],
+            "--annotation_hash",
+            annotation_hash,
+        ]
+    )
 
 
 def get_vcf(config, var_caller, sample):
@@ -203,6 +272,132 @@ def get_threads(cluster_config, rule_name="__default__"):
     return cluster_config[rule_name]["n"] if rule_name in cluster_config else 8
 
 
+def get_java_heap(cluster_config, rule_name, default_heap):
+    """
+    To retrieve the JVM heap size (-Xmx) of a rule from its memory (mem_mb) in cluster
+    config or return default_heap
+    """
+
+    mem_mb = cluster_config.get(rule_name, {}).get("mem_mb")
+    return f"{int(mem_mb * JAVA_HEAP_FRACTION)}m" if mem_mb else default_heap
+
+
+def get_scratch_dir(config, tmp_dir):
+    """
+    input: sample config file from BALSAMIC and the tmp dir of the result directory
+    output: root of temporary files, the scratch dir of the config with its environment
+    variables expanded, or tmp_dir if no scratch dir is configured or available
+    """
+
+    scratch_dir = config["analysis"].get("scratch_dir")
+    if scratch_dir:
+        scratch_dir = os.path.expandvars(scratch_dir)
+        if os.path.isdir(scratch_dir):
+            return os.path.join(scratch_dir, "")
+    return tmp_dir
+
+
+def get_rule_tmpdir(config, tmp_dir):
+    """
+    To retrieve the tmpdir of a job, named when the job runs under the scratch dir of the
+    node it runs on. The directory is created by the job and is unique to it.
+    """
+
+    def rule_tmpdir(wildcards):
+        return get_scratch_dir(config, tmp_dir) + "balsamic_" + uuid.uuid4().hex
+
+    return rule_tmpdir
+
+
+def get_temp_bam_files(rules):
+    """
+    To retrieve the existing files of the temp() BAM outputs of the rules of a workflow,
+    left in place by cluster jobs, which are run with --notemp
+    """
+
+    temp_bam_files = set()
+    for rule in rules:
+        for output_file in rule.temp_output:
+            if not str(output_file).endswith(".bam"):
+                continue
+            bam_files = [str(output_file)]
+            wildcards = snakemake.io.glob_wildcards(str(output_file))._asdict()
+            if wildcards:
+                bam_files = snakemake.io.expand(str(output_file), zip, **wildcards)
+            temp_bam_files.update(
+                bam_file for bam_file in bam_files if os.path.isfile(bam_file)
+            )
+
+    return sorted(temp_bam_files)
+
+
+def get_alignment_extension(config):
+    """
+    input: sample config file from BALSAMIC
+    output: extension of the merged alignments read by downstream rules, cram when
+    alignments are stored as CRAM
+    """
+
+    return "cram" if config["analysis"].get("storage_mode") == "cram" else "bam"
+
+
+def get_storage_bam(config, bam):
+    """
+    To retrieve a bam output of a rule, temporary when alignments are stored as CRAM
+    """
+
+    if config["analysis"].get("storage_mode") == "cram":
+        return snakemake.io.temp(bam)
+    return bam
+
+
+def get_fastq_lanes(config, sample, read):
+    """
+    To retrieve the fastq files of a read of a sample, one per lane for samples
+    configured with lanes
+    """
+
+    lanes = config.get("samples", {}).get(sample, {}).get("lanes") or [sample]
+    return [
+        config["analysis"]["fastq_path"] + f"{lane}_{read}.fastq.gz" for lane in lanes
+    ]
+
+
+def get_fastq_fifo(tmp_dir, rule_name, sample, read):
+    """
+    To retrieve the named pipe a rule streams the lanes of a read of a sample through,
+    named after the rule so that rules reading the same sample concurrently do not share
+    a pipe
+    """
+
+    return f"{tmp_dir}{rule_name}_{sample}_{read}.fastq"
+
+
+def get_fastq_stream(fastq_files, fifo):
+    """
+    To retrieve the shell commands streaming the lane fastq files of a read through a
+    named pipe, decompressed, so that lanes are not concatenated on disk. A single fastq
+    file is read as is.
+
+    Returns:
+        dict of
+            fastq: fastq file or named pipe to read
+            stream: command starting the stream in the background
+            wait: command failing if the stream failed
+    """
+
+    if len(fastq_files) == 1:
+        return {"fastq": fastq_files[0], "stream": "", "wait": ""}
+
+    stream_pid = re.sub(r"\W", "_", Path(fifo).name) + "_pid"
+    return {
+        "fastq": fifo,
+        "stream": f"rm -f {fifo}; mkfifo {fifo}; "
+        f"gzip -dc {' '.join(fastq_files)} > {fifo} & {stream_pid}=$!;",
+        "wait": f"wait ${stream_pid}; rm -f {fifo};",
+    }
+
+
 def get_rule_output(rules, rule_name, output_file_wildcards):
     """get list of existing output files from a given workflow
 
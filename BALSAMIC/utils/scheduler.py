@@ -5,7 +5,16 @@ import subprocess
 import json
 import argparse
 import shutil
-from snakemake.utils import read_job_properties
+from datetime import datetime
+
+# Job properties line written by snakemake into every cluster jobscript
+JOB_PROPERTIES_PATTERN = re.compile("# properties = (.*)")
+
+# Per-case cache of the sample config values needed to submit jobs
+SAMPLE_CONFIG_CACHE = ".sample_config_cache.json"
+
+# Suffix of the per-case ledger of submitted jobs (JSON lines)
+JOB_LEDGER_SUFFIX = ".jobs.jsonl"
 
 
 class SbatchScheduler:
@@ -18,6 +27,7 @@ class SbatchScheduler:
     error           - -e/--error
     mail_type       - --mail-type
     mail_user       - --mail-user
+    mem             - --mem (MB)
     ntasks          - -n/--ntasks
     output          - -o/--output
     qos             - -q/--qos
@@ -30,6 +40,7 @@ class SbatchScheduler:
         self.error = None
         self.mail_type = None
         self.mail_user = None
+        self.mem = None
         self.ntasks = None
         self.output = None
         self.partition = None
@@ -50,6 +61,7 @@ class SbatchScheduler:
             "output",
             "mail_type",
             "mail_user",
+            "mem",
             "ntasks",
             "qos",
             "time",
@@ -80,6 +92,7 @@ class QsubScheduler:
         self.resources = None
         self.mail_type = None
         self.mail_user = None
+        self.mem = None
         self.ntasks = None
         self.output = None
         self.qos = None
@@ -98,6 +111,11 @@ class QsubScheduler:
         if self.ntasks:
             resource_params += " -pe mpi {} ".format(str(self.ntasks))
 
+        if self.mem:
+            # h_vmem is requested per slot
+            slots = int(self.ntasks) if self.ntasks else 1
+            resource_params += " -l h_vmem={}M ".format(-(-int(self.mem) // slots))
+
         if self.account:
             qsub_options.append(" -q " + str(self.account))
 
@@ -130,6 +148,21 @@ class QsubScheduler:
         return "qsub -V -S /bin/bash " + " ".join(qsub_options)
 
 
+def read_job_properties(jobscript):
+    """Reads the job properties of a snakemake jobscript.
+
+    Mirrors snakemake.utils.read_job_properties, so that a job submission does not pay
+    for importing snakemake in every scheduler.py process.
+    """
+
+    with open(jobscript) as f:
+        for line in f:
+            match = JOB_PROPERTIES_PATTERN.match(line)
+            if match:
+                return json.loads(match.group(1))
+    raise ValueError("No job properties found in {}".format(jobscript))
+
+
 def read_sample_config(input_json):
     """load input sample_config file. Output of balsamic config sample."""
 
@@ -141,18 +174,112 @@ def read_sample_config(input_json):
         raise e
 
 
-def write_sacct_file(sacct_file, job_id, job_name=str()):
-    """writes a yaml file with job ids"""
+def read_cached_sample_config(input_json, cache_dir):
+    """Returns the analysis section of the sample config, cached on disk per case.
+
+    The cache is keyed by the sample config path and its modification time, so that
+    submitting a job only parses the full sample config when it has changed.
+    """
+
+    cache_file = os.path.join(cache_dir, SAMPLE_CONFIG_CACHE)
+    config_path = os.path.abspath(input_json)
+    config_mtime = os.stat(config_path).st_mtime_ns
+
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if cache["sample_config"] == config_path and cache["mtime"] == config_mtime:
+            return cache["analysis"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    sample_config = read_sample_config(input_json=input_json)
+    cache = {
+        "sample_config": config_path,
+        "mtime": config_mtime,
+        "analysis": {"case_id": sample_config["analysis"]["case_id"]},
+    }
+
+    # Concurrent submissions may rebuild the cache, replace it atomically
+    cache_file_tmp = "{}.{}".format(cache_file, os.getpid())
+    with open(cache_file_tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(cache_file_tmp, cache_file)
+
+    return cache["analysis"]
+
+
+def link_jobscript(jobscript, script_dir):
+    """Hard-links a snakemake jobscript into script_dir. Falls back to copy if linking fails"""
+
+    script = os.path.join(script_dir, os.path.basename(jobscript))
+    try:
+        if os.path.lexists(script):
+            os.remove(script)
+        os.link(jobscript, script)
+    except OSError:
+        shutil.copy2(jobscript, script)
+
+    return script
+
+
+def get_job_ledger_path(log_dir, case_id):
+    """Returns the path of the job ledger of a case"""
+
+    return os.path.join(log_dir, case_id + JOB_LEDGER_SUFFIX)
+
+
+def write_job_ledger(ledger_file, job_record):
+    """Appends a job record as one JSON line to the job ledger.
+
+    The record is written with a single write on an O_APPEND file descriptor, so that
+    records of concurrently submitted jobs are never interleaved.
+    """
+
+    record = (json.dumps(job_record) + "\n").encode()
     try:
-        with open(sacct_file, "a") as f:
-            f.write(job_id)
-            if job_name:
-                f.write("," + job_name)
-            f.write("\n")
+        fd = os.open(ledger_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
     except FileNotFoundError as e:
-        logging.exception("Can not write {} file".format(sacct_file))
+        logging.exception("Can not write {} file".format(ledger_file))
         raise e
 
+    try:
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+
+def read_job_ledger(ledger_file):
+    """Returns the list of job records of a job ledger. Truncated records are skipped"""
+
+    job_records = []
+    with open(ledger_file) as f:
+        for line in f:
+            try:
+                job_records.append(json.loads(line))
+            except ValueError:
+                logging.warning("Skipping malformed job record: {}".format(line))
+
+    return job_records
+
+
+def get_job_record(job_id, job_properties, dependencies, scheduler_cmd):
+    """Builds a job ledger record from a submitted job"""
+
+    return {
+        "job_id": job_id,
+        "rule": job_properties.get("rule", job_properties.get("groupid")),
+        "wildcards": job_properties.get("wildcards", {}),
+        "snakemake_jobid": job_properties.get("jobid"),
+        "submit_time": datetime.now().isoformat(timespec="seconds"),
+        "cores": scheduler_cmd.ntasks,
+        "time": scheduler_cmd.time,
+        "mem_mb": scheduler_cmd.mem,
+        "dependencies": list(dependencies),
+        "jobscript": scheduler_cmd.script,
+        "command": scheduler_cmd.build_cmd(),
+    }
+
 
 def submit_job(sbatch_cmd, profile):
     """subprocess call for sbatch command"""
@@ -219,8 +346,7 @@ def main(args=None):
 
     jobscript = args.snakescript
     job_properties = read_job_properties(jobscript)
-    shutil.copy2(jobscript, args.script_dir)
-    jobscript = os.path.join(args.script_dir, os.path.basename(jobscript))
+    jobscript = link_jobscript(jobscript, args.script_dir)
 
     if args.profile == "slurm":
         jobid = "%j"
@@ -244,15 +370,12 @@ def main(args=None):
     if not args.mail_type:
         mail_type = job_properties["cluster"]["mail_type"]
 
-    sample_config = read_sample_config(input_json=args.sample_config)
-
-    sacct_file = os.path.join(
-        args.log_dir, sample_config["analysis"]["case_id"] + ".sacct"
-    )
-    sacct_file_extended = os.path.join(
-        args.log_dir, sample_config["analysis"]["case_id"] + "_extended.sacct"
+    analysis = read_cached_sample_config(
+        input_json=args.sample_config, cache_dir=args.script_dir
     )
 
+    job_ledger = get_job_ledger_path(args.log_dir, analysis["case_id"])
+
     scheduler_cmd.account = args.account
     scheduler_cmd.mail_type = mail_type
     scheduler_cmd.error = os.path.join(
@@ -266,16 +389,21 @@ def main(args=None):
     scheduler_cmd.time = job_properties["cluster"]["time"]
     scheduler_cmd.mail_user = args.mail_user
     scheduler_cmd.script = jobscript
+    if "mem_mb" in job_properties["cluster"]:
+        scheduler_cmd.mem = job_properties["cluster"]["mem_mb"]
     if "partition" in job_properties["cluster"]:
         scheduler_cmd.partition = job_properties["cluster"]["partition"]
 
     jobid = submit_job(scheduler_cmd.build_cmd(), args.profile)
 
-    write_sacct_file(sacct_file=sacct_file, job_id=jobid)
-    write_sacct_file(
-        sacct_file=sacct_file_extended,
-        job_id=scheduler_cmd.build_cmd(),
-        job_name=os.path.basename(jobscript),
+    write_job_ledger(
+        ledger_file=job_ledger,
+        job_record=get_job_record(
+            job_id=jobid,
+            job_properties=job_properties,
+            dependencies=args.dependencies,
+            scheduler_cmd=scheduler_cmd,
+        ),
     )
 
 
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import logging
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+LOG = logging.getLogger(__name__)
+
+# Per-case cache of directory listings used by balsamic report status
+STATUS_CACHE = ".status_cache.json"
+
+# Seconds a directory must be left unmodified before its listing is cached, as
+# directory mtimes of network filesystems can be coarser than a second
+DIRECTORY_SETTLE_TIME = 2
+
+# Number of directories listed concurrently
+STATUS_WORKERS = 16
+
+JOB_STATES = ["pending", "running", "failed", "done", "unknown"]
+
+SACCT_STATES = {
+    "PENDING": "pending",
+    "REQUEUED": "pending",
+    "RESIZING": "pending",
+    "SUSPENDED": "pending",
+    "CONFIGURING": "running",
+    "RUNNING": "running",
+    "COMPLETING": "running",
+    "COMPLETED": "done",
+    "BOOT_FAIL": "failed",
+    "CANCELLED": "failed",
+    "DEADLINE": "failed",
+    "FAILED": "failed",
+    "NODE_FAIL": "failed",
+    "OUT_OF_MEMORY": "failed",
+    "PREEMPTED": "failed",
+    "TIMEOUT": "failed",
+}
+
+
+def get_sacct_states(job_ids: list, start_time: str) -> dict:
+    """Returns the state of SLURM jobs, polled with a single sacct call.
+
+    Args:
+        job_ids: list of SLURM job ids
+        start_time: earliest submission time of the jobs, sacct only reports jobs
+            since midnight otherwise
+
+    Returns:
+        job_states: dict of job id to one of JOB_STATES
+    """
+
+    if not job_ids:
+        return {}
+
+    sacct_cmd = [
+        "sacct",
+        "--noheader",
+        "--parsable2",
+        "--allocations",
+        "--format",
+        "JobID,State",
+        "--starttime",
+        start_time,
+        "--jobs",
+        ",".join(job_ids),
+    ]
+    try:
+        res = subprocess.run(
+            sacct_cmd, check=True, stdout=subprocess.PIPE, universal_newlines=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        LOG.warning("Could not poll job states with sacct")
+        return {}
+
+    job_states = {}
+    for line in res.stdout.splitlines():
+        job_id, _, state = line.partition("|")
+        # e.g. "CANCELLED by 1234"
+        state = state.split()[0] if state else state
+        job_states[job_id] = SACCT_STATES.get(state, "unknown")
+
+    return job_states
+
+
+def get_job_states(job_records: list) -> dict:
+    """Returns the state of the jobs of a job ledger. Only SLURM jobs can be polled"""
+
+    slurm_records = [
+        job_record
+        for job_record in job_records
+        if job_record.get("command", "").startswith("sbatch")
+    ]
+    if not slurm_records:
+        return {}
+
+    return get_sacct_states(
+        job_ids=[job_record["job_id"] for job_record in slurm_records],
+        start_time=min(job_record["submit_time"] for job_record in slurm_records),
+    )
+
+
+def get_rule_job_states(job_records: list, job_states: dict) -> dict:
+    """Returns the number of jobs per state for each rule of a job ledger"""
+
+    rule_job_states = defaultdict(Counter)
+    for job_record in job_records:
+        rule_job_states[job_record["rule"]][
+            job_states.get(job_record["job_id"], "unknown")
+        ] += 1
+
+    return rule_job_states
+
+
+def read_status_cache(cache_file: str) -> dict:
+    """Returns the status cache of a case, with the cached listing of each directory"""
+
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if isinstance(cache["directories"], dict):
+            return cache
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    return {"directories": {}}
+
+
+def write_status_cache(cache_file: str, cache: dict) -> None:
+    """Writes the status cache of a case, replacing it atomically. The cache is skipped
+    if it can not be written, e.g. in a read-only analysis directory"""
+
+    cache_file_tmp = "{}.{}".format(cache_file, os.getpid())
+    try:
+        with open(cache_file_tmp, "w") as f:
+            json.dump(cache, f)
+        os.replace(cache_file_tmp, cache_file)
+    except OSError as error:
+        LOG.debug(f"Could not write status cache {cache_file}: {error}")
+
+
+def list_directory(directory: str, cached_directory: Optional[dict] = None) -> tuple:
+    """Returns the entries of a directory, from cached_directory if it was not modified.
+
+    Entries of a directory only change when its mtime does, so a single stat replaces
+    a stat per file. The listing is returned for caching once the directory has settled.
+
+    Returns:
+        entries: set of names in the directory
+        cached_directory: dict of directory mtime and entries, None if not cacheable
+    """
+
+    try:
+        directory_mtime = os.stat(directory).st_mtime_ns
+        if cached_directory and cached_directory["mtime"] == directory_mtime:
+            return set(cached_directory["files"]), cached_directory
+
+        listing_time = time.time_ns()
+        with os.scandir(directory) as directory_entries:
+            entries = {entry.name for entry in directory_entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set(), None
+
+    if listing_time - directory_mtime > DIRECTORY_SETTLE_TIME * 10**9:
+        return entries, {"mtime": directory_mtime, "files": list(entries)}
+
+    return entries, None
+
+
+def get_existing_files(files: list, directory_cache: dict) -> set:
+    """Returns the files that exist, checked with one listing per directory.
+
+    Directories are listed concurrently, as each listing is a round-trip to the
+    filesystem server on network mounts. directory_cache is updated with the listings.
+    """
+
+    files_per_directory = defaultdict(list)
+    for file_path in files:
+        files_per_directory[os.path.dirname(file_path) or "."].append(file_path)
+
+    directories = list(files_per_directory)
+    with ThreadPoolExecutor(max_workers=STATUS_WORKERS) as executor:
+        listings = list(
+            executor.map(
+                lambda directory: list_directory(
+                    directory, directory_cache.get(directory)
+                ),
+                directories,
+            )
+        )
+
+    existing_files = set()
+    for directory, (entries, cached_directory) in zip(directories, listings):
+        if cached_directory:
+            directory_cache[directory] = cached_directory
+        else:
+            directory_cache.pop(directory, None)
+        existing_files.update(
+            file_path
+            for file_path in files_per_directory[directory]
+            if os.path.basename(file_path) in entries
+        )
+
+    return existing_files
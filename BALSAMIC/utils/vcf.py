@@ -0,0 +1,130 @@
+"""VCF utils, splitting indexed VCF files into chunks from their tabix index"""
+
+import gzip
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from BALSAMIC.utils.bed import get_region_count, split_genome
+
+TABIX_MAGIC = b"TBI\x01"
+
+# Bin of the tabix index holding the record count of a contig
+TABIX_PSEUDO_BIN = 37450
+
+# Size of the windows of the linear index and largest position of a tabix index
+TABIX_WINDOW = 1 << 14
+TABIX_MAX_POSITION = 1 << 29
+
+
+def get_window_records(
+    offsets: np.ndarray, off_beg: int, off_end: int, records: Optional[int]
+) -> np.ndarray:
+    """Returns the estimated number of records starting in each window of a contig.
+
+    The records of the contig are spread over its windows in proportion to the
+    compressed bytes between the file offsets of consecutive windows. Without a record
+    count in the index, the compressed bytes are returned.
+    """
+
+    if not len(offsets):
+        return np.zeros(0)
+
+    blocks = np.maximum(offsets >> 16, off_beg >> 16).astype(np.int64)
+    window_bytes = np.clip(np.append(blocks[1:], off_end >> 16) - blocks, 0, None)
+    if not window_bytes.sum():
+        window_bytes[0] = 1
+
+    if records is None:
+        return window_bytes.astype(float)
+    return window_bytes * (records / window_bytes.sum())
+
+
+def read_tabix_index(tbi_file: str) -> Dict[str, np.ndarray]:
+    """Parses the tabix index of a VCF file without reading the VCF file.
+
+    Returns:
+        window_records: dict of contig, in file order, to the estimated number of records
+            starting in each window of its linear index
+    """
+
+    with gzip.open(tbi_file, "rb") as tbi:
+        index = tbi.read()
+    if index[:4] != TABIX_MAGIC:
+        raise ValueError(f"{tbi_file} is not a tabix index")
+
+    n_ref = struct.unpack_from("<i", index, 4)[0]
+    l_nm = struct.unpack_from("<i", index, 32)[0]
+    contigs = [name.decode() for name in index[36 : 36 + l_nm].split(b"\0")[:n_ref]]
+
+    window_records = {}
+    offset = 36 + l_nm
+    for contig in contigs:
+        records = None
+        chunk_offsets = []
+        n_bin = struct.unpack_from("<i", index, offset)[0]
+        offset += 4
+        for _ in range(n_bin):
+            bin_id, n_chunk = struct.unpack_from("<Ii", index, offset)
+            offset += 8
+            if bin_id == TABIX_PSEUDO_BIN:
+                records = struct.unpack_from("<4Q", index, offset)[2]
+            else:
+                chunk_offsets.extend(
+                    struct.unpack_from(f"<{2 * n_chunk}Q", index, offset)
+                )
+            offset += 16 * n_chunk
+        off_beg, off_end = min(chunk_offsets, default=0), max(chunk_offsets, default=0)
+        n_intv = struct.unpack_from("<i", index, offset)[0]
+        offset += 4
+        offsets = np.frombuffer(index, dtype="<u8", count=n_intv, offset=offset)
+        offset += 8 * n_intv
+        window_records[contig] = get_window_records(offsets, off_beg, off_end, records)
+
+    return window_records
+
+
+def write_vcf_chunks(vcf_file: str, chunk_files: List[str]) -> None:
+    """Splits an indexed VCF file into chunks of about equal number of records, estimated
+    from its tabix index, and writes the 1-based regions of each chunk to its file.
+
+    Chunks are consecutive and cover all contigs of the index in file order, so that the
+    chunks can be concatenated in order. Chunks beyond the number of indexed windows
+    holding records are left empty.
+    """
+
+    window_records = read_tabix_index(vcf_file + ".tbi")
+    windows = {
+        contig: np.flatnonzero(records) for contig, records in window_records.items()
+    }
+    regions = {
+        contig: np.column_stack(
+            (contig_windows * TABIX_WINDOW, (contig_windows + 1) * TABIX_WINDOW)
+        )
+        for contig, contig_windows in windows.items()
+    }
+    weights = {
+        contig: window_records[contig][contig_windows]
+        for contig, contig_windows in windows.items()
+    }
+    chunks = min(len(chunk_files), get_region_count(regions))
+    vcf_chunks = (
+        split_genome(
+            regions,
+            {contig: TABIX_MAX_POSITION for contig in window_records},
+            chunks,
+            weights=weights,
+        )
+        if chunks
+        else []
+    )
+
+    for chunk_index, chunk_file in enumerate(chunk_files):
+        Path(chunk_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(chunk_file, "w") as chunk:
+            for contig, start, end in (
+                vcf_chunks[chunk_index] if chunk_index < chunks else []
+            ):
+                chunk.write(f"{contig}\t{start + 1}\t{end}\n")
@@ -3,12 +3,12 @@
 
 from pathlib import Path
 import glob
-import tempfile
 import os
 
 
-from BALSAMIC.utils.rule import (get_picard_mrkdup, get_threads,
-                                 get_result_dir, get_pon_samples)
+from BALSAMIC.utils.rule import (get_picard_mrkdup, get_threads, get_java_heap,
+                                 get_result_dir, get_pon_samples, get_fastq_lanes, get_fastq_fifo, get_fastq_stream,
+                                 get_storage_bam, get_rule_tmpdir)
 from BALSAMIC.constants.common import RULE_DIRECTORY
 from BALSAMIC.constants.workflow_params import WORKFLOW_PARAMS
 from BALSAMIC.utils.models import BalsamicWorkflowConfig
@@ -2,7 +2,6 @@
 # coding: utf-8
 import os
 import logging
-import tempfile
 
 from pathlib import Path
 from yapf.yapflib.yapf_api import FormatFile
@@ -18,7 +17,9 @@ from BALSAMIC.utils.models import BalsamicWorkflowConfig
 
 from BALSAMIC.utils.rule import (get_rule_output, get_result_dir,
                                  get_sample_type, get_picard_mrkdup, get_script_path,
-                                 get_threads, get_sequencing_type, get_capture_kit)
+                                 get_threads, get_java_heap, get_sequencing_type, get_capture_kit,
+                                 get_fastq_lanes, get_fastq_fifo, get_fastq_stream, get_temp_bam_files, get_alignment_extension,
+                                 get_storage_bam, get_scratch_dir, get_rule_tmpdir)
 
 from BALSAMIC.constants.common import (RULE_DIRECTORY);
 from BALSAMIC.constants.workflow_params import WORKFLOW_PARAMS
@@ -49,6 +50,9 @@ singularity_image = config['singularity']['image']
 # picarddup flag
 picarddup = get_picard_mrkdup(config)
 
+# Extension of the merged alignments read by downstream rules
+alignment_ext = get_alignment_extension(config)
+
 # parse parameters as constants to workflows
 params = BalsamicWorkflowConfig.parse_obj(WORKFLOW_PARAMS)
 
@@ -79,7 +83,7 @@ LOG.info('Genome version set to %s', config["reference"]["genome_version"])
 
 
 # Set temporary dir environment variable
-os.environ['TMPDIR'] = get_result_dir(config)
+os.environ['TMPDIR'] = get_scratch_dir(config, tmp_dir)
 
 analysis_type = config['analysis']["analysis_type"]
 
@@ -162,6 +166,11 @@ rule all:
         except OSError as e:
             print ("Error: %s - %s." % (e.filename, e.strerror))
 
+        # Remove the temporary bam files kept by cluster jobs when alignments are stored as CRAM
+        if config["analysis"].get("storage_mode") == "cram":
+            for bam_file in get_temp_bam_files(workflow.rules):
+                os.remove(bam_file)
+
         # Finish timestamp file
         with open(str(output.finish_file), mode="w") as finish_file:
             finish_file.write("%s\n" % datetime.datetime.now())
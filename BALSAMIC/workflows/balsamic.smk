@@ -2,7 +2,6 @@
 # coding: utf-8
 import os
 import logging
-import tempfile
 
 from pathlib import Path
 from yapf.yapflib.yapf_api import FormatFile
@@ -19,17 +18,23 @@ from BALSAMIC.utils.io import write_json, read_yaml
 from BALSAMIC.utils.models import VarCallerFilter, BalsamicWorkflowConfig
 
 from BALSAMIC.utils.workflowscripts import plot_analysis
+from BALSAMIC.utils.bed import write_bed_shards, write_genome_shards
+from BALSAMIC.utils.vcf import write_vcf_chunks
 
 from BALSAMIC.utils.rule import (get_variant_callers, get_rule_output, get_result_dir, get_vcf, get_picard_mrkdup,
-                                 get_sample_type, get_threads, get_script_path, get_sequencing_type, get_capture_kit,
+                                 get_sample_type, get_threads, get_java_heap, get_script_path, get_sequencing_type, get_capture_kit,
                                  get_clinical_snv_observations, get_clinical_sv_observations,get_swegen_snv,
-                                 get_swegen_sv, dump_toml)
+                                 get_swegen_sv, dump_toml, get_fastq_lanes, get_fastq_fifo, get_fastq_stream, get_temp_bam_files,
+                                 get_sample_type_from_prefix, get_alignment_extension, get_storage_bam,
+                                 get_scratch_dir, get_rule_tmpdir, get_vardict_shards,
+                                 get_wgs_calling_shards, get_vep_chunks, get_annotation_cache)
 
-from BALSAMIC.constants.common import (SENTIEON_DNASCOPE, SENTIEON_TNSCOPE, RULE_DIRECTORY, MUTATION_TYPE)
+from BALSAMIC.constants.common import (SENTIEON_DNASCOPE, SENTIEON_TNSCOPE, RULE_DIRECTORY, MUTATION_TYPE,
+                                       VARDICT_BED_PADDING)
 from BALSAMIC.constants.variant_filters import (COMMON_SETTINGS, VARDICT_SETTINGS, SENTIEON_VARCALL_SETTINGS,
                                                 SVDB_FILTER_SETTINGS)
 from BALSAMIC.constants.workflow_params import (WORKFLOW_PARAMS, VARCALL_PARAMS)
-from BALSAMIC.constants.workflow_rules import SNAKEMAKE_RULES
+from BALSAMIC.constants.workflow_rules import SNAKEMAKE_RULES, FUSED_ALIGNMENT_RULES
 
 
 shell.executable("/bin/bash")
@@ -125,6 +130,9 @@ if "swegen_sv_frequency" in config["reference"]:
 # picarddup flag
 picarddup = get_picard_mrkdup(config)
 
+# Extension of the merged alignments read by downstream rules
+alignment_ext = get_alignment_extension(config)
+
 # Varcaller filter settings
 COMMON_FILTERS = VarCallerFilter.parse_obj(COMMON_SETTINGS)
 VARDICT = VarCallerFilter.parse_obj(VARDICT_SETTINGS)
@@ -192,17 +200,24 @@ germline_call_samples = ["tumor"]
 if config['analysis']['analysis_type'] == "paired":
     germline_call_samples.append("normal")
 
-# Create list of chromosomes in panel for panel only variant calling to be used in rules
+# Create list of shards of the panel for panel only variant calling to be used in rules
 if config["analysis"]["sequencing_type"] != "wgs":
-    chromlist = config["panel"]["chrom"]
+    bedshards = get_vardict_shards(config)
+
+# Create list of genome shards the WGS variant calling is scattered into, if any
+wgs_calling_shards = get_wgs_calling_shards(config)
+
+# Create list of chunks WGS VCF files are annotated in by VEP, if any
+vep_chunks = get_vep_chunks(config)
 
 background_variant_file = ""
 if "background_variants" in config:
     background_variant_file = config["background_variants"]
 
 # Set temporary dir environment variable
-os.environ["SENTIEON_TMPDIR"] = result_dir
-os.environ['TMPDIR'] = get_result_dir(config)
+scratch_dir = get_scratch_dir(config, tmp_dir)
+os.environ["SENTIEON_TMPDIR"] = scratch_dir
+os.environ['TMPDIR'] = scratch_dir
 
 # CNV report input files
 cnv_data_paths = []
@@ -319,6 +334,9 @@ if config["analysis"]["analysis_workflow"] == "balsamic":
     somatic_caller = [var_caller for var_caller in somatic_caller if "umi" not in var_caller]
     somatic_caller_tmb = [var_caller for var_caller in somatic_caller_tmb if "umi" not in var_caller]
 
+if sequence_type == "wgs" and config["analysis"].get("fuse_alignment"):
+    rules_to_include = [FUSED_ALIGNMENT_RULES.get(rule, rule) for rule in rules_to_include]
+    rules_to_include = [rule for rule in rules_to_include if rule]
 
 LOG.info(f"The following rules will be included in the workflow: {rules_to_include}")
 LOG.info(f"The following Germline variant callers will be included in the workflow: {germline_caller}")
@@ -483,7 +501,7 @@ if 'delivery' in config:
             "var_type": ["CNV", "SNV", "SV"],
             "var_class": ["somatic", "germline"],
             "var_caller": somatic_caller + germline_caller,
-            "bedchrom": config["panel"]["chrom"] if "panel" in config else [],
+            "bedshard": get_vardict_shards(config),
         })
 
     if 'rules_to_deliver' in config:
@@ -539,6 +557,11 @@ rule all:
         except OSError as e:
             print ("Error: %s - %s." % (e.filename, e.strerror))
 
+        # Remove the temporary bam files kept by cluster jobs when alignments are stored as CRAM
+        if config["analysis"].get("storage_mode") == "cram":
+            for bam_file in get_temp_bam_files(workflow.rules):
+                os.remove(bam_file)
+
         # Finish timestamp file
         with open(str(output.finish_file), mode="w") as finish_file:
             finish_file.write("%s\n" % datetime.datetime.now())
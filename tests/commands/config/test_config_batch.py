@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+from BALSAMIC.commands.config.batch import read_manifest
+
+
+def test_batch_config(
+    invoke_cli,
+    sample_fastq,
+    tmp_path,
+    balsamic_cache,
+    panel_bed_file,
+    sentieon_license,
+    sentieon_install_dir,
+):
+    # GIVEN a TSV manifest of a tumor normal and a tumor only case, and an analysis dir
+    test_analysis_dir = tmp_path / "test_analysis_dir"
+    test_analysis_dir.mkdir()
+    manifest = tmp_path / "manifest.tsv"
+    manifest.write_text(
+        "case_id\ttumor\tnormal\tpanel_bed\tgender\n"
+        f"batch_tumor_normal\t{sample_fastq['tumor']}\t{sample_fastq['normal']}\t{panel_bed_file}\tmale\n"
+        f"batch_tumor_only\t{sample_fastq['tumor']}\t\t{panel_bed_file}\t\n"
+    )
+
+    # WHEN configuring the cases of the manifest
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        result = invoke_cli(
+            [
+                "config",
+                "batch",
+                "--manifest",
+                manifest.as_posix(),
+                "--analysis-dir",
+                test_analysis_dir.as_posix(),
+                "--balsamic-cache",
+                balsamic_cache,
+                "--workers",
+                "2",
+            ],
+        )
+
+    # THEN a config should be created for each case, with its own options
+    assert result.exit_code == 0
+    for case_id, analysis_type, gender in [
+        ("batch_tumor_normal", "paired", "male"),
+        ("batch_tumor_only", "single", "female"),
+    ]:
+        config_path = Path(test_analysis_dir, case_id, case_id + ".json")
+        assert config_path.exists()
+        config = json.loads(config_path.read_text())
+        assert config["analysis"]["analysis_type"] == analysis_type
+        assert config["analysis"]["gender"] == gender
+        assert any(Path(config["analysis"]["fastq_path"]).iterdir())
+
+
+def test_batch_config_unknown_option(
+    invoke_cli, sample_fastq, tmp_path, balsamic_cache
+):
+    # GIVEN a JSON manifest with an option balsamic config case does not have
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps(
+            [{"case_id": "batch_case", "tumor": [sample_fastq["tumor"]], "run": True}]
+        )
+    )
+
+    # WHEN configuring the cases of the manifest
+    result = invoke_cli(
+        [
+            "config",
+            "batch",
+            "--manifest",
+            manifest.as_posix(),
+            "--analysis-dir",
+            tmp_path.as_posix(),
+            "--balsamic-cache",
+            balsamic_cache,
+        ],
+    )
+
+    # THEN the batch should be aborted before any case is configured
+    assert result.exit_code == 1
+    assert not Path(tmp_path, "batch_case").exists()
+
+
+def test_read_manifest(tmp_path):
+    # GIVEN a TSV manifest with multiple fastq files and an empty field
+    manifest = tmp_path / "manifest.tsv"
+    manifest.write_text(
+        "case_id\ttumor\tnormal\n" "case_1\ttumor_R_1.fastq.gz,tumor_R_2.fastq.gz\t\n"
+    )
+
+    # WHEN reading the manifest
+    cases = read_manifest(manifest.as_posix())
+
+    # THEN empty fields should be left out
+    assert cases == [
+        {"case_id": "case_1", "tumor": "tumor_R_1.fastq.gz,tumor_R_2.fastq.gz"}
+    ]
@@ -1,6 +1,5 @@
 import os
 import json
-import graphviz
 import logging
 from unittest import mock
 from pathlib import Path
@@ -90,13 +89,14 @@ def test_create_pon_fastq_symlink(tmp_path_factory, caplog):
 
 
 def test_config_pon_graph_failed(
-    invoke_cli, analysis_dir, balsamic_cache, pon_fastq_path, panel_bed_file
+    invoke_cli, tmp_path, balsamic_cache, pon_fastq_path, panel_bed_file
 ):
-    # GIVEN an analysis config
+    # GIVEN an analysis config and a workflow that can not be resolved
     pon_case_id = "sample_pon"
+    analysis_dir = tmp_path.as_posix()
 
-    with mock.patch.object(graphviz, "Source") as mocked:
-        mocked.return_value = None
+    with mock.patch("BALSAMIC.utils.dag.build_dag") as mocked:
+        mocked.return_value = {"rules": [], "targets": [], "jobs": []}
         pon_result = invoke_cli(
             [
                 "config",
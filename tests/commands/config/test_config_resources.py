@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+from tests.helpers import write_benchmark_case
+
+
+def test_resources_config(invoke_cli, tmp_path):
+    # GIVEN an analysis dir with benchmarks of a past case
+    analysis_dir = tmp_path / "analysis_dir"
+    write_benchmark_case(analysis_dir, "case_1", runtime=3600, fastq_size=1024)
+    output_config = tmp_path / "cluster.json"
+
+    # WHEN creating a cluster config from the benchmarks
+    result = invoke_cli(
+        [
+            "config",
+            "resources",
+            "--analysis-dir",
+            analysis_dir,
+            "--sequencing-type",
+            "wgs",
+            "--output-config",
+            output_config,
+        ]
+    )
+
+    # THEN the benchmarked rule should be sized in the cluster config
+    assert result.exit_code == 0
+    cluster_config = json.loads(output_config.read_text())
+    assert cluster_config["bwa_mem"]["time"] == "01:12:00"
+    assert "__default__" in cluster_config
+
+
+def test_resources_config_no_benchmarks(invoke_cli, tmp_path):
+    # GIVEN an analysis dir with benchmarks of a WGS case
+    analysis_dir = tmp_path / "analysis_dir"
+    write_benchmark_case(analysis_dir, "case_1", runtime=3600, fastq_size=1024)
+
+    # WHEN creating a cluster config from targeted benchmarks
+    result = invoke_cli(
+        [
+            "config",
+            "resources",
+            "--analysis-dir",
+            analysis_dir,
+            "--sequencing-type",
+            "targeted",
+            "--output-config",
+            tmp_path / "cluster.json",
+        ]
+    )
+
+    # THEN the command should abort
+    assert result.exit_code == 1
+
+
+def test_resources_config_no_input_size(invoke_cli, tmp_path, caplog):
+    # GIVEN an analysis dir with benchmarks of a past case without fastq files
+    analysis_dir = tmp_path / "analysis_dir"
+    write_benchmark_case(analysis_dir, "case_1", runtime=3600, fastq_size=0)
+    output_config = tmp_path / "cluster.json"
+
+    # WHEN creating a cluster config for a given input size
+    result = invoke_cli(
+        [
+            "config",
+            "resources",
+            "--analysis-dir",
+            analysis_dir,
+            "--sequencing-type",
+            "wgs",
+            "--input-size",
+            "1",
+            "--output-config",
+            output_config,
+        ]
+    )
+
+    # THEN the command should abort without writing the cluster config
+    assert result.exit_code == 1
+    assert "input size" in caplog.text
+    assert not output_config.exists()
@@ -3,10 +3,10 @@ import json
 
 from unittest import mock
 
-import graphviz
-
 from pathlib import Path
 
+from BALSAMIC.utils.dag import RULE_GRAPH_CACHE
+
 
 def test_tumor_normal_config(
     invoke_cli,
@@ -116,11 +116,16 @@ def test_dag_graph_success(
     tumor_only_wgs_config,
 ):
     # WHEN creating config using standard CLI input and setting Sentieon env vars
-    # THEN DAG graph should be created successfully
-    assert Path(json.load(open(tumor_normal_config))["analysis"]["dag"]).exists()
-    assert Path(json.load(open(tumor_only_config))["analysis"]["dag"]).exists()
-    assert Path(json.load(open(tumor_only_wgs_config))["analysis"]["dag"]).exists()
-    assert Path(json.load(open(tumor_normal_wgs_config))["analysis"]["dag"]).exists()
+    # THEN DAG graph should be saved in DOT format, to be rendered on request
+    for config in [
+        tumor_normal_config,
+        tumor_only_config,
+        tumor_only_wgs_config,
+        tumor_normal_wgs_config,
+    ]:
+        dag = Path(json.load(open(config))["analysis"]["dag"])
+        assert dag.with_suffix(".dot").exists()
+        assert not dag.exists()
 
 
 def test_config_bad_filename(
@@ -225,14 +230,15 @@ def test_tumor_only_umi_config_background_file(
 
 
 def test_config_graph_failed(
-    invoke_cli, sample_fastq, analysis_dir, balsamic_cache, panel_bed_file
+    invoke_cli, sample_fastq, tmp_path, balsamic_cache, panel_bed_file
 ):
-    # GIVEN an analysis config
+    # GIVEN an analysis config and a workflow that can not be resolved
     case_id = "sample_tumor_only"
     tumor = sample_fastq["tumor"]
+    analysis_dir = tmp_path.as_posix()
 
-    with mock.patch.object(graphviz, "Source") as mocked:
-        mocked.return_value = None
+    with mock.patch("BALSAMIC.utils.dag.build_dag") as mocked:
+        mocked.return_value = {"rules": [], "targets": [], "jobs": []}
         case_result = invoke_cli(
             [
                 "config",
@@ -253,6 +259,48 @@ def test_config_graph_failed(
     assert case_result.exit_code == 1
 
 
+def test_config_graph_cached_invalid_workflow(
+    invoke_cli,
+    sample_fastq,
+    tmp_path,
+    balsamic_cache,
+    panel_bed_file,
+    sentieon_license,
+    sentieon_install_dir,
+):
+    # GIVEN a configured case whose workflow variant has a cached rule graph
+    tumor = sample_fastq["tumor"]
+    analysis_dir = tmp_path.as_posix()
+    case_options = [
+        "config",
+        "case",
+        "-p",
+        panel_bed_file,
+        "-t",
+        tumor,
+        "--analysis-dir",
+        analysis_dir,
+        "--balsamic-cache",
+        balsamic_cache,
+    ]
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        result = invoke_cli(case_options + ["--case-id", "sample_tumor_only"])
+    assert result.exit_code == 0
+    assert list(Path(analysis_dir, RULE_GRAPH_CACHE).glob("*.dot"))
+
+    # WHEN configuring a case of the same variant without the Sentieon environment
+    result = invoke_cli(case_options + ["--case-id", "sample_tumor_only_2"])
+
+    # THEN the config should be validated despite the cached rule graph
+    assert result.exit_code == 1
+
+
 def test_pon_cnn_file(
     invoke_cli, sample_fastq, analysis_dir, balsamic_cache, panel_bed_file
 ):
@@ -283,3 +331,111 @@ def test_pon_cnn_file(
     # THEN program exits and checks for filepath
     assert result.exit_code == 0
     assert Path(pon_file).exists()
+
+
+def test_wgs_fuse_alignment_config(
+    invoke_cli,
+    sample_fastq,
+    tmp_path,
+    balsamic_cache,
+    sentieon_license,
+    sentieon_install_dir,
+):
+    # GIVEN a WGS tumor normal case and an analysis dir
+    test_analysis_dir = tmp_path / "test_analysis_dir"
+    test_analysis_dir.mkdir()
+    case_id = "sample_wgs_fused"
+
+    # WHEN creating a case analysis with a fused alignment
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        result = invoke_cli(
+            [
+                "config",
+                "case",
+                "-t",
+                sample_fastq["tumor"],
+                "-n",
+                sample_fastq["normal"],
+                "--case-id",
+                case_id,
+                "--analysis-dir",
+                test_analysis_dir,
+                "--balsamic-cache",
+                balsamic_cache,
+                "--fuse-alignment",
+            ],
+        )
+
+    # THEN the fused alignment rules should replace the alignment and merge rules
+    assert result.exit_code == 0
+    config = json.loads(Path(test_analysis_dir, case_id, case_id + ".json").read_text())
+    assert config["analysis"]["fuse_alignment"]
+    graph = Path(config["analysis"]["dag"]).with_suffix(".dot").read_text()
+    assert '"sentieon_align_dedup"' in graph
+    assert '"sentieon_realign"' in graph
+    assert '"mergeBam_tumor"' in graph
+    assert '"sentieon_dedup"' not in graph
+
+
+def test_wgs_calling_shards_config(
+    invoke_cli,
+    sample_fastq,
+    tmp_path,
+    balsamic_cache,
+    sentieon_license,
+    sentieon_install_dir,
+):
+    # GIVEN a WGS tumor normal case and an analysis dir
+    test_analysis_dir = tmp_path / "test_analysis_dir"
+    test_analysis_dir.mkdir()
+    case_id = "sample_wgs_sharded"
+
+    # WHEN creating a case analysis calling variants in four genome shards and
+    # annotating them in three chunks
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        result = invoke_cli(
+            [
+                "config",
+                "case",
+                "-t",
+                sample_fastq["tumor"],
+                "-n",
+                sample_fastq["normal"],
+                "--case-id",
+                case_id,
+                "--analysis-dir",
+                test_analysis_dir,
+                "--balsamic-cache",
+                balsamic_cache,
+                "--wgs-calling-shards",
+                "4",
+                "--vep-chunks",
+                "3",
+            ],
+        )
+
+    # THEN the variant callers should be run per shard and their calls merged
+    assert result.exit_code == 0
+    config = json.loads(Path(test_analysis_dir, case_id, case_id + ".json").read_text())
+    assert config["analysis"]["wgs_calling_shards"] == 4
+    graph = Path(config["analysis"]["dag"]).with_suffix(".dot").read_text()
+    assert '"split_wgs_calling_interval"' in graph
+    assert '"sentieon_TNscope_shard"' in graph
+    assert '"sentieon_DNAscope_shard"' in graph
+
+    # THEN the VCF files should be annotated in chunks
+    assert config["analysis"]["vep_chunks"] == 3
+    assert '"vep_chunk_regions"' in graph
+    assert '"vep_germline_tumor_chunk"' in graph
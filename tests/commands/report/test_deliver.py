@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from unittest import mock
 
@@ -96,3 +97,61 @@ def test_deliver_tumor_normal_panel(
         assert result.exit_code == 0
         assert actual_delivery_report.is_file()
         assert "following" in caplog.text
+
+
+def test_deliver_graph_failed(
+    invoke_cli,
+    environ,
+    tumor_only_config,
+    helpers,
+    sentieon_install_dir,
+    sentieon_license,
+    caplog,
+):
+    # GIVEN a tumor-only config file and a DAG graph that can not be rendered
+    helpers.read_config(tumor_only_config)
+    actual_delivery_report = Path(helpers.delivery_dir, helpers.case_id + ".hk")
+
+    with mock.patch.dict(
+        environ,
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ), mock.patch(
+        "BALSAMIC.commands.report.deliver.subprocess.check_output"
+    ), mock.patch(
+        "BALSAMIC.commands.report.deliver.render_graph",
+        side_effect=RuntimeError("dot not found"),
+    ), caplog.at_level(
+        logging.WARNING
+    ):
+        # WHEN delivering the case
+        result = invoke_cli(["report", "deliver", "--sample-config", tumor_only_config])
+
+        # THEN the delivery should fail
+        assert result.exit_code != 0
+        assert "dag graph generation failed" in caplog.text
+        assert not actual_delivery_report.exists()
+
+        # WHEN delivering the case allowing the graph to be missing
+        result = invoke_cli(
+            [
+                "report",
+                "deliver",
+                "--sample-config",
+                tumor_only_config,
+                "--allow-missing-graph",
+            ]
+        )
+
+        # THEN the case should be delivered with the graph listed as missing
+        assert result.exit_code == 0
+        with open(actual_delivery_report) as delivery_report:
+            delivery_json = json.load(delivery_report)
+        assert not [
+            delivery_file
+            for delivery_file in delivery_json["files"]
+            if "balsamic-dag" in delivery_file["tag"]
+        ]
+        assert delivery_json["missing_files"][0]["tag"] == ["balsamic-dag"]
@@ -116,3 +116,42 @@ def test_status_analysis_finish(
 
         # THEN it should run without any error
         assert result.exit_code == 0
+
+
+def test_status_show_jobs(
+    invoke_cli, tumor_normal_config, helpers, sentieon_install_dir, sentieon_license
+):
+    # GIVEN a tumor-normal config file and a job ledger of a submitted analysis
+    helpers.read_config(tumor_normal_config)
+    log_dir = Path(helpers.analysis_dir, helpers.case_id, "logs")
+    log_dir.mkdir(parents=True, exist_ok=True)
+    Path(log_dir, helpers.case_id + ".jobs.jsonl").write_text(
+        '{"job_id": "1001", "rule": "fastp", "command": "sbatch 1.sh", '
+        '"submit_time": "2022-01-01T00:00:00"}\n'
+        '{"job_id": "1002", "rule": "fastp", "command": "sbatch 2.sh", '
+        '"submit_time": "2022-01-01T00:00:01"}\n'
+    )
+    sacct_output = mock.Mock(stdout="1001|COMPLETED\n1002|RUNNING\n")
+
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ), mock.patch("BALSAMIC.utils.status.subprocess.run", return_value=sacct_output):
+        # WHEN running status with the show jobs flag
+        result = invoke_cli(
+            [
+                "report",
+                "status",
+                "--show-jobs",
+                "--sample-config",
+                tumor_normal_config,
+            ]
+        )
+
+        # THEN it should run without any error and report the job states per rule
+        assert result.exit_code == 0
+        assert "fastp: running 1, done 1, files 0/" in result.output
+        assert Path(Path(tumor_normal_config).parent, ".status_cache.json").exists()
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import json
 import pytest
@@ -7,7 +8,12 @@ from unittest import mock
 from BALSAMIC.utils.scheduler import SbatchScheduler
 from BALSAMIC.utils.scheduler import QsubScheduler
 from BALSAMIC.utils.scheduler import read_sample_config
-from BALSAMIC.utils.scheduler import write_sacct_file
+from BALSAMIC.utils.scheduler import read_job_properties
+from BALSAMIC.utils.scheduler import read_cached_sample_config
+from BALSAMIC.utils.scheduler import link_jobscript
+from BALSAMIC.utils.scheduler import SAMPLE_CONFIG_CACHE
+from BALSAMIC.utils.scheduler import write_job_ledger
+from BALSAMIC.utils.scheduler import read_job_ledger
 from BALSAMIC.utils.scheduler import submit_job
 from BALSAMIC.utils.scheduler import main as scheduler_main
 from BALSAMIC.utils.cli import createDir
@@ -54,9 +60,13 @@ def test_scheduler_slurm_py(snakemake_job_script, tumor_normal_config, capsys):
         mocked.return_value.stdout = test_return_value.encode("utf-8")
         scheduler_main(scheduler_cmd)
 
-    # THEN sacct file should be written with the job id(s)
-    with open(log_dir + "/sample_tumor_normal.sacct", "r") as fin:
-        assert fin.read() == test_jobid + "\n"
+    # THEN job ledger should be written with the job id and its dependencies
+    job_records = read_job_ledger(log_dir + "/sample_tumor_normal.jobs.jsonl")
+    assert job_records[0]["job_id"] == test_jobid
+    assert job_records[0]["rule"] == "all"
+    assert job_records[0]["dependencies"] == ["9000", "9001", "9002"]
+    assert job_records[0]["cores"] == 1
+    assert job_records[0]["time"] == "00:15:00"
 
     # THEN captured output is job id
     captured = capsys.readouterr()
@@ -100,9 +110,9 @@ def test_scheduler_qsub_py(snakemake_job_script, tumor_normal_config, capsys):
         mocked.return_value.stdout = test_return_value.encode("utf-8")
         scheduler_main(scheduler_cmd)
 
-    # THEN sacct file should be written with the job id(s)
-    with open(log_dir + "/sample_tumor_normal.sacct", "r") as fin:
-        assert fin.read() == test_jobname + "\n"
+    # THEN job ledger should be written with the job id
+    job_records = read_job_ledger(log_dir + "/sample_tumor_normal.jobs.jsonl")
+    assert job_records[0]["job_id"] == test_jobname
 
     # THEN captured output is job id
     captured = capsys.readouterr()
@@ -146,6 +156,7 @@ def test_SbatchScheduler():
     sbatch_cmd.output = "test_job.out"
     sbatch_cmd.mail_type = "FAIL"
     sbatch_cmd.mail_user = "john.doe@example.com"
+    sbatch_cmd.mem = 4000
     sbatch_cmd.ntasks = "2"
     sbatch_cmd.qos = "low"
     sbatch_cmd.time = "01:00:00"
@@ -160,7 +171,7 @@ def test_SbatchScheduler():
     assert sbatch_cmd == (
         'sbatch --account "development" --dependency "afterok:12345" --error "test_job.err" '
         '--output "test_job.out" --mail-type "FAIL" --mail-user "john.doe@example.com" '
-        '--ntasks "2" --qos "low" --time "01:00:00" --partition "dummy_partition" example_script.sh'
+        '--mem "4000" --ntasks "2" --qos "low" --time "01:00:00" --partition "dummy_partition" example_script.sh'
     )
 
 
@@ -173,6 +184,7 @@ def test_qsub_scheduler():
     qsub_cmd.output = "test_job.out"
     qsub_cmd.mail_type = "FAIL"
     qsub_cmd.mail_user = "john.doe@example.com"
+    qsub_cmd.mem = 4000
     qsub_cmd.ntasks = "2"
     qsub_cmd.qos = "low"
     qsub_cmd.time = "01:00:00"
@@ -185,7 +197,7 @@ def test_qsub_scheduler():
     assert isinstance(qsub_cmd, str)
     assert qsub_cmd == (
         "qsub -V -S /bin/bash  -q development  -e test_job.err  -o test_job.out  -m s   -M "
-        "john.doe@example.com  -p low  -l excl=1  -pe mpi 2   -hold_jid test_jobname.sh  example_script.sh "
+        "john.doe@example.com  -p low  -l excl=1  -pe mpi 2  -l h_vmem=2000M   -hold_jid test_jobname.sh  example_script.sh "
     )
 
 
@@ -199,15 +211,30 @@ def test_read_sample_config_err(config_files):
         assert read_sample_config(bed_file)
 
 
-def test_write_sacct_file_err():
+def test_write_job_ledger_err():
     with pytest.raises(FileNotFoundError):
-        # GIVEN a non-existing file path and jobid
+        # GIVEN a non-existing file path and a job record
         dummy_file_path = "dummy/dummy_fname"
-        dummy_jobid = "12345"
+        dummy_job_record = {"job_id": "12345"}
 
-        # WHEN calling write_sacct_file
+        # WHEN calling write_job_ledger
         # THEN It should raise the exception
-        assert write_sacct_file(dummy_file_path, dummy_jobid)
+        assert write_job_ledger(dummy_file_path, dummy_job_record)
+
+
+def test_read_job_ledger(tmp_path):
+    # GIVEN a job ledger with two records and a truncated one
+    job_ledger = tmp_path / "case.jobs.jsonl"
+    write_job_ledger(job_ledger, {"job_id": "1", "rule": "fastp"})
+    write_job_ledger(job_ledger, {"job_id": "2", "rule": "bwa_mem"})
+    with open(job_ledger, "a") as ledger:
+        ledger.write('{"job_id": "3", "ru')
+
+    # WHEN reading the job ledger
+    job_records = read_job_ledger(job_ledger)
+
+    # THEN only the complete records should be returned
+    assert [job_record["job_id"] for job_record in job_records] == ["1", "2"]
 
 
 def test_submit_job_err():
@@ -219,3 +246,108 @@ def test_submit_job_err():
         # WHEN calling submit_job function
         # THEN it should return the exit code 1 and raise the subprocess error
         assert submit_job(sbatch_cmd, profile)
+
+
+def test_read_job_properties(snakemake_job_script):
+    # GIVEN a snakemake jobscript
+
+    # WHEN reading its job properties
+    job_properties = read_job_properties(snakemake_job_script["snakescript"])
+
+    # THEN rule name and cluster settings should be parsed
+    assert job_properties["rule"] == "all"
+    assert job_properties["cluster"]["n"] == 1
+    assert job_properties["cluster"]["time"] == "00:15:00"
+
+
+def test_read_job_properties_err(config_files):
+    with pytest.raises(ValueError):
+        # GIVEN a file without snakemake job properties
+        bed_file = config_files["panel_bed_file"]
+
+        # WHEN calling read_job_properties
+        # THEN It should raise the exception error
+        assert read_job_properties(bed_file)
+
+
+def test_read_cached_sample_config(tumor_normal_config, tmp_path):
+    # GIVEN a sample config and an empty cache directory
+    config_path = tmp_path / "sample_config.json"
+    with open(tumor_normal_config, "r") as input_config:
+        sample_config = json.load(input_config)
+    with open(config_path, "w") as output_config:
+        json.dump(sample_config, output_config)
+
+    # WHEN reading the sample config through the cache
+    analysis = read_cached_sample_config(config_path, tmp_path)
+
+    # THEN the case id should be returned and the cache should be written
+    assert analysis["case_id"] == sample_config["analysis"]["case_id"]
+    assert (tmp_path / SAMPLE_CONFIG_CACHE).is_file()
+
+    # WHEN the sample config changes
+    sample_config["analysis"]["case_id"] = "modified_case"
+    with open(config_path, "w") as output_config:
+        json.dump(sample_config, output_config)
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # THEN the cache should be refreshed
+    assert (
+        read_cached_sample_config(config_path, tmp_path)["case_id"] == "modified_case"
+    )
+
+
+def test_link_jobscript(snakemake_job_script, tmp_path):
+    # GIVEN a jobscript and a script directory
+    jobscript = snakemake_job_script["snakescript"]
+
+    # WHEN linking the jobscript twice into the script directory
+    link_jobscript(jobscript, tmp_path)
+    script = link_jobscript(jobscript, tmp_path)
+
+    # THEN the jobscript should be hard-linked
+    assert os.path.samefile(script, jobscript)
+
+
+def test_scheduler_batch_submission(snakemake_job_script, tumor_normal_config):
+    # GIVEN a jobscript, a sample config and a stubbed sbatch
+    n_jobs = 50
+    with open(tumor_normal_config, "r") as input_config:
+        sample_config = json.load(input_config)
+    script_dir = createDir(sample_config["analysis"]["script"])
+    log_dir = createDir(sample_config["analysis"]["log"])
+    scheduler_cmd = [
+        "--sample-config",
+        tumor_normal_config,
+        "--profile",
+        "slurm",
+        "--account",
+        "development",
+        "--log-dir",
+        log_dir,
+        "--script-dir",
+        script_dir,
+        "--result-dir",
+        sample_config["analysis"]["result"],
+        "9000",
+        snakemake_job_script["snakescript"],
+    ]
+
+    # WHEN submitting a batch of jobs
+    with mock.patch.object(subprocess, "run") as mocked, mock.patch(
+        "BALSAMIC.utils.scheduler.read_sample_config", wraps=read_sample_config
+    ) as mocked_read_config:
+        mocked.return_value.stdout = b"Submitted batch job 12345"
+        for _ in range(n_jobs):
+            scheduler_main(scheduler_cmd)
+
+    # THEN every job should be submitted with its dependency
+    assert mocked.call_count == n_jobs
+    assert all(
+        "sbatch" in call.args[0] and "afterok:9000" in call.args[0]
+        for call in mocked.call_args_list
+    )
+
+    # THEN the sample config should be parsed at most once, by the first submission
+    assert mocked_read_config.call_count <= 1
@@ -48,3 +48,35 @@ class Map(dict):
     def __delitem__(self, key):
         super(Map, self).__delitem__(key)
         del self.__dict__[key]
+
+
+BENCHMARK_HEADER = (
+    "s\th:m:s\tmax_rss\tmax_vms\tmax_uss\tmax_pss\tio_in\tio_out\tmean_load\tcpu_time\n"
+)
+
+
+def write_benchmark_case(
+    analysis_dir: Path, case_id: str, runtime: int, fastq_size: int
+):
+    """Writes a case config, fastq file and bwa_mem benchmark in analysis_dir"""
+
+    case_dir = Path(analysis_dir, case_id)
+    benchmark_dir = Path(case_dir, "analysis", "benchmarks")
+    fastq_dir = Path(case_dir, "analysis", "fastq")
+    benchmark_dir.mkdir(parents=True)
+    fastq_dir.mkdir(parents=True)
+    Path(fastq_dir, "tumor_R_1.fastq.gz").write_bytes(b"0" * fastq_size)
+    Path(benchmark_dir, "bwa_mem_tumor.tsv").write_text(
+        BENCHMARK_HEADER
+        + f"{runtime}\t0:00:00\t1000\t0\t0\t0\t0\t0\t0\t{runtime * 4}\n"
+    )
+    config = {
+        "analysis": {
+            "case_id": case_id,
+            "sequencing_type": "wgs",
+            "fastq_path": fastq_dir.as_posix(),
+            "benchmark": benchmark_dir.as_posix(),
+        },
+        "samples": {"tumor_R": {"type": "tumor"}},
+    }
+    Path(case_dir, case_id + ".json").write_text(json.dumps(config))
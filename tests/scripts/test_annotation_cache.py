@@ -0,0 +1,199 @@
+import os
+from pathlib import Path
+
+from BALSAMIC.assets.scripts.annotation_cache import annotation_cache, lock_cache
+
+VCF_HEADER = (
+    "##fileformat=VCFv4.2\n"
+    '##INFO=<ID=DP,Number=1,Type=Integer,Description="Depth">\n'
+    "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+)
+CSQ_HEADER = '##INFO=<ID=CSQ,Number=.,Type=String,Description="Consequence">\n'
+
+
+def write_vcf(vcf_file: Path, records: list, header: str = VCF_HEADER) -> str:
+    vcf_file.write_text(
+        header + "".join("\t".join(record) + "\n" for record in records)
+    )
+    return vcf_file.as_posix()
+
+
+def test_annotation_cache(tmp_path, cli_runner):
+    # GIVEN a VCF file of two variants, an empty cache and the options keying it
+    vep_cache = tmp_path / "vep"
+    (vep_cache / "homo_sapiens" / "104_GRCh37").mkdir(parents=True)
+    cache_options = [
+        "--cache",
+        (tmp_path / "cache.sqlite").as_posix(),
+        "--genome_version",
+        "hg19",
+        "--vep_cache",
+        vep_cache.as_posix(),
+        "--annotation_hash",
+        "hash",
+    ]
+    records = [
+        ["1", "100", ".", "A", "T", ".", "PASS", "DP=10"],
+        ["2", "200", ".", "G", "C", ".", "PASS", "DP=20"],
+    ]
+    input_vcf = write_vcf(tmp_path / "input.vcf", records)
+    novel_vcf = tmp_path / "novel.vcf"
+
+    # WHEN writing the variants missing in the cache
+    result = cli_runner.invoke(
+        annotation_cache,
+        ["novel"] + cache_options + ["-i", input_vcf, "-o", novel_vcf.as_posix()],
+    )
+
+    # THEN all variants should be novel
+    assert result.exit_code == 0
+    assert novel_vcf.read_text().count("PASS") == 2
+
+    # WHEN merging the annotated novel variants into the input VCF file
+    annotated_vcf = write_vcf(
+        tmp_path / "annotated.vcf",
+        [record[:7] + [record[7] + ";CSQ=missense"] for record in records],
+        VCF_HEADER.replace("#CHROM", CSQ_HEADER + "#CHROM"),
+    )
+    output_vcf = tmp_path / "output.vcf"
+    result = cli_runner.invoke(
+        annotation_cache,
+        ["merge"]
+        + cache_options
+        + ["-i", input_vcf, "-a", annotated_vcf, "-o", output_vcf.as_posix()],
+    )
+
+    # THEN the annotations should be merged into the records
+    assert result.exit_code == 0
+    assert CSQ_HEADER in output_vcf.read_text()
+    assert output_vcf.read_text().count("CSQ=missense") == 2
+
+    # WHEN annotating the cached variants again
+    novel_vcf.unlink()
+    result = cli_runner.invoke(
+        annotation_cache,
+        ["novel"] + cache_options + ["-i", input_vcf, "-o", novel_vcf.as_posix()],
+    )
+    cached_vcf = tmp_path / "cached.vcf"
+    merge_result = cli_runner.invoke(
+        annotation_cache,
+        ["merge"]
+        + cache_options
+        + [
+            "-i",
+            input_vcf,
+            "-a",
+            (tmp_path / "missing.vcf").as_posix(),
+            "-o",
+            cached_vcf.as_posix(),
+        ],
+    )
+
+    # THEN no variant should be annotated and the cached annotations merged
+    assert result.exit_code == 0
+    assert not novel_vcf.exists()
+    assert merge_result.exit_code == 0
+    assert cached_vcf.read_text() == output_vcf.read_text()
+
+
+def test_annotation_cache_missing_variant(tmp_path, cli_runner):
+    # GIVEN a VCF file of a variant missing in the cache
+    vep_cache = tmp_path / "vep"
+    vep_cache.mkdir()
+    input_vcf = write_vcf(
+        tmp_path / "input.vcf", [["1", "100", ".", "A", "T", ".", "PASS", "DP=10"]]
+    )
+
+    # WHEN merging the cached annotations without annotating the variant
+    result = cli_runner.invoke(
+        annotation_cache,
+        [
+            "merge",
+            "--cache",
+            (tmp_path / "cache.sqlite").as_posix(),
+            "--genome_version",
+            "hg19",
+            "--vep_cache",
+            vep_cache.as_posix(),
+            "--annotation_hash",
+            "hash",
+            "-i",
+            input_vcf,
+            "-a",
+            (tmp_path / "annotated.vcf").as_posix(),
+            "-o",
+            (tmp_path / "output.vcf").as_posix(),
+        ],
+    )
+
+    # THEN the merge should fail
+    assert result.exit_code != 0
+    assert "no cached annotation" in result.output
+
+
+def test_annotation_cache_no_records(tmp_path, cli_runner):
+    # GIVEN a VCF file without records and a cache without annotation header
+    vep_cache = tmp_path / "vep"
+    vep_cache.mkdir()
+    cache_options = [
+        "--cache",
+        (tmp_path / "cache.sqlite").as_posix(),
+        "--genome_version",
+        "hg19",
+        "--vep_cache",
+        vep_cache.as_posix(),
+        "--annotation_hash",
+        "hash",
+    ]
+    input_vcf = write_vcf(tmp_path / "input.vcf", [])
+    novel_vcf = tmp_path / "novel.vcf"
+
+    # WHEN writing the variants missing in the cache
+    result = cli_runner.invoke(
+        annotation_cache,
+        ["novel"] + cache_options + ["-i", input_vcf, "-o", novel_vcf.as_posix()],
+    )
+
+    # THEN the VCF file should still be annotated, for the header lines of the annotation
+    assert result.exit_code == 0
+    assert novel_vcf.exists()
+
+    # WHEN merging its annotation
+    annotated_vcf = write_vcf(
+        tmp_path / "annotated.vcf",
+        [],
+        VCF_HEADER.replace("#CHROM", CSQ_HEADER + "#CHROM"),
+    )
+    output_vcf = tmp_path / "output.vcf"
+    cli_runner.invoke(
+        annotation_cache,
+        ["merge"]
+        + cache_options
+        + ["-i", input_vcf, "-a", annotated_vcf, "-o", output_vcf.as_posix()],
+    )
+    novel_vcf.unlink()
+    result = cli_runner.invoke(
+        annotation_cache,
+        ["novel"] + cache_options + ["-i", input_vcf, "-o", novel_vcf.as_posix()],
+    )
+
+    # THEN the header lines should be cached and the VCF file not annotated again
+    assert CSQ_HEADER in output_vcf.read_text()
+    assert result.exit_code == 0
+    assert not novel_vcf.exists()
+
+
+def test_lock_cache(tmp_path):
+    # GIVEN a cache with a lock left by a killed job
+    cache_file = (tmp_path / "cache.sqlite").as_posix()
+    lock_file = Path(cache_file + ".lock")
+    lock_file.touch()
+    os.utime(lock_file, (0, 0))
+
+    # WHEN locking the cache
+    with lock_cache(cache_file):
+        # THEN the stale lock should be replaced by the lock of the job
+        assert lock_file.read_text().strip().endswith(str(os.getpid()))
+
+    # THEN the lock should be released
+    assert not lock_file.exists()
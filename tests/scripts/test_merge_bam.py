@@ -0,0 +1,125 @@
+import re
+from pathlib import Path
+
+import pytest
+
+pysam = pytest.importorskip("pysam")
+
+from BALSAMIC.assets.scripts.merge_bam import merge_bam
+from BALSAMIC.constants.common import RULE_DIRECTORY
+
+
+def write_bam(bam_path: Path, reference: Path) -> None:
+    """Writes a sorted BAM file of two mapped reads and an unmapped read"""
+
+    reference.write_text(">1\n" + "ACGT" * 25 + "\n")
+    pysam.faidx(reference.as_posix())
+    header = {
+        "HD": {"VN": "1.6", "SO": "coordinate"},
+        "SQ": [{"SN": "1", "LN": 100}],
+        "RG": [{"ID": "ACC1", "SM": "ACC1"}],
+    }
+    with pysam.AlignmentFile(bam_path.as_posix(), "wb", header=header) as bam:
+        for name, position, flag in [("mapped_1", 0, 0), ("mapped_2", 10, 0)]:
+            read = pysam.AlignedSegment(bam.header)
+            read.query_name = name
+            read.reference_id = 0
+            read.reference_start = position
+            read.flag = flag
+            read.mapping_quality = 60
+            read.cigarstring = "8M"
+            read.query_sequence = "ACGTACGT"
+            read.query_qualities = pysam.qualitystring_to_array("IIIIIIII")
+            read.set_tag("RG", "ACC1")
+            bam.write(read)
+        read = pysam.AlignedSegment(bam.header)
+        read.query_name = "unmapped"
+        read.flag = 4
+        read.query_sequence = "ACGTACGT"
+        read.query_qualities = pysam.qualitystring_to_array("IIIIIIII")
+        bam.write(read)
+
+
+def test_merge_bam(tmp_path, cli_runner):
+    # GIVEN a BAM file with an unmapped read and the reference it is aligned to
+    input_bam = tmp_path / "ACC1.bam"
+    reference = tmp_path / "reference.fasta"
+    write_bam(input_bam, reference)
+    output_bam = tmp_path / "tumor.merged.bam"
+    output_cram = tmp_path / "tumor.merged.cram"
+
+    # WHEN merging the BAM file
+    result = cli_runner.invoke(
+        merge_bam,
+        [
+            "--input_bam",
+            input_bam.as_posix(),
+            "--output_bam",
+            output_bam.as_posix(),
+            "--output_cram",
+            output_cram.as_posix(),
+            "--reference",
+            reference.as_posix(),
+            "--rg_id",
+            "TUMOR",
+            "--rg_tag",
+            "PL:ILLUMINAi",
+        ],
+    )
+
+    # THEN the BAM and CRAM files should hold the mapped reads with the new read group
+    assert result.exit_code == 0
+    assert Path(output_bam.as_posix() + ".bai").exists()
+    assert Path(output_cram.as_posix() + ".crai").exists()
+    with pysam.AlignmentFile(output_bam.as_posix(), "rb") as bam:
+        assert bam.header.to_dict()["RG"] == [
+            {"ID": "TUMOR", "SM": "TUMOR", "PL": "ILLUMINAi"}
+        ]
+        reads = list(bam)
+    assert [read.query_name for read in reads] == ["mapped_1", "mapped_2"]
+    assert {read.get_tag("RG") for read in reads} == {"TUMOR"}
+    with pysam.AlignmentFile(
+        output_cram.as_posix(), "rc", reference_filename=reference.as_posix()
+    ) as cram:
+        assert [read.query_name for read in cram] == ["mapped_1", "mapped_2"]
+
+
+def test_merge_bam_fused_filter_flags(tmp_path, cli_runner):
+    # GIVEN the flags of the reads removed by the merge rules of the fused alignment
+    fused_rule = Path(
+        RULE_DIRECTORY, "snakemake_rules", "align", "sentieon_alignment_fused.rule"
+    ).read_text()
+    filter_flags = set(re.findall(r"samtools view .* -F (\d+) ", fused_rule))
+
+    # GIVEN a BAM file with an unmapped read
+    input_bam = tmp_path / "ACC1.bam"
+    reference = tmp_path / "reference.fasta"
+    write_bam(input_bam, reference)
+    output_bam = tmp_path / "tumor.merged.bam"
+
+    # WHEN merging the BAM file as the merge rules of the unfused alignment do
+    result = cli_runner.invoke(
+        merge_bam,
+        [
+            "--input_bam",
+            input_bam.as_posix(),
+            "--output_bam",
+            output_bam.as_posix(),
+            "--output_cram",
+            (tmp_path / "tumor.merged.cram").as_posix(),
+            "--reference",
+            reference.as_posix(),
+            "--rg_id",
+            "TUMOR",
+        ],
+    )
+
+    # THEN both merges should remove the reads of the same flags
+    assert result.exit_code == 0
+    assert filter_flags == {"4"}
+    with pysam.AlignmentFile(input_bam.as_posix(), "rb") as bam:
+        fused_reads = [
+            read.query_name for read in bam.fetch(until_eof=True) if not read.flag & 4
+        ]
+    with pysam.AlignmentFile(output_bam.as_posix(), "rb") as bam:
+        assert [read.query_name for read in bam] == fused_reads
@@ -1,6 +1,10 @@
+import json
+import subprocess
+from pathlib import Path
 from unittest import mock
 import snakemake
 
+from BALSAMIC.constants.common import RULE_DIRECTORY
 from BALSAMIC.utils.cli import get_snakefile
 
 MOCKED_OS_ENVIRON = "os.environ"
@@ -28,6 +32,30 @@ def test_workflow_tumor_normal(
         assert snakemake.snakemake(snakefile, configfiles=[config_json], dryrun=True)
 
 
+def test_workflow_tmpdir_not_created(
+    tumor_normal_config, sentieon_install_dir, sentieon_license
+):
+    # GIVEN a sample config dict and snakefile
+    snakefile = get_snakefile("paired", "balsamic", "hg19")
+    with open(tumor_normal_config) as f:
+        tmp_dir = Path(json.load(f)["analysis"]["result"], "tmp")
+
+    # WHEN invoking snakemake module with dryrun option
+    with mock.patch.dict(
+        MOCKED_OS_ENVIRON,
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        assert snakemake.snakemake(
+            snakefile, configfiles=[tumor_normal_config], dryrun=True, forceall=True
+        )
+
+    # THEN no job tmpdir should be created when parsing the workflow
+    assert not list(tmp_dir.iterdir())
+
+
 def test_workflow_tumor_only(tumor_only_config, sentieon_install_dir, sentieon_license):
     # GIVEN a sample config dict and snakefile
     workflow = "single"
@@ -141,3 +169,38 @@ def test_workflow_sentieon(
                 analysis_type, analysis_workflow, reference_genome
             )
             assert snakemake.snakemake(snakefile, configfiles=[config], dryrun=True)
+
+
+def test_vep_chunk_annotation_cache_empty_chunk(tmp_path):
+    # GIVEN the rules annotating VCF chunks through the annotation cache
+    vep_rule = Path(RULE_DIRECTORY, "snakemake_rules", "annotation", "vep.rule")
+    chunk_rules = [
+        rule
+        for rule in vep_rule.read_text().split("  rule ")
+        if rule.startswith(
+            (
+                "vep_somatic_research_snv_chunk:",
+                "vep_germline_tumor_chunk:",
+                "vep_germline_normal_chunk:",
+            )
+        )
+    ]
+
+    # GIVEN a chunk without records, written by the cache without its annotation header
+    novel_vcf = tmp_path / "chunk.novel.vcf"
+    novel_vcf.write_text("##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\n")
+
+    # WHEN evaluating the condition of the annotation of each chunk rule
+    # THEN the chunk should be annotated, for the annotation header to be cached
+    assert len(chunk_rules) == 3
+    for rule in chunk_rules:
+        condition = next(
+            line
+            for line in rule.splitlines()
+            if line.startswith("if [[") and "$novel_vcf" in line
+        )
+        condition = condition.replace("{params.annotation_cache}", "-c cache.sqlite")
+        result = subprocess.run(
+            ["bash", "-c", f"novel_vcf={novel_vcf}; {condition} exit 0; fi; exit 1"]
+        )
+        assert result.returncode == 0
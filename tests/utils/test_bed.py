@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from BALSAMIC.utils.bed import (
+    get_genome_shards,
+    get_region_count,
+    merge_regions,
+    read_bed,
+    read_chrom_sizes,
+    read_interval_list,
+    slop_regions,
+    split_regions,
+    write_bed_shards,
+)
+
+
+def test_read_bed(tmp_path):
+    # GIVEN an unsorted BED file with a header and a gene name column
+    bed_file = tmp_path / "panel.bed"
+    bed_file.write_text(
+        "track name=panel\n"
+        "1\t500\t600\tGENE2\n"
+        "2\t10\t20\tGENE3\n"
+        "1\t100\t200\tGENE1\n"
+    )
+
+    # WHEN reading the BED file
+    regions = read_bed(bed_file.as_posix())
+
+    # THEN the regions of each contig should be sorted by start
+    assert list(regions) == ["1", "2"]
+    assert regions["1"].tolist() == [[100, 200], [500, 600]]
+    assert regions["2"].tolist() == [[10, 20]]
+
+
+def test_read_chrom_sizes(tmp_path):
+    # GIVEN a chrom sizes file with chr prefixes and an alternative contig
+    chrom_sizes_file = tmp_path / "chrom.sizes"
+    chrom_sizes_file.write_text("chr1\t1000\nchr1_gl000191_random\t100\nchrX\t500\n")
+
+    # WHEN reading the chrom sizes
+    # THEN contigs should be named without prefix and alternative contigs left out
+    assert read_chrom_sizes(chrom_sizes_file.as_posix()) == {"1": 1000, "X": 500}
+
+
+def test_slop_merge_regions():
+    # GIVEN regions close to each other and to the contig boundaries
+    regions = {"1": np.array([[50, 100], [250, 300], [900, 950]])}
+
+    # WHEN padding the regions by 100bp and merging them
+    padded_regions = slop_regions(regions, 100, {"1": 1000})
+    merged_regions = merge_regions(padded_regions)
+
+    # THEN the padded regions should be clipped to the contig and the overlapping merged
+    assert padded_regions["1"].tolist() == [[0, 200], [150, 400], [800, 1000]]
+    assert merged_regions["1"].tolist() == [[0, 400], [800, 1000]]
+    assert get_region_count(merged_regions) == 2
+
+
+def test_split_regions():
+    # GIVEN a large region followed by small regions on another contig
+    regions = {
+        "1": np.array([[0, 1000]]),
+        "2": np.array([[0, 100], [200, 300], [400, 500], [600, 700]]),
+    }
+
+    # WHEN splitting the regions into three shards
+    shards = split_regions(regions, 3)
+
+    # THEN no shard should be empty and the regions kept in order
+    assert [get_region_count(shard) for shard in shards] == [1, 1, 3]
+    assert shards[0]["1"].tolist() == [[0, 1000]]
+    assert shards[2]["2"].tolist() == [[200, 300], [400, 500], [600, 700]]
+
+
+def test_split_regions_weights():
+    # GIVEN regions of equal size weighted by their number of records
+    regions = {"1": np.array([[0, 100], [100, 200], [200, 300], [300, 400]])}
+    weights = {"1": np.array([30.0, 1.0, 1.0, 1.0])}
+
+    # WHEN splitting the regions into two shards by their weights
+    shards = split_regions(regions, 2, weights=weights)
+
+    # THEN the heavy region should be a shard on its own
+    assert shards[0]["1"].tolist() == [[0, 100]]
+    assert get_region_count(shards[1]) == 3
+
+
+def test_write_bed_shards(tmp_path):
+    # GIVEN a BED file of many regions of equal size
+    bed_file = tmp_path / "panel.bed"
+    bed_file.write_text(
+        "".join(f"1\t{start}\t{start + 100}\n" for start in range(1000, 101000, 1000))
+    )
+    shard_files = [(tmp_path / "shards" / f"shard_{shard}.bed") for shard in range(4)]
+
+    # WHEN writing the padded regions in four shards
+    write_bed_shards(
+        bed_file.as_posix(),
+        [shard_file.as_posix() for shard_file in shard_files],
+        padding=100,
+    )
+
+    # THEN every shard should hold the same number of bases
+    shard_bases = [
+        sum(
+            int(end) - int(start)
+            for _, start, end in (
+                line.split("\t") for line in shard_file.read_text().splitlines()
+            )
+        )
+        for shard_file in shard_files
+    ]
+    assert shard_bases == [7500] * 4
+
+
+def test_read_interval_list(tmp_path):
+    # GIVEN a Picard interval list with a header
+    interval_file = tmp_path / "calling_regions.interval_list"
+    interval_file.write_text(
+        "@HD\tVN:1.5\n@SQ\tSN:1\tLN:10000\n1\t1\t500\t+\t.\n1\t1001\t2000\t+\t.\n"
+    )
+
+    # WHEN reading the interval list
+    # THEN the 1-based closed intervals should be converted to BED regions
+    assert read_interval_list(interval_file.as_posix())["1"].tolist() == [
+        [0, 500],
+        [1000, 2000],
+    ]
+
+
+def test_get_genome_shards():
+    # GIVEN calling regions of two contigs and a genome of three contigs
+    regions = {
+        "1": np.array([[0, 1000], [2000, 3000]]),
+        "2": np.array([[0, 2000]]),
+    }
+    contig_sizes = {"1": 5000, "2": 3000, "MT": 16569}
+
+    # WHEN splitting the genome in two shards
+    genome_shards = get_genome_shards(regions, contig_sizes, 2)
+
+    # THEN the shards should be cut at the start of a region and cover the genome in order
+    assert genome_shards == ["1:1-5000", "2:1-3000,MT:1-16569"]
+
+
+def test_get_genome_shards_too_many_shards():
+    # GIVEN a single calling region
+    regions = {"1": np.array([[0, 1000]])}
+
+    # WHEN splitting the genome in more shards than regions
+    # THEN a ValueError should be raised
+    with pytest.raises(ValueError):
+        get_genome_shards(regions, {"1": 5000}, 2)
@@ -0,0 +1,220 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from BALSAMIC.utils.cli import get_snakefile
+from BALSAMIC.utils.dag import (
+    DAG_CACHE,
+    get_dag,
+    get_dag_cache_key,
+    get_rule_graph,
+    get_rule_graph_dot,
+    get_rule_outputs,
+    get_workflow_variant,
+    read_dag_cache,
+    write_dag_cache,
+)
+
+DAG = {
+    "rules": ["all", "bwa_mem", "fastp"],
+    "targets": ["analysis_finish"],
+    "jobs": [
+        {
+            "jobid": 0,
+            "rule": "fastp",
+            "wildcards": {"sample": "tumor"},
+            "input": ["tumor.fastq.gz"],
+            "output": ["tumor.fp.fastq.gz"],
+            "dependencies": [],
+        },
+        {
+            "jobid": 1,
+            "rule": "bwa_mem",
+            "wildcards": {"sample": "tumor"},
+            "input": ["tumor.fp.fastq.gz"],
+            "output": ["tumor.bam"],
+            "dependencies": [0],
+        },
+        {
+            "jobid": 2,
+            "rule": "all",
+            "wildcards": {},
+            "input": ["tumor.bam"],
+            "output": ["analysis_finish"],
+            "dependencies": [1],
+        },
+    ],
+}
+
+
+def test_get_dag_cache_key(tmp_path):
+    # GIVEN two sample configs with different content
+    config_1 = Path(tmp_path, "config_1.json")
+    config_1.write_text(json.dumps({"analysis": {"case_id": "case_1"}}))
+    config_2 = Path(tmp_path, "config_2.json")
+    config_2.write_text(json.dumps({"analysis": {"case_id": "case_2"}}))
+
+    # WHEN computing their cache keys
+    key_1 = get_dag_cache_key("Snakefile", config_1.as_posix())
+    key_2 = get_dag_cache_key("Snakefile", config_2.as_posix())
+
+    # THEN the keys should only differ in the sample config
+    assert key_1["sample_config"] != key_2["sample_config"]
+    assert key_1["rule_files"] == key_2["rule_files"]
+
+
+def test_read_dag_cache(tmp_path):
+    # GIVEN a cached workflow
+    cache_file = Path(tmp_path, DAG_CACHE).as_posix()
+    write_dag_cache(cache_file, {"sample_config": "abc"}, DAG)
+
+    # WHEN reading the cache with the same and with another key
+    # THEN the workflow should only be returned for the key it was cached with
+    assert read_dag_cache(cache_file, {"sample_config": "abc"}) == DAG
+    assert read_dag_cache(cache_file, {"sample_config": "def"}) is None
+
+
+def test_read_dag_cache_malformed(tmp_path):
+    # GIVEN a truncated cache file
+    cache_file = Path(tmp_path, DAG_CACHE)
+    cache_file.write_text('{"key": ')
+
+    # WHEN reading the cache
+    # THEN no workflow should be returned
+    assert read_dag_cache(cache_file.as_posix(), {}) is None
+
+
+def test_write_dag_cache_read_only(tmp_path):
+    # GIVEN a workflow cache in a read-only analysis directory
+    cache_file = Path(tmp_path, DAG_CACHE).as_posix()
+
+    # WHEN writing the cache fails
+    with mock.patch("builtins.open", side_effect=PermissionError("Read-only")):
+        write_dag_cache(cache_file, {"sample_config": "abc"}, DAG)
+
+    # THEN the workflow should be used without the cache
+    assert not Path(cache_file).exists()
+
+
+def test_get_rule_outputs():
+    # GIVEN a resolved workflow
+
+    # WHEN getting the outputs of each rule
+    rule_outputs = get_rule_outputs(DAG)
+
+    # THEN every rule should map to the outputs of its jobs
+    assert rule_outputs == {
+        "fastp": ["tumor.fp.fastq.gz"],
+        "bwa_mem": ["tumor.bam"],
+        "all": ["analysis_finish"],
+    }
+
+
+def test_get_rule_graph_dot():
+    # GIVEN a resolved workflow
+
+    # WHEN building its rule graph
+    rule_graph = get_rule_graph_dot(DAG)
+
+    # THEN every rule should be a node and every dependency between rules an edge
+    assert rule_graph.startswith("digraph snakemake_dag {")
+    assert '[label = "bwa_mem"' in rule_graph
+    assert "\t2 -> 1" in rule_graph
+    assert "\t1 -> 0" in rule_graph
+    assert rule_graph.count("->") == 2
+
+
+def test_get_dag(tumor_normal_config, sentieon_license, sentieon_install_dir):
+    # GIVEN a sample config of a tumor normal case
+    with open(tumor_normal_config) as f:
+        sample_config = json.load(f)
+    snakefile = get_snakefile(
+        analysis_type=sample_config["analysis"]["analysis_type"],
+        analysis_workflow=sample_config["analysis"]["analysis_workflow"],
+        reference_genome=sample_config["reference"]["reference_genome"],
+    )
+
+    # WHEN resolving its workflow twice
+    with mock.patch.dict(
+        "os.environ",
+        {
+            "SENTIEON_LICENSE": sentieon_license,
+            "SENTIEON_INSTALL_DIR": sentieon_install_dir,
+        },
+    ):
+        dag = get_dag(snakefile=snakefile, sample_config=tumor_normal_config)
+        with mock.patch("BALSAMIC.utils.dag.build_dag") as mocked_build_dag:
+            cached_dag = get_dag(snakefile=snakefile, sample_config=tumor_normal_config)
+
+    # THEN the workflow should be resolved once and read from the cache afterwards
+    assert dag["jobs"]
+    assert "fastp" in dag["rules"]
+    assert Path(Path(tumor_normal_config).parent, DAG_CACHE).exists()
+    mocked_build_dag.assert_not_called()
+    assert cached_dag == dag
+
+
+def test_get_workflow_variant(tumor_normal_config):
+    # GIVEN the sample configs of two cases that only differ in their samples
+    with open(tumor_normal_config) as f:
+        sample_config = json.load(f)
+    other_sample_config = json.loads(json.dumps(sample_config))
+    other_sample_config["analysis"]["case_id"] = "other_case"
+    other_sample_config["samples"] = {"other_tumor": {"type": "tumor"}}
+
+    # WHEN getting their workflow variants
+    # THEN the cases should share their variant
+    assert get_workflow_variant(sample_config) == get_workflow_variant(
+        other_sample_config
+    )
+
+    # WHEN a variant caller is disabled
+    other_sample_config["disable_variant_caller"] = "vardict"
+
+    # THEN the cases should not share their variant
+    assert get_workflow_variant(sample_config) != get_workflow_variant(
+        other_sample_config
+    )
+
+    # WHEN VCF files are annotated in chunks or through an annotation cache
+    for analysis_option, value in [("vep_chunks", 4), ("annotation_cache", "a.db")]:
+        annotation_config = json.loads(json.dumps(sample_config))
+        annotation_config["analysis"][analysis_option] = value
+
+        # THEN the cases should not share their variant
+        assert get_workflow_variant(sample_config) != get_workflow_variant(
+            annotation_config
+        )
+
+
+def test_get_rule_graph(tmp_path):
+    # GIVEN a workflow variant without a cached rule graph
+    variant = {"analysis_type": "paired", "sequencing_type": "targeted"}
+
+    # WHEN getting the rule graph of two cases of that variant
+    with mock.patch("BALSAMIC.utils.dag.get_dag", return_value=DAG) as mocked_get_dag:
+        rule_graph = get_rule_graph("Snakefile", "case_1.json", variant, tmp_path)
+        cached_rule_graph = get_rule_graph(
+            "Snakefile", "case_2.json", variant, tmp_path
+        )
+
+    # THEN the workflow should only be resolved for the first case
+    mocked_get_dag.assert_called_once_with(
+        snakefile="Snakefile", sample_config="case_1.json"
+    )
+    assert rule_graph == get_rule_graph_dot(DAG)
+    assert cached_rule_graph == rule_graph
+
+
+def test_get_rule_graph_unresolved(tmp_path):
+    # GIVEN a workflow that can not be resolved
+    empty_dag = {"rules": [], "targets": [], "jobs": []}
+
+    # WHEN getting its rule graph
+    # THEN a ValueError should be raised and nothing be cached
+    with mock.patch("BALSAMIC.utils.dag.get_dag", return_value=empty_dag):
+        with pytest.raises(ValueError):
+            get_rule_graph("Snakefile", "case.json", {}, tmp_path)
+    assert not list(Path(tmp_path).rglob("*.dot"))
@@ -0,0 +1,155 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+from BALSAMIC.utils.status import (
+    get_existing_files,
+    get_job_states,
+    get_rule_job_states,
+    list_directory,
+    read_status_cache,
+    write_status_cache,
+)
+
+
+def test_get_job_states():
+    # GIVEN ledger records of SLURM and QSUB jobs
+    job_records = [
+        {"job_id": "1", "command": "sbatch 1.sh", "submit_time": "2022-01-02T00:00:00"},
+        {"job_id": "2", "command": "sbatch 2.sh", "submit_time": "2022-01-01T00:00:00"},
+        {"job_id": "3", "command": "qsub 3.sh", "submit_time": "2022-01-01T00:00:00"},
+    ]
+    sacct_output = mock.Mock(stdout="1|TIMEOUT\n2|CANCELLED by 1234\n")
+
+    # WHEN polling the job states
+    with mock.patch(
+        "BALSAMIC.utils.status.subprocess.run", return_value=sacct_output
+    ) as mocked_run:
+        job_states = get_job_states(job_records)
+
+    # THEN SLURM jobs should be polled with a single sacct call from the first submission
+    mocked_run.assert_called_once()
+    sacct_cmd = mocked_run.call_args[0][0]
+    assert sacct_cmd[sacct_cmd.index("--jobs") + 1] == "1,2"
+    assert sacct_cmd[sacct_cmd.index("--starttime") + 1] == "2022-01-01T00:00:00"
+    assert job_states == {"1": "failed", "2": "failed"}
+
+
+def test_get_job_states_no_sacct():
+    # GIVEN a ledger record of a SLURM job and no sacct executable
+    job_records = [
+        {"job_id": "1", "command": "sbatch 1.sh", "submit_time": "2022-01-01T00:00:00"}
+    ]
+
+    # WHEN polling the job states
+    with mock.patch(
+        "BALSAMIC.utils.status.subprocess.run", side_effect=FileNotFoundError
+    ):
+        job_states = get_job_states(job_records)
+
+    # THEN no job state should be returned
+    assert job_states == {}
+
+
+def test_get_rule_job_states():
+    # GIVEN job records and polled job states
+    job_records = [
+        {"job_id": "1", "rule": "bwa_mem"},
+        {"job_id": "2", "rule": "bwa_mem"},
+        {"job_id": "3", "rule": "fastp"},
+    ]
+    job_states = {"1": "done", "2": "running"}
+
+    # WHEN counting the job states per rule
+    rule_job_states = get_rule_job_states(job_records, job_states)
+
+    # THEN jobs without a polled state should be unknown
+    assert rule_job_states["bwa_mem"] == {"done": 1, "running": 1}
+    assert rule_job_states["fastp"] == {"unknown": 1}
+
+
+def test_get_existing_files(tmp_path):
+    # GIVEN a settled directory with one of two files
+    Path(tmp_path, "a.bam").touch()
+    os.utime(tmp_path, (0, 0))
+    files = [Path(tmp_path, "a.bam").as_posix(), Path(tmp_path, "b.bam").as_posix()]
+    directory_cache = {}
+
+    # WHEN checking which files exist
+    existing_files = get_existing_files(files, directory_cache)
+
+    # THEN only the existing file should be returned and the listing cached
+    assert existing_files == {files[0]}
+    assert directory_cache[tmp_path.as_posix()]["files"] == ["a.bam"]
+
+    # WHEN a file is created in the directory
+    Path(tmp_path, "b.bam").touch()
+
+    # THEN the modified directory should be listed again
+    assert get_existing_files(files, directory_cache) == set(files)
+
+
+def test_get_existing_files_directories(tmp_path):
+    # GIVEN files in several directories
+    files = []
+    for directory_name in ["bam", "vcf", "cnv"]:
+        Path(tmp_path, directory_name).mkdir()
+        Path(tmp_path, directory_name, "found.txt").touch()
+        files.append(Path(tmp_path, directory_name, "found.txt").as_posix())
+        files.append(Path(tmp_path, directory_name, "missing.txt").as_posix())
+
+    # WHEN checking which files exist
+    with mock.patch(
+        "BALSAMIC.utils.status.list_directory", wraps=list_directory
+    ) as mocked_list_directory:
+        existing_files = get_existing_files(files, {})
+
+    # THEN each directory should be listed once
+    assert sorted(call.args[0] for call in mocked_list_directory.call_args_list) == [
+        Path(tmp_path, directory_name).as_posix()
+        for directory_name in ["bam", "cnv", "vcf"]
+    ]
+    assert existing_files == {file for file in files if file.endswith("found.txt")}
+
+
+def test_get_existing_files_missing_directory(tmp_path):
+    # GIVEN a file in a missing directory
+    files = [Path(tmp_path, "missing", "a.bam").as_posix()]
+
+    # WHEN checking which files exist
+    # THEN no file should exist
+    assert get_existing_files(files, {}) == set()
+
+
+def test_read_status_cache(tmp_path):
+    # GIVEN a written status cache
+    cache_file = Path(tmp_path, ".status_cache.json").as_posix()
+    status_cache = read_status_cache(cache_file)
+    status_cache["directories"]["bam"] = {"mtime": 1, "files": ["a.bam"]}
+    write_status_cache(cache_file, status_cache)
+
+    # WHEN reading the status cache
+    # THEN the cached listings should be returned
+    assert read_status_cache(cache_file)["directories"]["bam"]["files"] == ["a.bam"]
+
+
+def test_read_status_cache_malformed(tmp_path):
+    # GIVEN a truncated status cache
+    cache_file = Path(tmp_path, ".status_cache.json")
+    cache_file.write_text('{"directories": {"bam"')
+
+    # WHEN reading the status cache
+    # THEN an empty cache should be returned
+    assert read_status_cache(cache_file.as_posix()) == {"directories": {}}
+
+
+def test_write_status_cache_read_only(tmp_path):
+    # GIVEN a status cache in a read-only analysis directory
+    cache_file = Path(tmp_path, ".status_cache.json").as_posix()
+
+    # WHEN writing the status cache fails
+    with mock.patch("builtins.open", side_effect=PermissionError("Read-only")):
+        write_status_cache(cache_file, {"directories": {}})
+
+    # THEN the status should be reported without the cache
+    assert not Path(cache_file).exists()
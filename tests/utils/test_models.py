@@ -283,6 +283,29 @@ def test_analysis_model():
         assert "not supported" in excinfo.value
 
 
+def test_analysis_model_storage_mode():
+    # GIVEN analysis arguments with an unknown storage mode
+    args = {
+        "case_id": "case_id",
+        "gender": "female",
+        "analysis_type": "paired",
+        "sequencing_type": "wgs",
+        "analysis_dir": "tests/test_data",
+        "analysis_workflow": "balsamic",
+        "storage_mode": "sam",
+    }
+
+    # THEN should trigger ValueError
+    with pytest.raises(ValueError, match="storage mode"):
+        AnalysisModel.parse_obj(args)
+
+    # WHEN the storage mode is not set
+    args.pop("storage_mode")
+
+    # THEN alignments should be stored as BAM
+    assert AnalysisModel.parse_obj(args).storage_mode == "bam"
+
+
 def test_sample_instance_model():
     # GIVEN valid input arguments
     valid_args = {"file_prefix": "S2_R", "type": "normal", "sample_name": "S2"}
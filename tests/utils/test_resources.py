@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from BALSAMIC.utils.resources import (
+    collect_benchmarks,
+    format_walltime,
+    get_benchmark_rule,
+    get_rule_names,
+    get_rule_resources,
+    tune_cluster_config,
+)
+from BALSAMIC.utils.exc import BalsamicError
+from tests.helpers import write_benchmark_case
+
+
+def test_get_benchmark_rule():
+    # GIVEN the BALSAMIC rule names
+    rule_names = get_rule_names()
+
+    # WHEN resolving the rule of benchmark files
+    # THEN the longest rule name prefixing the file name should be returned
+    assert get_benchmark_rule(Path("bwa_mem_tumor.tsv"), rule_names) == "bwa_mem"
+    assert (
+        get_benchmark_rule(Path("vardict_tumor_normal_1.tsv"), rule_names)
+        == "vardict_tumor_normal"
+    )
+    assert get_benchmark_rule(Path("not_a_rule.tsv"), rule_names) is None
+
+
+def test_format_walltime():
+    # GIVEN runtimes in seconds
+    # WHEN formatting them as walltime
+    # THEN they should be rounded up to minutes, with a minimum walltime
+    assert format_walltime(3601) == "01:01:00"
+    assert format_walltime(1) == "00:05:00"
+
+
+def test_get_rule_resources(tmp_path):
+    # GIVEN benchmarks of two past cases
+    write_benchmark_case(tmp_path, "case_1", runtime=3600, fastq_size=1024**2)
+    write_benchmark_case(tmp_path, "case_2", runtime=7200, fastq_size=2 * 1024**2)
+    benchmarks = collect_benchmarks(tmp_path, get_rule_names())
+
+    # WHEN sizing the rules at the 100th percentile
+    rule_resources = get_rule_resources(benchmarks, percentile=100, headroom=1)
+
+    # THEN the largest usage should be reserved
+    assert rule_resources["bwa_mem"]["time"] == "02:00:00"
+    assert rule_resources["bwa_mem"]["n"] == 4
+    assert rule_resources["bwa_mem"]["mem_mb"] == 1000
+    assert rule_resources["bwa_mem"]["cases"] == 2
+
+    # WHEN sizing the rules for a given input size
+    input_size = 4 * 1024**2 / 1024**3
+    rule_resources = get_rule_resources(
+        benchmarks, percentile=100, headroom=1, input_size=input_size
+    )
+
+    # THEN walltime should scale with the input size
+    assert rule_resources["bwa_mem"]["time"] == "04:00:00"
+
+
+def test_get_rule_resources_no_input_size(tmp_path):
+    # GIVEN benchmarks of a past case without fastq files
+    write_benchmark_case(tmp_path, "case_1", runtime=3600, fastq_size=0)
+    benchmarks = collect_benchmarks(tmp_path, get_rule_names())
+
+    # WHEN sizing the rules for a given input size
+    # THEN no rule should be sized
+    with pytest.raises(BalsamicError, match="input size"):
+        get_rule_resources(benchmarks, percentile=100, headroom=1, input_size=1)
+
+
+def test_tune_cluster_config():
+    # GIVEN a cluster config and benchmarked rule resources
+    cluster_config = {"__default__": {"n": 8, "time": "12:00:00"}}
+    rule_resources = {"bwa_mem": {"time": "01:00:00", "n": 24, "mem_mb": 2000}}
+
+    # WHEN tuning the cluster config
+    tuned_config = tune_cluster_config(cluster_config, rule_resources)
+
+    # THEN rule resources should be set, with cores capped at the configured cores
+    assert tuned_config["bwa_mem"] == {"time": "01:00:00", "n": 8, "mem_mb": 2000}
+    assert "bwa_mem" not in cluster_config
@@ -12,6 +12,8 @@ import logging
 
 from pathlib import Path
 
+from snakemake.io import is_flagged
+
 from BALSAMIC import __version__ as balsamic_version
 from BALSAMIC.utils.exc import BalsamicError, WorkflowRunError
 
@@ -33,21 +35,31 @@ from BALSAMIC.utils.cli import (
     find_file_index,
     validate_fastq_pattern,
     get_panel_chrom,
+    get_panel_region_count,
     create_fastq_symlink,
+    get_fastq_files,
+    get_fastq_index,
     get_fastq_bind_path,
+    get_scratch_bind_path,
+    get_sample_dict,
     singularity,
     get_file_extension,
     get_bioinfo_tools_version,
+    read_bioinfo_tools_version,
     convert_deliverables_tags,
     check_executable,
     job_id_dump_to_yaml,
+    get_rule_groups,
+    get_group_components,
     generate_h5,
     get_md5,
     create_md5,
+    render_graph,
 )
 from BALSAMIC.utils.io import read_json, write_json, read_yaml
 
 from BALSAMIC.utils.rule import (
+    get_annotation_cache,
     get_chrom,
     get_vcf,
     get_sample_type,
@@ -56,6 +68,18 @@ from BALSAMIC.utils.rule import (
     get_script_path,
     get_result_dir,
     get_threads,
+    get_java_heap,
+    get_alignment_extension,
+    get_storage_bam,
+    get_temp_bam_files,
+    get_vardict_shards,
+    get_vep_chunks,
+    get_wgs_calling_shards,
+    get_scratch_dir,
+    get_rule_tmpdir,
+    get_fastq_lanes,
+    get_fastq_fifo,
+    get_fastq_stream,
     get_delivery_id,
     get_reference_output_files,
     get_rule_output,
@@ -204,6 +228,56 @@ def test_get_bioinfo_pip_tools_version():
     assert set(bioinfo_tools["cnvkit"]).issubset({"0.9.9"})
 
 
+def test_read_bioinfo_tools_version(tmp_path):
+    """Test loading of precomputed bioinfo tool versions."""
+
+    # GIVEN no precomputed bioinfo tool versions
+    version_file = Path(tmp_path, "bioinfo_tools_version.json")
+
+    # WHEN reading the bioinfo tool versions
+    bioinfo_tools_version = read_bioinfo_tools_version(
+        version_file, BIOINFO_TOOL_ENV, CONTAINERS_CONDA_ENV_PATH
+    )
+
+    # THEN they should be parsed from the containers and stored
+    assert bioinfo_tools_version == get_bioinfo_tools_version(
+        BIOINFO_TOOL_ENV, CONTAINERS_CONDA_ENV_PATH
+    )
+    assert version_file.exists()
+
+    # WHEN reading them again
+    with mock.patch(
+        "BALSAMIC.utils.cli.get_bioinfo_tools_version"
+    ) as mocked_get_bioinfo_tools_version:
+        precomputed_tools_version = read_bioinfo_tools_version(
+            version_file, BIOINFO_TOOL_ENV, CONTAINERS_CONDA_ENV_PATH
+        )
+
+    # THEN the containers should not be parsed again
+    mocked_get_bioinfo_tools_version.assert_not_called()
+    assert precomputed_tools_version == bioinfo_tools_version
+
+
+def test_read_bioinfo_tools_version_outdated(tmp_path):
+    """Test loading of bioinfo tool versions precomputed by another installation."""
+
+    # GIVEN bioinfo tool versions stored by another BALSAMIC version
+    version_file = Path(tmp_path, "bioinfo_tools_version.json")
+    version_file.write_text(
+        json.dumps({"key": {"balsamic_version": "0.0.0"}, "bioinfo_tools_version": {}})
+    )
+
+    # WHEN reading the bioinfo tool versions
+    bioinfo_tools_version = read_bioinfo_tools_version(
+        version_file, BIOINFO_TOOL_ENV, CONTAINERS_CONDA_ENV_PATH
+    )
+
+    # THEN they should be parsed from the containers again
+    assert bioinfo_tools_version == get_bioinfo_tools_version(
+        BIOINFO_TOOL_ENV, CONTAINERS_CONDA_ENV_PATH
+    )
+
+
 def test_get_delivery_id():
     # GIVEN a delivery id, a dummy file string, list of tags, and a snakemake wildcard_dict
     delivery_id_to_check = "{case_name}"
@@ -307,6 +381,47 @@ def test_snakemake_local():
     assert "--forceall" in shell_command
 
 
+def test_snakemake_local_cram():
+    # GIVEN a local run of a case storing alignments as CRAM
+    snakemake_local = SnakeMake()
+    snakemake_local.working_dir = "this_path/snakemake"
+    snakemake_local.snakefile = "workflow/variantCalling_paired"
+    snakemake_local.configfile = "sample_config.json"
+    snakemake_local.run_mode = "local"
+    snakemake_local.keep_temp = False
+
+    # WHEN calling the build command
+    shell_command = snakemake_local.build_cmd()
+
+    # THEN temporary bam files should be removed by snakemake
+    assert "--notemp" not in shell_command
+
+    # WHEN the case is run on the cluster, with jobs submitted immediately
+    snakemake_local.run_mode = "cluster"
+
+    # THEN temporary files should be kept, to be removed by the last rule
+    assert "--notemp" in snakemake_local.build_cmd()
+
+
+def test_get_temp_bam_files(tmp_path):
+    # GIVEN rules with temporary bam outputs with and without wildcards
+    for bam_name in ["tumor.dedup.bam", "normal.dedup.bam", "tumor.merged.bam"]:
+        Path(tmp_path, bam_name).touch()
+    rules = [
+        Map({"temp_output": {f"{tmp_path}/{{sample}}.dedup.bam", f"{tmp_path}/r1.fq"}}),
+        Map({"temp_output": {f"{tmp_path}/tumor.merged.bam"}}),
+        Map({"temp_output": {f"{tmp_path}/normal.merged.bam"}}),
+    ]
+
+    # WHEN retrieving the temporary bam files left by the jobs
+    # THEN the existing bam files should be returned
+    assert get_temp_bam_files(rules) == [
+        f"{tmp_path}/normal.dedup.bam",
+        f"{tmp_path}/tumor.dedup.bam",
+        f"{tmp_path}/tumor.merged.bam",
+    ]
+
+
 def test_snakemake_slurm():
     # GIVEN required params
     snakemake_slurm = SnakeMake()
@@ -330,6 +445,7 @@ def test_snakemake_slurm():
     snakemake_slurm.use_singularity = True
     snakemake_slurm.singularity_bind = ["path_1", "path_2"]
     snakemake_slurm.run_analysis = True
+    snakemake_slurm.max_jobs_per_second = 50
 
     # WHEN calling the build command
     shell_command = snakemake_slurm.build_cmd()
@@ -344,6 +460,71 @@ def test_snakemake_slurm():
     assert "test_case" in shell_command
     assert "containers" in shell_command
     assert "--quiet" in shell_command
+    assert "--max-jobs-per-second 50" in shell_command
+
+
+def test_snakemake_slurm_group_jobs():
+    # GIVEN a cluster run with job grouping enabled
+    snakemake_slurm = SnakeMake()
+    snakemake_slurm.case_name = "test_case"
+    snakemake_slurm.working_dir = "this_path/snakemake"
+    snakemake_slurm.snakefile = "worflow/variantCalling_paired"
+    snakemake_slurm.configfile = "sample_config.json"
+    snakemake_slurm.run_mode = "cluster"
+    snakemake_slurm.cluster_config = get_config("cluster")
+    snakemake_slurm.scheduler = "sbatch.py"
+    snakemake_slurm.log_path = "logs/"
+    snakemake_slurm.script_path = "scripts/"
+    snakemake_slurm.result_path = "results/"
+    snakemake_slurm.account = "development"
+    snakemake_slurm.profile = "slurm"
+    snakemake_slurm.group_jobs = True
+
+    # WHEN calling the build command
+    shell_command = snakemake_slurm.build_cmd()
+
+    # THEN rules with a group hint should be passed as snakemake groups
+    assert "--groups" in shell_command
+    assert "multiqc=qc_report" in shell_command
+    assert "--group-components vardict_scatter=4" in shell_command
+
+
+def test_get_rule_groups():
+    # GIVEN the balsamic cluster config
+    cluster_config = get_config("cluster")
+
+    # WHEN reading the rule groups
+    rule_groups = get_rule_groups(cluster_config)
+
+    # THEN rules should be mapped to their group and every group should have resources
+    assert rule_groups["multiqc"] == "qc_report"
+    assert "__default__" not in rule_groups
+    with open(cluster_config, "r") as f:
+        cluster_config_dict = json.load(f)
+    for group in rule_groups.values():
+        assert group in cluster_config_dict
+
+
+def test_get_group_components():
+    # GIVEN the balsamic cluster config
+    cluster_config = get_config("cluster")
+
+    # WHEN reading the group components
+    group_components = get_group_components(cluster_config)
+
+    # THEN scatter groups should be mapped to their number of components
+    assert group_components == {"vardict_scatter": 4}
+
+    # THEN scatter groups should request the memory of all their concurrent components
+    with open(cluster_config, "r") as f:
+        cluster_config_dict = json.load(f)
+    for group, components in group_components.items():
+        member_mem_mb = [
+            rule_config.get("mem_mb", 0)
+            for rule_config in cluster_config_dict.values()
+            if rule_config.get("group") == group
+        ]
+        assert cluster_config_dict[group]["mem_mb"] >= components * max(member_mem_mb)
 
 
 def test_get_script_path():
@@ -678,6 +859,174 @@ def test_get_threads(config_files):
     assert get_threads(cluster_config, rule_name)
 
 
+def test_get_java_heap(config_files):
+    # GIVEN cluster config file
+    cluster_config = json.load(open(config_files["cluster_json"], "r"))
+
+    # WHEN passing a rule with memory in cluster config
+    # THEN the JVM heap should be a fraction of the rule memory
+    assert get_java_heap(cluster_config, "mergeBam_tumor", "16g") == "153600m"
+
+    # WHEN passing a rule without memory in cluster config
+    # THEN the default JVM heap should be returned
+    assert get_java_heap(cluster_config, "sentieon_align_sort", "16g") == "16g"
+
+
+def test_get_storage_bam():
+    # GIVEN a config storing alignments as CRAM and a config storing them as BAM
+    cram_config = {"analysis": {"storage_mode": "cram"}}
+    bam_config = {"analysis": {"storage_mode": "bam"}}
+
+    # WHEN retrieving the alignments read by downstream rules and a bam output
+    # THEN downstream rules should read CRAM files and bam outputs should be temporary
+    assert get_alignment_extension(cram_config) == "cram"
+    assert is_flagged(get_storage_bam(cram_config, "tumor.merged.bam"), "temp")
+
+    # THEN alignments stored as BAM should be read and kept as BAM
+    assert get_alignment_extension(bam_config) == "bam"
+    assert get_storage_bam(bam_config, "tumor.merged.bam") == "tumor.merged.bam"
+    assert not is_flagged(get_storage_bam(bam_config, "tumor.merged.bam"), "temp")
+
+
+def test_get_vardict_shards():
+    # GIVEN a panel config split in three shards and an older panel config
+    config = {"panel": {"chrom": ["1", "2"], "vardict_shards": 3}}
+    old_config = {"panel": {"chrom": ["1", "2"]}}
+
+    # WHEN retrieving the vardict shards
+    # THEN a name should be returned per shard, a single shard for older configs
+    assert get_vardict_shards(config) == ["shard_001", "shard_002", "shard_003"]
+    assert get_vardict_shards(old_config) == ["shard_001"]
+    assert get_vardict_shards({}) == []
+
+
+def test_get_wgs_calling_shards():
+    # GIVEN a WGS config split in two shards and a config called as a whole
+    config = {"analysis": {"wgs_calling_shards": 2}}
+    whole_config = {"analysis": {"wgs_calling_shards": 1}}
+
+    # WHEN retrieving the WGS calling shards
+    # THEN a name should be returned per shard, none when called as a whole
+    assert get_wgs_calling_shards(config) == ["shard_001", "shard_002"]
+    assert get_wgs_calling_shards(whole_config) == []
+    assert get_wgs_calling_shards({"analysis": {}}) == []
+
+
+def test_get_vep_chunks():
+    # GIVEN a WGS and a panel config of two VEP chunks
+    wgs_config = {"analysis": {"sequencing_type": "wgs", "vep_chunks": 2}}
+    panel_config = {"analysis": {"sequencing_type": "targeted", "vep_chunks": 2}}
+
+    # WHEN retrieving the VEP chunks
+    # THEN WGS VCF files should be annotated in chunks, if chunks are configured
+    assert get_vep_chunks(wgs_config) == ["chunk_001", "chunk_002"]
+    assert get_vep_chunks({"analysis": {"sequencing_type": "wgs"}}) == []
+    assert get_vep_chunks(panel_config) == []
+
+
+def test_get_annotation_cache():
+    # GIVEN a config with an annotation cache and a config without
+    reference = {"genome_version": "hg19", "vep": "reference/vep"}
+    config = {"analysis": {"annotation_cache": "cache.sqlite"}, "reference": reference}
+
+    # WHEN retrieving the annotation cache options
+    cache_options = get_annotation_cache(config, "--everything", "cosmic.vcf.gz")
+
+    # THEN annotations should be keyed by genome version, VEP cache and options
+    assert cache_options.startswith(
+        "--cache cache.sqlite --genome_version hg19 --vep_cache reference/vep "
+    )
+    assert cache_options != get_annotation_cache(config, "--everything")
+    assert get_annotation_cache({"analysis": {}}, "--everything") == ""
+
+
+def test_get_scratch_dir(tmp_path):
+    # GIVEN a scratch dir given by an environment variable and the tmp dir of a case
+    config = {"analysis": {"scratch_dir": "$BALSAMIC_SCRATCH"}}
+    tmp_dir = "analysis/case/tmp/"
+
+    # WHEN the environment variable points to an existing directory
+    with mock.patch.dict("os.environ", {"BALSAMIC_SCRATCH": tmp_path.as_posix()}):
+        scratch_dir = get_scratch_dir(config, tmp_dir)
+        rule_tmpdirs = {get_rule_tmpdir(config, tmp_dir)({}) for _ in range(2)}
+
+    # THEN temporary files should be written to the scratch dir, in a dir per job
+    assert scratch_dir == tmp_path.as_posix() + "/"
+    assert len(rule_tmpdirs) == 2
+    assert all(rule_tmpdir.startswith(scratch_dir) for rule_tmpdir in rule_tmpdirs)
+    assert not any(Path(rule_tmpdir).exists() for rule_tmpdir in rule_tmpdirs)
+
+    # WHEN the environment variable is not set on the node
+    with mock.patch.dict("os.environ", clear=True):
+        # THEN the tmp dir of the case should be used
+        assert get_scratch_dir(config, tmp_dir) == tmp_dir
+
+    # THEN the tmp dir of the case should be used if no scratch dir is configured
+    assert get_scratch_dir({"analysis": {}}, tmp_dir) == tmp_dir
+
+
+def test_get_fastq_lanes():
+    # GIVEN a config with a sample of two lanes and a sample without lanes
+    config = {
+        "analysis": {"fastq_path": "fastq/"},
+        "samples": {
+            "L1_tumor": {"type": "tumor", "lanes": ["L1_tumor", "L2_tumor"]},
+            "normal": {"type": "normal"},
+        },
+    }
+
+    # WHEN retrieving the fastq files of their first read
+    # THEN the sample with lanes should get one file per lane
+    assert get_fastq_lanes(config, "L1_tumor", "1") == [
+        "fastq/L1_tumor_1.fastq.gz",
+        "fastq/L2_tumor_1.fastq.gz",
+    ]
+    assert get_fastq_lanes(config, "normal", "1") == ["fastq/normal_1.fastq.gz"]
+
+
+def test_get_fastq_stream():
+    # GIVEN the fastq files of a single lane and of two lanes
+    fastq_files = ["fastq/L1_tumor_1.fastq.gz", "fastq/L2_tumor_1.fastq.gz"]
+
+    # WHEN retrieving the commands streaming them
+    single_lane = get_fastq_stream(fastq_files[:1], "tmp/tumor_1.fastq")
+    two_lanes = get_fastq_stream(fastq_files, "tmp/tumor_1.fastq")
+
+    # THEN a single lane should be read as is
+    assert single_lane == {"fastq": fastq_files[0], "stream": "", "wait": ""}
+
+    # THEN lanes should be streamed through a named pipe and their stream waited for
+    assert two_lanes["fastq"] == "tmp/tumor_1.fastq"
+    assert "mkfifo tmp/tumor_1.fastq" in two_lanes["stream"]
+    assert " ".join(fastq_files) + " > tmp/tumor_1.fastq &" in two_lanes["stream"]
+    assert two_lanes["wait"].startswith("wait $tumor_1_fastq_pid;")
+
+
+def test_get_fastq_fifo():
+    # GIVEN two rules streaming the same read of a sample
+    # WHEN retrieving their named pipes
+    fastqc_fifo = get_fastq_fifo("tmp/", "fastqc", "tumor", "1")
+    fastp_fifo = get_fastq_fifo("tmp/", "fastp_umi", "tumor", "1")
+
+    # THEN each rule should stream through its own named pipe
+    assert fastqc_fifo == "tmp/fastqc_tumor_1.fastq"
+    assert fastqc_fifo != fastp_fifo
+
+
+def test_get_sample_dict_stream_lanes():
+    # GIVEN the fastq files of two lanes of a tumor sample
+    tumor = ["fastq/L1_tumor_R_1.fastq.gz", "fastq/L2_tumor_R_1.fastq.gz"]
+
+    # WHEN building the samples with and without streaming lanes
+    samples = get_sample_dict(tumor=tumor, normal=None)
+    lane_samples = get_sample_dict(tumor=tumor, normal=None, stream_lanes=True)
+
+    # THEN lanes should be separate samples unless streamed into a single sample
+    assert set(samples) == {"L1_tumor_R", "L2_tumor_R"}
+    assert set(lane_samples) == {"L1_tumor_R"}
+    assert lane_samples["L1_tumor_R"]["lanes"] == ["L1_tumor_R", "L2_tumor_R"]
+
+
 def test_get_file_status_string_file_exists(tmpdir):
     # GIVEN an existing file and condition_str False
     file_exist = tmpdir.mkdir("temporary_path").join("file_exists")
@@ -701,6 +1050,51 @@ def test_get_file_status_string_file_not_exist():
     assert "missing" in result[0].value_no_colors
 
 
+def test_get_file_status_string_file_exists_given():
+    # GIVEN a missing file checked to exist beforehand
+    file_not_exist = "some_random_path/dummy_non_existing_file"
+
+    # WHEN checking for file string with its known status
+    result = get_file_status_string(file_not_exist, file_exists=True)
+
+    # THEN the known status should be used
+    assert "Found" in result[0].value_no_colors
+    assert result[1]
+
+
+def test_render_graph(tmp_path):
+    # GIVEN a DAG graph saved in DOT format
+    graph_pdf = Path(tmp_path, "case_graph.pdf")
+    graph_pdf.with_suffix(".dot").write_text("digraph BALSAMIC {}")
+
+    # WHEN rendering the graph
+    with mock.patch("BALSAMIC.utils.cli.graphviz.Source") as mocked_source:
+        render_graph(graph_pdf.as_posix())
+
+    # THEN the DOT file should be rendered to the PDF path
+    mocked_source.assert_called_once_with(
+        "digraph BALSAMIC {}",
+        filename=Path(tmp_path, "case_graph").as_posix(),
+        format="pdf",
+        engine="dot",
+    )
+    mocked_source.return_value.render.assert_called_once_with(cleanup=True)
+
+
+def test_render_graph_rendered(tmp_path):
+    # GIVEN a rendered DAG graph
+    graph_pdf = Path(tmp_path, "case_graph.pdf")
+    graph_pdf.touch()
+
+    # WHEN rendering the graph
+    with mock.patch("BALSAMIC.utils.cli.graphviz.Source") as mocked_source:
+        result = render_graph(graph_pdf.as_posix())
+
+    # THEN it should not be rendered again
+    mocked_source.assert_not_called()
+    assert result == graph_pdf.as_posix()
+
+
 def test_get_from_two_key():
     # GIVEN a dictionary with two keys that each have list of values
     input_dict = {
@@ -856,6 +1250,17 @@ def test_get_panel_chrom():
     assert len(get_panel_chrom(panel_bed_file)) > 0
 
 
+def test_get_panel_region_count(tmp_path):
+    # GIVEN a PANEL BED file with two regions closer than twice the padding
+    panel_bed_file = tmp_path / "panel.bed"
+    panel_bed_file.write_text("1\t1000\t1100\n1\t1250\t1300\n2\t50\t100\n")
+
+    # WHEN counting its regions with and without padding
+    # THEN the padded regions should be merged
+    assert get_panel_region_count(panel_bed_file.as_posix()) == 3
+    assert get_panel_region_count(panel_bed_file.as_posix(), padding=100) == 2
+
+
 def test_create_fastq_symlink(tmpdir_factory, caplog):
     # GIVEN a list of valid input fastq files from test directory containing 4 files
     symlink_from_path = tmpdir_factory.mktemp("symlink_from")
@@ -874,10 +1279,64 @@ def test_create_fastq_symlink(tmpdir_factory, caplog):
         create_fastq_symlink(casefiles=casefiles, symlink_dir=symlink_to_path)
         # THEN destination should have 4 files
         assert len(list(Path(symlink_to_path).rglob("*.fastq.gz"))) == 4
+        # THEN each file should be linked once
+        assert successful_log not in caplog.text
+
+        # WHEN creating the symlinks again
+        create_fastq_symlink(casefiles=casefiles, symlink_dir=symlink_to_path)
         # THEN exception triggers log message containing "skipping"
         assert successful_log in caplog.text
 
 
+def test_get_fastq_index(tmp_path):
+    # GIVEN tumor and normal fastq files of several lanes, in nested directories
+    lane_dir = Path(tmp_path, "lanes")
+    lane_dir.mkdir()
+    fastq_files = [
+        Path(tmp_path, "tumor_R_1.fastq.gz"),
+        Path(tmp_path, "tumor_R_2.fastq.gz"),
+        Path(tmp_path, "normal_R_1.fastq.gz"),
+        Path(lane_dir, "L2_tumor_R_1.fastq.gz"),
+        Path(lane_dir, "L2_tumor_R_2.fastq.gz"),
+        Path(lane_dir, "other_R_1.fastq.gz"),
+    ]
+    for fastq_file in fastq_files:
+        fastq_file.touch()
+
+    # WHEN indexing the fastq files of the case
+    with mock.patch(
+        "BALSAMIC.utils.cli.get_fastq_files", wraps=get_fastq_files
+    ) as mocked_get_fastq_files:
+        fastq_index = get_fastq_index(fastq_files[:3])
+
+    # THEN the directory should be walked once for all case files
+    mocked_get_fastq_files.assert_called_once()
+
+    # THEN every file prefix should be matched in nested directories, as with rglob
+    assert sorted(fastq_index) == ["normal_R", "tumor_R"]
+    assert sorted(fastq_index["tumor_R"]) == sorted(
+        Path(tmp_path).rglob("*tumor_R*.fastq.gz")
+    )
+    assert fastq_index["normal_R"] == [Path(tmp_path, "normal_R_1.fastq.gz")]
+
+
+def test_get_scratch_bind_path(tmp_path):
+    # GIVEN a scratch dir given by an environment variable
+    scratch_dir = "$BALSAMIC_SCRATCH"
+
+    # WHEN the environment variable points to an existing directory
+    with mock.patch.dict("os.environ", {"BALSAMIC_SCRATCH": tmp_path.as_posix()}):
+        # THEN the expanded scratch dir should be bound
+        assert get_scratch_bind_path(scratch_dir) == [tmp_path.resolve().as_posix()]
+
+    # WHEN the environment variable is unset or points to a missing directory
+    with mock.patch.dict("os.environ", clear=True):
+        # THEN no scratch dir should be bound
+        assert get_scratch_bind_path(scratch_dir) == []
+    assert get_scratch_bind_path(Path(tmp_path, "missing").as_posix()) == []
+    assert get_scratch_bind_path(None) == []
+
+
 def test_get_fastq_bind_path(tmpdir_factory):
     # GIVEN a list of valid input fastq filenames and test directories
     filenames = [
@@ -993,11 +1452,13 @@ def test_check_executable_not_existing():
 
 def test_job_id_dump_to_yaml(tmp_path):
 
-    # GIVEN a file with one job id per line, a key (case name), and an output file name
+    # GIVEN a job ledger, a key (case name), and an output file name
     dummy_dir = tmp_path / "job_id_dump_dir"
     dummy_dir.mkdir()
-    dummy_job_id_dump = dummy_dir / "jod_id.dump"
-    dummy_job_id_dump.write_text("01234\n56789")
+    dummy_job_id_dump = dummy_dir / "case.jobs.jsonl"
+    dummy_job_id_dump.write_text(
+        '{"job_id": "01234", "rule": "fastp"}\n{"job_id": "56789", "rule": "all"}\n'
+    )
 
     dummy_name = "angrybird"
 
@@ -1006,8 +1467,9 @@ def test_job_id_dump_to_yaml(tmp_path):
     # WHEN creating yaml from job id dump
     job_id_dump_to_yaml(dummy_job_id_dump, dummy_yaml_out, dummy_name)
 
-    # THEN file should exist
+    # THEN file should exist with the job ids
     assert dummy_yaml_out.exists()
+    assert read_yaml(dummy_yaml_out) == {dummy_name: ["01234", "56789"]}
 
 
 def test_generate_h5(tmp_path):
@@ -0,0 +1,50 @@
+import pytest
+
+from BALSAMIC.utils.vcf import read_tabix_index, write_vcf_chunks
+
+TEST_VCF = "tests/test_data/vcf_tables/test_reference.vcf.gz"
+
+
+def test_read_tabix_index():
+    # GIVEN an indexed VCF file with records on three contigs
+
+    # WHEN reading its tabix index
+    window_records = read_tabix_index(TEST_VCF + ".tbi")
+
+    # THEN the contigs should be returned in file order, each with records in a window
+    assert list(window_records) == ["1", "14", "7"]
+    assert all(records.sum() > 0 for records in window_records.values())
+
+
+def test_read_tabix_index_not_an_index(tmp_path):
+    # GIVEN a gzipped file that is not a tabix index
+    not_an_index = tmp_path / "not_an_index.tbi"
+    not_an_index.write_bytes(b"")
+
+    # WHEN reading it as a tabix index
+    # THEN a ValueError should be raised
+    with pytest.raises(ValueError):
+        read_tabix_index(not_an_index.as_posix())
+
+
+def test_write_vcf_chunks(tmp_path):
+    # GIVEN an indexed VCF file and more chunks than windows holding records
+    chunk_files = [(tmp_path / f"chunk_{chunk}.regions") for chunk in range(5)]
+
+    # WHEN splitting the VCF file into chunks
+    write_vcf_chunks(TEST_VCF, [chunk_file.as_posix() for chunk_file in chunk_files])
+
+    # THEN the chunks should cover the contigs in file order, leaving extra chunks empty
+    chunk_regions = [
+        [line.split("\t") for line in chunk_file.read_text().splitlines()]
+        for chunk_file in chunk_files
+    ]
+    contigs = [region[0] for regions in chunk_regions for region in regions]
+    assert [
+        contig for index, contig in enumerate(contigs) if contigs[index - 1] != contig
+    ] == ["1", "14", "7"]
+    assert all(regions for regions in chunk_regions[:3])
+    assert chunk_regions[-1] == []
+    assert all(
+        int(region[1]) == 1 for regions in chunk_regions for region in regions[1:]
+    )